@@ -0,0 +1,442 @@
+"""
+Module to aggregate time series of energysystems into typical periods (time series aggregation)
+
+Time-dependent sequences of an energysystem (i.e. load and volatile profiles or time-dependent costs) are
+split into periods (i.e. days or weeks), which are clustered via k-means. Energysystem is reduced to one representative
+period per cluster (medoid) and model objective is weighted by number of original timesteps represented by each
+reduced timestep. After solving, results are disaggregated back to full timeline.
+
+Storages are modelled continuously across concatenated typical periods, thus, seasonal storage behaviour is only
+approximated.
+"""
+
+import logging
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Any, Iterator, Optional, Union
+
+import numpy
+import pandas
+from oemof import solph
+
+from . import settings as do_settings
+
+# Key of aggregation settings in simulation parameters
+PARAMETER_KEY = "tsa"
+
+DEFAULT_SETTINGS = {"typical_periods": None, "period_hours": 24, "seed": 0}
+
+KMEANS_ITERATIONS = 100
+
+
+def get_aggregation_settings(scenario: str, parameters: dict) -> Optional[dict]:
+    """
+    Returns aggregation settings for given scenario and parameters
+
+    Settings given in parameters (key "tsa") override settings of scenario (see DJANGO_OEMOF_AGGREGATION).
+    Settings can be given as number of typical periods or as dict holding "typical_periods" and
+    optionally "period_hours" (default 24) and "seed" (default 0).
+
+    Parameters
+    ----------
+    scenario: str
+        Name of scenario
+    parameters: dict
+        Simulation parameters
+
+    Returns
+    -------
+    Optional[dict]
+        Complete aggregation settings or None if time series shall not be aggregated
+
+    Raises
+    ------
+    ValueError
+        If settings are invalid
+    """
+    aggregation_settings = parameters.get(PARAMETER_KEY, do_settings.DJANGO_OEMOF_AGGREGATION.get(scenario))
+    if not aggregation_settings:
+        return None
+    if isinstance(aggregation_settings, (int, float)) and not isinstance(aggregation_settings, bool):
+        aggregation_settings = {"typical_periods": aggregation_settings}
+    if not isinstance(aggregation_settings, dict):
+        raise ValueError(f"Invalid aggregation settings '{aggregation_settings}'.")
+    unknown_keys = set(aggregation_settings) - set(DEFAULT_SETTINGS)
+    if unknown_keys:
+        raise ValueError(f"Unknown aggregation settings {sorted(unknown_keys)}.")
+    aggregation_settings = {**DEFAULT_SETTINGS, **aggregation_settings}
+    try:
+        typical_periods = int(aggregation_settings["typical_periods"])
+        period_hours = float(aggregation_settings["period_hours"])
+        seed = int(aggregation_settings["seed"])
+    except (TypeError, ValueError) as error:
+        raise ValueError(f"Invalid aggregation settings '{aggregation_settings}'.") from error
+    if typical_periods < 1 or period_hours <= 0:
+        raise ValueError("Number of typical periods and period hours must be positive.")
+    return {"typical_periods": typical_periods, "period_hours": period_hours, "seed": seed}
+
+
+def add_aggregation_settings(scenario: str, parameters: dict) -> dict:
+    """
+    Returns parameters including complete aggregation settings
+
+    Settings are recorded in simulation parameters, thus, simulations using different (or no) aggregation
+    are distinguished by their parameters hash. Function is idempotent.
+    Explicit opt-out (i.e. `None` or 0) is recorded as `None` if settings are given for scenario
+    (see DJANGO_OEMOF_AGGREGATION), otherwise scenario settings would be applied when called again.
+    """
+    aggregation_settings = get_aggregation_settings(scenario, parameters)
+    parameters = {key: value for key, value in parameters.items() if key != PARAMETER_KEY}
+    if aggregation_settings:
+        parameters[PARAMETER_KEY] = aggregation_settings
+    elif do_settings.DJANGO_OEMOF_AGGREGATION.get(scenario):
+        parameters[PARAMETER_KEY] = None
+    return parameters
+
+
+@dataclass
+class TypicalPeriods:
+    """Holds mapping between full timeline and reduced timeline of typical periods"""
+
+    period_length: int
+    representatives: list[int]
+    assignments: list[int]
+    timesteps: int
+
+    @property
+    def reduced_steps(self) -> numpy.ndarray:
+        """Returns index of original timestep for each timestep of reduced timeline"""
+        return numpy.array(
+            [
+                representative * self.period_length + step
+                for representative in self.representatives
+                for step in range(self.period_length)
+            ]
+        )
+
+    @property
+    def full_steps(self) -> numpy.ndarray:
+        """Returns position in reduced timeline for each timestep of full timeline"""
+        steps = numpy.arange(self.timesteps)
+        return (
+            numpy.array(self.assignments)[steps // self.period_length] * self.period_length + steps % self.period_length
+        )
+
+    @property
+    def weights(self) -> numpy.ndarray:
+        """Returns number of original timesteps represented by each timestep of reduced timeline"""
+        return numpy.bincount(self.full_steps, minlength=len(self.representatives) * self.period_length)
+
+    def to_dict(self) -> dict:
+        """Returns JSON-able description of typical periods, used to store aggregation in meta results"""
+        return {
+            "period_length": self.period_length,
+            "representatives": [int(representative) for representative in self.representatives],
+            "period_weights": numpy.bincount(self.assignments, minlength=len(self.representatives)).tolist(),
+            "timesteps": self.timesteps,
+            "reduced_timesteps": len(self.representatives) * self.period_length,
+        }
+
+
+def kmeans(data: numpy.ndarray, clusters: int, seed: int = 0) -> tuple[numpy.ndarray, numpy.ndarray]:
+    """
+    Clusters rows of data via k-means (k-means++ initialization)
+
+    Parameters
+    ----------
+    data: numpy.ndarray
+        Observations as rows
+    clusters: int
+        Number of clusters
+    seed: int
+        Seed of random generator used for initialization
+
+    Returns
+    -------
+    tuple[numpy.ndarray, numpy.ndarray]
+        Cluster label of each observation and cluster centers
+    """
+    rng = numpy.random.default_rng(seed)
+    centers = [data[rng.integers(len(data))]]
+    for _ in range(1, clusters):
+        distances = ((data[:, None, :] - numpy.array(centers)[None, :, :]) ** 2).sum(axis=2).min(axis=1)
+        probabilities = distances / distances.sum() if distances.sum() > 0 else None
+        centers.append(data[rng.choice(len(data), p=probabilities)])
+    centers = numpy.array(centers)
+
+    labels = numpy.zeros(len(data), dtype=int)
+    for _ in range(KMEANS_ITERATIONS):
+        labels = ((data[:, None, :] - centers[None, :, :]) ** 2).sum(axis=2).argmin(axis=1)
+        new_centers = numpy.array(
+            [
+                data[labels == cluster].mean(axis=0) if (labels == cluster).any() else centers[cluster]
+                for cluster in range(clusters)
+            ]
+        )
+        if numpy.allclose(new_centers, centers):
+            break
+        centers = new_centers
+    return labels, centers
+
+
+def get_typical_periods(
+    features: numpy.ndarray, period_length: int, typical_periods: int, seed: int = 0
+) -> TypicalPeriods:
+    """
+    Clusters periods of given features into typical periods
+
+    Representative of each cluster is the period closest to cluster center (medoid).
+    A trailing partial period is assigned to the typical period closest to it.
+
+    Parameters
+    ----------
+    features: numpy.ndarray
+        Normalized time series as columns (one row per timestep)
+    period_length: int
+        Number of timesteps per period
+    typical_periods: int
+        Number of typical periods
+    seed: int
+        Seed used for clustering
+
+    Returns
+    -------
+    TypicalPeriods
+        Mapping between full and reduced timeline
+    """
+    timesteps = len(features)
+    full_periods = timesteps // period_length
+    if full_periods == 0:
+        raise ValueError(
+            f"Time series of {timesteps} timesteps is shorter than one period ({period_length} timesteps)."
+        )
+    periods = features[: full_periods * period_length].reshape(full_periods, -1)
+
+    labels, centers = kmeans(periods, min(typical_periods, full_periods), seed)
+    representatives = []
+    assignments = numpy.zeros(full_periods, dtype=int)
+    for cluster in numpy.unique(labels):
+        members = numpy.flatnonzero(labels == cluster)
+        distances = ((periods[members] - centers[cluster]) ** 2).sum(axis=1)
+        assignments[members] = len(representatives)
+        representatives.append(int(members[distances.argmin()]))
+    assignments = assignments.tolist()
+
+    remainder = timesteps - full_periods * period_length
+    if remainder:
+        partial = features[full_periods * period_length :].reshape(-1)
+        distances = [
+            ((periods[representative].reshape(period_length, -1)[:remainder].reshape(-1) - partial) ** 2).sum()
+            for representative in representatives
+        ]
+        assignments.append(int(numpy.argmin(distances)))
+    return TypicalPeriods(period_length, representatives, assignments, timesteps)
+
+
+def is_time_series(value: Any, timesteps: int) -> bool:
+    """Returns whether given value is a time-dependent sequence (constant sequences of solph are excluded)"""
+    if isinstance(value, (str, dict, solph._plumbing._Sequence)):  # pylint: disable=W0212
+        return False
+    return isinstance(value, (list, tuple, numpy.ndarray, pandas.Series)) and len(value) == timesteps
+
+
+def get_time_series(energysystem: solph.EnergySystem) -> list[tuple[Any, str, Optional[str]]]:
+    """
+    Returns references to all time-dependent sequences of nodes and flows in energysystem
+
+    Returns
+    -------
+    list[tuple[Any, str, Optional[str]]]
+        Object, attribute and (for dict attributes, i.e. conversion factors) key of each sequence
+    """
+    timesteps = len(energysystem.timeincrement)
+    objects = list(energysystem.nodes) + list(energysystem.flows().values())
+    references = []
+    for obj in objects:
+        for attribute, value in vars(obj).items():
+            if is_time_series(value, timesteps):
+                references.append((obj, attribute, None))
+            elif isinstance(value, dict):
+                references.extend(
+                    (obj, attribute, key) for key, item in value.items() if is_time_series(item, timesteps)
+                )
+    return references
+
+
+def get_reference_value(reference: tuple[Any, str, Optional[str]]) -> Any:
+    """Returns value of sequence reference"""
+    obj, attribute, key = reference
+    value = getattr(obj, attribute)
+    return value if key is None else value[key]
+
+
+def set_reference_value(reference: tuple[Any, str, Optional[str]], value: Any):
+    """Sets value of sequence reference"""
+    obj, attribute, key = reference
+    if key is None:
+        setattr(obj, attribute, value)
+    else:
+        getattr(obj, attribute)[key] = value
+
+
+def get_features(sequences: list[Any]) -> numpy.ndarray:
+    """Returns time-varying sequences as min-max-normalized columns (identical sequences are used once)"""
+    columns = {}
+    for sequence in sequences:
+        values = numpy.asarray(sequence, dtype=float)
+        span = values.max() - values.min()
+        if span == 0 or numpy.isnan(span):
+            continue
+        columns.setdefault(values.tobytes(), (values - values.min()) / span)
+    if not columns:
+        return numpy.zeros((len(sequences[0]) if sequences else 0, 1))
+    return numpy.column_stack(list(columns.values()))
+
+
+def reduce_sequence(sequence: Any, steps: numpy.ndarray) -> Any:
+    """Returns sequence reduced to given timesteps, keeping type of sequence"""
+    if isinstance(sequence, pandas.Series):
+        return sequence.iloc[steps].reset_index(drop=True)
+    reduced = numpy.asarray(sequence)[steps]
+    return reduced.tolist() if isinstance(sequence, (list, tuple)) else reduced
+
+
+@contextmanager
+def aggregated_energysystem(
+    energysystem: solph.EnergySystem, aggregation_settings: Optional[dict]
+) -> Iterator[Optional[TypicalPeriods]]:
+    """
+    Context manager reducing energysystem to typical periods
+
+    All time-dependent sequences, time index and time increment of energysystem are reduced to typical periods
+    within context and restored afterwards.
+
+    Parameters
+    ----------
+    energysystem: solph.EnergySystem
+        Energysystem to reduce
+    aggregation_settings: Optional[dict]
+        Complete aggregation settings (see `get_aggregation_settings`); if not set, energysystem is not reduced
+
+    Yields
+    ------
+    Optional[TypicalPeriods]
+        Typical periods used to reduce energysystem (None if energysystem is not reduced)
+    """
+    if not aggregation_settings:
+        yield None
+        return
+    if energysystem.periods is not None:
+        raise ValueError("Time series aggregation is not supported for multi-period energysystems.")
+    timeincrement = pandas.Series(energysystem.timeincrement, dtype=float)
+    if timeincrement.nunique() != 1:
+        raise ValueError("Time series aggregation requires equidistant timesteps.")
+    period_length = int(round(aggregation_settings["period_hours"] / timeincrement.iloc[0]))
+
+    references = get_time_series(energysystem)
+    typical_periods = get_typical_periods(
+        get_features([get_reference_value(reference) for reference in references]),
+        period_length,
+        aggregation_settings["typical_periods"],
+        aggregation_settings["seed"],
+    )
+    logging.info(
+        f"Aggregated {len(timeincrement)} timesteps into {len(typical_periods.representatives)} typical periods "
+        f"of {period_length} timesteps ({len(references)} time series)."
+    )
+    with reduced_energysystem(energysystem, typical_periods.reduced_steps, references):
+        yield typical_periods
+
+
+@contextmanager
+def reduced_energysystem(
+    energysystem: solph.EnergySystem,
+    steps: numpy.ndarray,
+    references: Optional[list[tuple[Any, str, Optional[str]]]] = None,
+) -> Iterator[solph.EnergySystem]:
+    """
+    Context manager reducing all time series, time index and time increment of energysystem to given timesteps
+
+    Original sequences are restored after leaving context.
+
+    Parameters
+    ----------
+    energysystem: solph.EnergySystem
+        Energysystem to reduce
+    steps: numpy.ndarray
+        Original timesteps which make up reduced timeline
+    references: Optional[list[tuple[Any, str, Optional[str]]]]
+        References to time series (see `get_time_series`), looked up if not given
+
+    Yields
+    ------
+    solph.EnergySystem
+        Reduced energysystem
+    """
+    references = references if references is not None else get_time_series(energysystem)
+    original_values = [get_reference_value(reference) for reference in references]
+    original_timeindex, original_timeincrement = energysystem.timeindex, energysystem.timeincrement
+    try:
+        for reference, value in zip(references, original_values):
+            set_reference_value(reference, reduce_sequence(value, steps))
+        energysystem.timeincrement = reduce_sequence(original_timeincrement, steps)
+        if original_timeindex is not None:
+            # Time index may hold additional last time point
+            additional_points = len(original_timeindex) - len(original_timeincrement)
+            if numpy.array_equal(steps, numpy.arange(steps[0], steps[0] + len(steps))):
+                energysystem.timeindex = original_timeindex[steps[0] : steps[-1] + 1 + additional_points]
+            else:
+                energysystem.timeindex = pandas.date_range(
+                    original_timeindex[steps[0]],
+                    periods=len(steps) + additional_points,
+                    freq=pandas.Timedelta(hours=float(pandas.Series(original_timeincrement).iloc[0])),
+                )
+        yield energysystem
+    finally:
+        for reference, value in zip(references, original_values):
+            set_reference_value(reference, value)
+        energysystem.timeindex, energysystem.timeincrement = original_timeindex, original_timeincrement
+
+
+def get_objective_weighting(typical_periods: TypicalPeriods, timeincrement: Any) -> list[float]:
+    """Returns objective weighting of reduced model (time increment times number of represented timesteps)"""
+    return (numpy.asarray(timeincrement, dtype=float) * typical_periods.weights).tolist()
+
+
+def disaggregate_results(
+    results_data: dict, typical_periods: TypicalPeriods, timeindex: Optional[pandas.DatetimeIndex]
+) -> dict:
+    """
+    Disaggregates sequences of results from reduced timeline back to full timeline
+
+    Parameters
+    ----------
+    results_data: dict
+        Results as returned by `solph.processing.results` for reduced model
+    typical_periods: TypicalPeriods
+        Typical periods used to reduce energysystem
+    timeindex: Optional[pandas.DatetimeIndex]
+        Full time index of energysystem
+
+    Returns
+    -------
+    dict
+        Results holding sequences for full timeline (scalars are kept as is)
+    """
+    full_steps = typical_periods.full_steps
+    reduced_length = len(typical_periods.representatives) * typical_periods.period_length
+    for result in results_data.values():
+        sequences: Union[pandas.DataFrame, None] = result.get("sequences")
+        if sequences is None or sequences.empty:
+            continue
+        steps = full_steps
+        if len(sequences) > reduced_length:
+            # Last time point (i.e. storage content at end of horizon) is taken from end of reduced timeline
+            steps = numpy.append(full_steps, numpy.arange(reduced_length, len(sequences)))
+        disaggregated = sequences.iloc[steps]
+        if timeindex is not None:
+            disaggregated.index = timeindex[: len(steps)]
+        else:
+            disaggregated = disaggregated.reset_index(drop=True)
+        result["sequences"] = disaggregated
+    return results_data
@@ -0,0 +1,200 @@
+"""Benchmarks for build, solve, store, restore and postprocessing pipeline of django_oemof"""
+
+import logging
+import platform
+import statistics
+import time
+import traceback
+import uuid
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from typing import Iterable, Optional
+from unittest import mock
+
+from django.test import RequestFactory
+from oemof import solph
+
+from django_oemof import models, results, settings, simulation, views
+
+DEFAULT_SCENARIOS = ("dispatch", "test_scenario")
+DEFAULT_CALCULATIONS = ("total_system_costs",)
+
+# Benchmarks which differ less than given seconds from baseline are not reported as regression (timer noise)
+MIN_REGRESSION_SECONDS = 0.01
+
+
+@contextmanager
+def measure(timings: dict, name: str):
+    """Adds wall time of context to list of timings of given benchmark"""
+    start = time.perf_counter()
+    yield
+    timings.setdefault(name, []).append(time.perf_counter() - start)
+
+
+def get_adapt_parameters(energysystem: solph.EnergySystem) -> dict:
+    """Returns parameters setting capacity of all components with numeric capacity to its current value"""
+    return {
+        str(node.label): {"capacity": node.capacity}
+        for node in energysystem.nodes
+        if isinstance(getattr(node, "capacity", None), (int, float))
+    }
+
+
+def benchmark_scenario(scenario: str, calculations: Iterable[str], timings: dict):
+    """
+    Runs complete pipeline for given scenario once and adds timings of every benchmark
+
+    Stored datasets, simulations and results are removed afterwards, as well as cached ES (unless it has been cached
+    before).
+    """
+    oemof_datapackage = str(settings.OEMOF_DIR / scenario / "datapackage.json")
+    with mock.patch.object(settings, "DJANGO_OEMOF_ES_CACHE", False):
+        with measure(timings, "build_energysystem"):
+            simulation.build_energysystem(oemof_datapackage)
+    cache_file = simulation.get_energysystem_cache_file(oemof_datapackage)
+    cached_before = cache_file.exists()
+    try:
+        with mock.patch.object(settings, "DJANGO_OEMOF_ES_CACHE", True):
+            simulation.build_energysystem(oemof_datapackage)  # Make sure ES is cached
+            with measure(timings, "build_energysystem_cached"):
+                energysystem = simulation.build_energysystem(oemof_datapackage)
+    finally:
+        if not cached_before:
+            cache_file.unlink(missing_ok=True)
+
+    parameters = get_adapt_parameters(energysystem)
+    with measure(timings, "adapt_energysystem"):
+        energysystem = simulation.adapt_energysystem(energysystem, parameters)
+
+    with measure(timings, "simulate_energysystem"):
+        _, input_data, results_data, meta_results = simulation.simulate_energysystem(scenario, energysystem)
+
+    with measure(timings, "store_results"):
+        dataset = models.OemofDataset.store_results(input_data, results_data, meta_results)
+    # pylint: disable=E1101
+    sim = models.Simulation.objects.create(
+        scenario=f"benchmark_{scenario}", parameters={"benchmark": str(uuid.uuid4())}, dataset=dataset
+    )
+    try:
+        with measure(timings, "restore_results"):
+            dataset.restore_results()
+
+        results.CALCULATOR_CACHE.invalidate()
+        with measure(timings, "get_results"):
+            results.get_results(sim.id, list(calculations))
+        with measure(timings, "get_results_cached"):
+            results.get_results(sim.id, list(calculations))
+
+        sim.results.all().delete()
+        results.CALCULATOR_CACHE.invalidate()
+        request = RequestFactory().get("/calculate", {"simulation_id": sim.id, "calculations": list(calculations)})
+        with measure(timings, "calculate_view"):
+            views.CalculateResults.as_view()(request).render()
+
+        request = RequestFactory().get("/flows", {"simulation_id": sim.id})
+        with measure(timings, "flows_view"):
+            views.FlowsView.as_view()(request).render()
+    finally:
+        results.CALCULATOR_CACHE.invalidate()
+        oemof_data = [dataset.input, dataset.result]
+        # pylint: disable=E1101
+        models.OemofScalar.objects.filter(oemofdata__in=oemof_data).delete()
+        models.OemofSequence.objects.filter(oemofdata__in=oemof_data).delete()
+        for data in oemof_data:
+            data.delete()
+
+
+def run_benchmarks(
+    scenarios: Iterable[str] = DEFAULT_SCENARIOS, calculations: Iterable[str] = DEFAULT_CALCULATIONS, repeat: int = 3
+) -> dict:
+    """
+    Runs benchmarks for given scenarios
+
+    Parameters
+    ----------
+    scenarios: Iterable[str]
+        Scenarios (datapackages in oemof folder) to benchmark
+    calculations: Iterable[str]
+        Calculations used to benchmark postprocessing
+    repeat: int
+        Number of runs per scenario
+
+    Returns
+    -------
+    dict
+        Holding metadata and min/median/max seconds per benchmark and scenario;
+        errors are reported per scenario instead of benchmarks
+    """
+    benchmark_results = {
+        "meta": {
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "solph": solph.__version__,
+            "solver": simulation.solvers.get_solver(next(iter(scenarios), "")).to_dict(),
+            "repeat": repeat,
+        },
+        "scenarios": {},
+    }
+    for scenario in scenarios:
+        timings = {}
+        try:
+            for _ in range(repeat):
+                benchmark_scenario(scenario, calculations, timings)
+        except Exception as error:  # pylint: disable=W0703
+            logging.error(f"Benchmark for {scenario=} failed:\n{traceback.format_exc()}")
+            benchmark_results["scenarios"][scenario] = {"error": f"{type(error).__name__}: {error}"}
+            continue
+        benchmark_results["scenarios"][scenario] = {
+            name: {
+                "min": min(values),
+                "median": statistics.median(values),
+                "max": max(values),
+                "runs": len(values),
+            }
+            for name, values in timings.items()
+        }
+    return benchmark_results
+
+
+def compare_to_baseline(benchmark_results: dict, baseline: dict, tolerance: float = 0.2) -> list[dict]:
+    """
+    Compares median timings of benchmarks to baseline
+
+    Parameters
+    ----------
+    benchmark_results: dict
+        Current results as returned by `run_benchmarks`
+    baseline: dict
+        Baseline results as returned by `run_benchmarks`
+    tolerance: float
+        Relative slowdown which is tolerated
+
+    Returns
+    -------
+    list[dict]
+        Regressions holding scenario, benchmark, baseline and current median and ratio
+    """
+    regressions = []
+    for scenario, benchmarks in benchmark_results["scenarios"].items():
+        baseline_benchmarks = baseline.get("scenarios", {}).get(scenario, {})
+        if "error" in benchmarks:
+            if "error" not in baseline_benchmarks:
+                regressions.append({"scenario": scenario, "benchmark": None, "error": benchmarks["error"]})
+            continue
+        for name, timing in benchmarks.items():
+            baseline_timing: Optional[dict] = baseline_benchmarks.get(name)
+            if not baseline_timing or not isinstance(baseline_timing, dict):
+                continue
+            ratio = timing["median"] / baseline_timing["median"] if baseline_timing["median"] else float("inf")
+            if ratio > 1 + tolerance and timing["median"] - baseline_timing["median"] > MIN_REGRESSION_SECONDS:
+                regressions.append(
+                    {
+                        "scenario": scenario,
+                        "benchmark": name,
+                        "baseline": baseline_timing["median"],
+                        "current": timing["median"],
+                        "ratio": round(ratio, 3),
+                    }
+                )
+    return regressions
@@ -0,0 +1,108 @@
+"""Module to store oemof sequences and postprocessing results in columnar binary formats and restore them"""
+
+from typing import Iterable, Iterator, Union
+
+import numpy
+import pandas
+
+try:
+    import pyarrow
+    import pyarrow.ipc
+except ImportError:
+    pyarrow = None
+
+DTYPE = numpy.float64
+
+
+def pack_sequences(sequences: Iterable[tuple[str, str, str, Union[list, pandas.Series]]]) -> tuple[bytes, list]:
+    """
+    Packs given sequences into one contiguous 2-D float block
+
+    Each sequence is stored as one row of the block. Shorter sequences are padded with NaN;
+    original length and type of each sequence are stored in related column index.
+
+    Parameters
+    ----------
+    sequences: Iterable[tuple[str, str, str, Union[list, pandas.Series]]]
+        Sequences given as tuples of (from_node, to_node, attribute, sequence)
+
+    Returns
+    -------
+    tuple[bytes, list]
+        Raw bytes of float block and column index holding [from_node, to_node, attribute, type, length] per row
+    """
+    columns = []
+    values = []
+    for from_node, to_node, attribute, sequence in sequences:
+        list_type = "series" if isinstance(sequence, pandas.Series) else "list"
+        array = numpy.asarray(sequence, dtype=DTYPE)
+        columns.append([from_node, to_node, attribute, list_type, len(array)])
+        values.append(array)
+    block = numpy.full((len(values), max((len(array) for array in values), default=0)), numpy.nan, dtype=DTYPE)
+    for i, array in enumerate(values):
+        block[i, : len(array)] = array
+    return block.tobytes(), columns
+
+
+def unpack_sequences(
+    block: Union[bytes, memoryview], columns: list
+) -> Iterator[tuple[str, str, str, Union[list, pandas.Series]]]:
+    """
+    Restores sequences from packed float block
+
+    Sequences of type "series" are returned as pandas.Series sharing memory with given block.
+
+    Parameters
+    ----------
+    block: Union[bytes, memoryview]
+        Raw bytes of float block as returned by `pack_sequences`
+    columns: list
+        Column index as returned by `pack_sequences`
+
+    Yields
+    ------
+    tuple[str, str, str, Union[list, pandas.Series]]
+        Restored sequence as (from_node, to_node, attribute, sequence)
+    """
+    if not columns:
+        return
+    # Block is empty if all sequences are empty; reshape cannot infer row length from empty block
+    array = numpy.frombuffer(block, dtype=DTYPE).reshape(len(columns), -1 if len(block) else 0)
+    for i, (from_node, to_node, attribute, list_type, length) in enumerate(columns):
+        values = array[i, :length]
+        sequence = pandas.Series(values, copy=False) if list_type == "series" else values.tolist()
+        yield from_node, to_node, attribute, sequence
+
+
+def frame_to_arrow(frame: pandas.DataFrame) -> bytes:
+    """
+    Encodes given frame as Arrow IPC stream
+
+    Dtypes, index and column levels are preserved via pandas metadata stored in Arrow schema.
+
+    Raises
+    ------
+    ImportError
+        If pyarrow is not installed
+    """
+    if pyarrow is None:
+        raise ImportError("Package 'pyarrow' is needed to encode frames using Arrow.")
+    table = pyarrow.Table.from_pandas(frame, preserve_index=True)
+    sink = pyarrow.BufferOutputStream()
+    with pyarrow.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
+
+
+def frame_from_arrow(data: Union[bytes, memoryview]) -> pandas.DataFrame:
+    """
+    Decodes frame from Arrow IPC stream as returned by `frame_to_arrow`
+
+    Raises
+    ------
+    ImportError
+        If pyarrow is not installed
+    """
+    if pyarrow is None:
+        raise ImportError("Package 'pyarrow' is needed to decode frames using Arrow.")
+    return pyarrow.ipc.open_stream(pyarrow.py_buffer(data)).read_pandas()
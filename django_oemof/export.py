@@ -0,0 +1,146 @@
+"""Module to export calculated results in streamed formats (CSV, Arrow IPC and Parquet)"""
+
+import abc
+import io
+import json
+from typing import Iterator, Union
+
+import pandas
+from django.http import StreamingHttpResponse
+from rest_framework.renderers import BaseRenderer
+
+from . import settings as do_settings
+from .columnar import pyarrow
+
+try:
+    import pyarrow.parquet
+except ImportError:
+    pass
+
+
+class StreamingRenderer(BaseRenderer, abc.ABC):
+    """
+    Renderer used to negotiate streamed export formats via `Accept` header or `format` parameter
+
+    Results are streamed by view directly; renderer is only used to render (error) messages.
+    """
+
+    charset = "utf-8"
+    extension = None
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        return json.dumps(data).encode(self.charset) if data is not None else b""
+
+    @abc.abstractmethod
+    def stream(self, frame: pandas.DataFrame, chunk_size: int) -> Iterator[bytes]:
+        """Yields encoded frame chunk by chunk"""
+
+
+class CSVRenderer(StreamingRenderer):
+    """Streams results as CSV"""
+
+    media_type = "text/csv"
+    format = "csv"
+    extension = "csv"
+
+    def stream(self, frame: pandas.DataFrame, chunk_size: int) -> Iterator[bytes]:
+        yield frame.iloc[:0].to_csv().encode(self.charset)
+        for start in range(0, len(frame), chunk_size):
+            yield frame.iloc[start : start + chunk_size].to_csv(header=False).encode(self.charset)
+
+
+class ArrowRenderer(StreamingRenderer):
+    """Streams results as Arrow IPC stream (one record batch per chunk)"""
+
+    media_type = "application/vnd.apache.arrow.stream"
+    format = "arrow"
+    extension = "arrow"
+
+    def stream(self, frame: pandas.DataFrame, chunk_size: int) -> Iterator[bytes]:
+        yield from stream_arrow_chunks(frame, chunk_size, pyarrow.ipc.new_stream)
+
+
+class ParquetRenderer(StreamingRenderer):
+    """Streams results as Parquet file (one row group per chunk)"""
+
+    media_type = "application/vnd.apache.parquet"
+    format = "parquet"
+    extension = "parquet"
+
+    def stream(self, frame: pandas.DataFrame, chunk_size: int) -> Iterator[bytes]:
+        yield from stream_arrow_chunks(frame, chunk_size, pyarrow.parquet.ParquetWriter)
+
+
+STREAMING_RENDERERS = [CSVRenderer]
+if pyarrow is not None:
+    STREAMING_RENDERERS.append(ArrowRenderer)
+    if hasattr(pyarrow, "parquet"):
+        STREAMING_RENDERERS.append(ParquetRenderer)
+
+
+def stream_arrow_chunks(frame: pandas.DataFrame, chunk_size: int, writer_cls) -> Iterator[bytes]:
+    """
+    Writes frame chunk by chunk using given Arrow writer and yields written bytes after every chunk
+
+    Parameters
+    ----------
+    frame: pandas.DataFrame
+        Frame to export
+    chunk_size: int
+        Number of rows per chunk
+    writer_cls
+        Arrow writer class (or factory) accepting sink and schema (i.e. `pyarrow.ipc.new_stream`)
+
+    Yields
+    ------
+    bytes
+        Encoded chunks
+    """
+    schema = pyarrow.Schema.from_pandas(frame, preserve_index=True)
+    sink = io.BytesIO()
+
+    def pop_written_bytes():
+        data = sink.getvalue()
+        sink.seek(0)
+        sink.truncate()
+        return data
+
+    writer = writer_cls(sink, schema)
+    for start in range(0, len(frame), chunk_size):
+        chunk = frame.iloc[start : start + chunk_size]
+        writer.write_table(pyarrow.Table.from_pandas(chunk, schema=schema, preserve_index=True))
+        yield pop_written_bytes()
+    writer.close()
+    yield pop_written_bytes()
+
+
+def get_streaming_response(
+    result: Union[pandas.Series, pandas.DataFrame], name: str, renderer: StreamingRenderer
+) -> StreamingHttpResponse:
+    """
+    Returns streaming response holding result encoded by given renderer
+
+    Parameters
+    ----------
+    result: Union[pandas.Series, pandas.DataFrame]
+        Calculated result
+    name: str
+        Name of result, used as filename
+    renderer: StreamingRenderer
+        Renderer selected via content negotiation
+
+    Returns
+    -------
+    StreamingHttpResponse
+        Response streaming encoded result in chunks of DJANGO_OEMOF_EXPORT_CHUNK_SIZE rows
+    """
+    frame = result
+    if isinstance(result, pandas.Series):
+        frame = result.to_frame(name=result.name if result.name is not None else "values")
+    # Calculations often return object dtypes, which cannot be encoded by Arrow
+    frame = frame.infer_objects()
+    response = StreamingHttpResponse(
+        renderer.stream(frame, do_settings.DJANGO_OEMOF_EXPORT_CHUNK_SIZE), content_type=renderer.media_type
+    )
+    response["Content-Disposition"] = f'attachment; filename="{name}.{renderer.extension}"'
+    return response
@@ -0,0 +1,211 @@
+"""Module to generate synthetic oemof.tabular datapackages of configurable size (i.e. for load and scaling tests)"""
+
+import contextlib
+import io
+import pathlib
+import shutil
+
+import numpy
+import pandas
+from oemof.tabular.datapackage.building import infer_metadata
+
+FOREIGN_KEYS = {
+    "bus": ["volatile", "dispatchable", "storage", "load"],
+    "profile": ["load", "volatile"],
+    "from_to_bus": ["link"],
+}
+
+
+def get_connected_buses(buses: list[str], links: list[tuple[str, str]]) -> list[list[str]]:
+    """Returns groups of buses connected via links"""
+    groups = {bus: {bus} for bus in buses}
+    for from_bus, to_bus in links:
+        if groups[from_bus] is groups[to_bus]:
+            continue
+        merged = groups[from_bus] | groups[to_bus]
+        for bus in merged:
+            groups[bus] = merged
+    unique_groups = {id(group): group for group in groups.values()}
+    return [sorted(group, key=buses.index) for group in unique_groups.values()]
+
+
+def get_load_profile(rng: numpy.random.Generator, timeindex: pandas.DatetimeIndex) -> numpy.ndarray:
+    """Returns seeded load profile with daily and yearly pattern, normalized to sum of one"""
+    hours = numpy.asarray(timeindex.hour, dtype=float)
+    days = numpy.asarray(timeindex.dayofyear, dtype=float)
+    profile = 1 + 0.3 * numpy.sin((hours - 6) / 24 * 2 * numpy.pi) + 0.1 * numpy.cos(days / 365 * 2 * numpy.pi)
+    profile = profile * rng.uniform(0.9, 1.1, len(timeindex))
+    return profile / profile.sum()
+
+
+def get_wind_profile(rng: numpy.random.Generator, timeindex: pandas.DatetimeIndex) -> numpy.ndarray:
+    """Returns seeded wind profile (smoothed noise around random base level) between zero and one"""
+    noise = numpy.convolve(rng.normal(0, 0.3, len(timeindex)), numpy.ones(6) / 6, mode="same")
+    return numpy.clip(rng.uniform(0.2, 0.5) + noise, 0, 1)
+
+
+def get_pv_profile(rng: numpy.random.Generator, timeindex: pandas.DatetimeIndex) -> numpy.ndarray:
+    """Returns seeded pv profile (daylight curve with random clouding) between zero and one"""
+    hours = numpy.asarray(timeindex.hour, dtype=float)
+    daylight = numpy.clip(numpy.sin((hours - 6) / 12 * numpy.pi), 0, None)
+    return daylight * rng.uniform(0.5, 1.0, len(timeindex))
+
+
+# pylint: disable=R0913,R0914
+def generate_datapackage(
+    path: pathlib.Path,
+    buses: int = 2,
+    volatiles: int = 2,
+    dispatchables: int = 2,
+    storages: int = 1,
+    links: int = 1,
+    timesteps: int = 24,
+    seed: int = 0,
+    link_loss: float = 0.01,
+) -> pathlib.Path:
+    """
+    Generates oemof.tabular datapackage with given number of components and timesteps
+
+    Every bus holds one load. Links connect buses as chain first; additional links connect random bus pairs.
+    Every group of connected buses gets at least one dispatchable which is able to cover peak load of group alone,
+    thus generated energysystems are always feasible. All random values and profiles are seeded.
+
+    Parameters
+    ----------
+    path: pathlib.Path
+        Folder of datapackage; existing folder is replaced
+    buses, volatiles, dispatchables, storages, links: int
+        Number of related components
+    timesteps: int
+        Number of hourly timesteps
+    seed: int
+        Seed of random generator
+    link_loss: float
+        Relative loss of links
+
+    Returns
+    -------
+    pathlib.Path
+        Path to generated datapackage.json
+
+    Raises
+    ------
+    ValueError
+        If there are not enough dispatchables to supply all groups of connected buses
+    """
+    if buses < 1 or timesteps < 1:
+        raise ValueError("At least one bus and one timestep are needed.")
+    rng = numpy.random.default_rng(seed)
+    timeindex = pandas.date_range("2020-01-01", periods=timesteps, freq="h", tz="UTC")
+
+    bus_names = [f"bus{i}" for i in range(buses)]
+    link_buses = [(bus_names[i], bus_names[i + 1]) for i in range(min(links, buses - 1))]
+    while len(link_buses) < links and buses > 1:
+        from_bus, to_bus = rng.choice(bus_names, 2, replace=False)
+        link_buses.append((str(from_bus), str(to_bus)))
+    groups = get_connected_buses(bus_names, link_buses)
+    if dispatchables < len(groups):
+        raise ValueError(
+            f"At least {len(groups)} dispatchables are needed to supply {len(groups)} groups of connected buses."
+        )
+
+    amounts = {bus: float(rng.integers(1000, 5000)) * timesteps / 24 for bus in bus_names}
+    load_profile = get_load_profile(rng, timeindex)
+    peak_loads = {bus: amount * load_profile.max() for bus, amount in amounts.items()}
+    group_capacity = {
+        bus: sum(peak_loads[group_bus] for group_bus in group) * (1 + link_loss) ** len(group)
+        for group in groups
+        for bus in group
+    }
+    dispatchable_buses = [group[0] for group in groups]
+    dispatchable_buses += [str(bus) for bus in rng.choice(bus_names, dispatchables - len(groups))]
+
+    elements = {
+        "bus": pandas.DataFrame({"name": bus_names, "type": "bus", "balanced": True}),
+        "load": pandas.DataFrame(
+            {
+                "name": [f"demand{i}" for i in range(buses)],
+                "amount": [round(amounts[bus], 3) for bus in bus_names],
+                "profile": "load-profile",
+                "type": "load",
+                "bus": bus_names,
+            }
+        ),
+        "dispatchable": pandas.DataFrame(
+            {
+                "name": [f"dispatchable{i}" for i in range(dispatchables)],
+                "type": "dispatchable",
+                "carrier": "gas",
+                "tech": "gt",
+                "capacity": [round(group_capacity[bus], 3) for bus in dispatchable_buses],
+                "bus": dispatchable_buses,
+                "marginal_cost": rng.integers(20, 80, dispatchables),
+                "profile": 1,
+            }
+        ),
+        "volatile": pandas.DataFrame(
+            {
+                "name": [f"volatile{i}" for i in range(volatiles)],
+                "type": "volatile",
+                "carrier": ["wind" if i % 2 == 0 else "solar" for i in range(volatiles)],
+                "tech": ["onshore" if i % 2 == 0 else "pv" for i in range(volatiles)],
+                "capacity": rng.integers(10, 100, volatiles),
+                "bus": [bus_names[i % buses] for i in range(volatiles)],
+                "marginal_cost": rng.integers(0, 3, volatiles),
+                "profile": [f"volatile{i}-profile" for i in range(volatiles)],
+            }
+        ),
+        "storage": pandas.DataFrame(
+            {
+                "name": [f"storage{i}" for i in range(storages)],
+                "carrier": "lithium",
+                "tech": "battery",
+                "storage_capacity": rng.integers(50, 200, storages),
+                "capacity": rng.integers(10, 50, storages),
+                "capacity_cost": 0,
+                "initial_storage_level": 0.5,
+                "type": "storage",
+                "bus": [bus_names[i % buses] for i in range(storages)],
+            }
+        ),
+        "link": pandas.DataFrame(
+            {
+                "name": [f"link{i}" for i in range(len(link_buses))],
+                "type": "link",
+                "capacity": round(sum(group_capacity[group[0]] for group in groups), 3),
+                "capacity_cost": 0,
+                "loss": link_loss,
+                "from_bus": [from_bus for from_bus, _ in link_buses],
+                "to_bus": [to_bus for _, to_bus in link_buses],
+            }
+        ),
+    }
+    sequences = {
+        "load_profile": pandas.DataFrame({"load-profile": load_profile}, index=timeindex),
+        "volatile_profile": pandas.DataFrame(
+            {
+                f"volatile{i}-profile": (get_wind_profile if i % 2 == 0 else get_pv_profile)(rng, timeindex)
+                for i in range(volatiles)
+            },
+            index=timeindex,
+        ),
+    }
+
+    path = pathlib.Path(path)
+    if path.exists():
+        shutil.rmtree(path)
+    (path / "data" / "elements").mkdir(parents=True)
+    (path / "data" / "sequences").mkdir(parents=True)
+    for name, element in elements.items():
+        if not element.empty:
+            element.to_csv(path / "data" / "elements" / f"{name}.csv", index=False)
+    for name, sequence in sequences.items():
+        if not sequence.columns.empty:
+            sequence.index.name = "timeindex"
+            sequence.to_csv(path / "data" / "sequences" / f"{name}.csv", date_format="%Y-%m-%dT%H:%M:%SZ")
+
+    # infer_metadata prints progress and changes working directory temporarily
+    with contextlib.redirect_stdout(io.StringIO()):
+        infer_metadata(package_name=path.name, foreign_keys=FOREIGN_KEYS, path=str(path.absolute()))
+    shutil.rmtree(path / "resources", ignore_errors=True)
+    return path / "datapackage.json"
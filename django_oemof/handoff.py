@@ -0,0 +1,96 @@
+"""
+Module to hand off serialized simulation results from solve stage to store stage of simulation pipeline
+
+Results are written into a directory below `settings.OEMOF_HANDOFF_DIR` holding a JSON index (scalars, column indexes
+of sequences, meta results and flow totals) and one packed float block of sequences per input and result data
+(see `columnar.pack_sequences`). Directories are written under a temporary name and renamed when complete, thus,
+store stage never reads partially written results.
+"""
+
+import json
+import logging
+import pathlib
+import shutil
+import uuid
+from dataclasses import dataclass
+from typing import Optional, Union
+
+from django_oemof import columnar, models
+from django_oemof import settings as do_settings
+
+INDEX_FILE = "index.json"
+
+
+@dataclass
+class Handoff:
+    """Holds serialized inputs and results (see `models.serialize_data`) read from handoff directory"""
+
+    input_data: dict
+    result_data: dict
+    meta_results: dict
+    flow_totals: Optional[list[dict]]
+
+
+def write_handoff(input_data: dict, result_data: dict, meta_results: dict, handoff_id: Optional[str] = None) -> str:
+    """
+    Serializes inputs and results and writes them into new handoff directory
+
+    Parameters
+    ----------
+    input_data: dict
+        Inputs of simulation with nodes as str
+    result_data: dict
+        Results of simulation with nodes as str
+    meta_results: dict
+        Meta results of simulation
+    handoff_id: Optional[str]
+        Name of handoff directory (task ID of solve stage, see `remove_task_handoff`); random if not set
+
+    Returns
+    -------
+    str
+        Path of handoff directory
+    """
+    handoff_id = handoff_id or uuid.uuid4().hex
+    path = do_settings.OEMOF_HANDOFF_DIR / handoff_id
+    tmp_path = do_settings.OEMOF_HANDOFF_DIR / f".{handoff_id}.tmp"
+    tmp_path.mkdir(parents=True)
+    try:
+        index = {"meta_results": meta_results, "flow_totals": models.calculate_flow_totals(result_data)}
+        for name, data in (("input", input_data), ("result", result_data)):
+            serialized = models.serialize_data(data)
+            block, columns = columnar.pack_sequences(serialized["sequences"])
+            (tmp_path / f"{name}.bin").write_bytes(block)
+            index[name] = {"scalars": serialized["scalars"], "sequence_columns": columns}
+        (tmp_path / INDEX_FILE).write_text(json.dumps(index), encoding="utf-8")
+        tmp_path.rename(path)
+    except Exception:
+        shutil.rmtree(tmp_path, ignore_errors=True)
+        raise
+    logging.debug(f"Wrote handoff directory '{path}'.")
+    return str(path)
+
+
+def read_handoff(path: Union[str, pathlib.Path]) -> Handoff:
+    """Reads serialized inputs and results from given handoff directory"""
+    path = pathlib.Path(path)
+    index = json.loads((path / INDEX_FILE).read_text(encoding="utf-8"))
+    data = {}
+    for name in ("input", "result"):
+        block = (path / f"{name}.bin").read_bytes()
+        data[name] = {
+            "scalars": index[name]["scalars"],
+            "sequences": list(columnar.unpack_sequences(block, index[name]["sequence_columns"])),
+        }
+    return Handoff(data["input"], data["result"], index["meta_results"], index["flow_totals"])
+
+
+def remove_handoff(path: Union[str, pathlib.Path]):
+    """Removes given handoff directory"""
+    shutil.rmtree(path, ignore_errors=True)
+
+
+def remove_task_handoff(task_id: str):
+    """Removes (partially written) handoff directory of given solve task, used when simulation is terminated"""
+    remove_handoff(do_settings.OEMOF_HANDOFF_DIR / task_id)
+    remove_handoff(do_settings.OEMOF_HANDOFF_DIR / f".{task_id}.tmp")
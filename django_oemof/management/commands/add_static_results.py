@@ -25,11 +25,8 @@ class Command(BaseCommand):
             simulation.save()
             for resource in package.resources:
                 df = resource.to_pandas()
-                result = Result(
-                    simulation=simulation,
-                    name=resource.name,
-                    data_type="series" if len(df.columns) == 2 else "frame",
-                    data=df.to_json(orient="table"),
-                )
+                result = Result(simulation=simulation, name=resource.name)
+                result.set_result(df)
+                result.data_type = "series" if len(df.columns) == 2 else "frame"
                 result.save()
             self.stdout.write(self.style.SUCCESS(f"Successfully created results for scenario '{scenario}'"))
@@ -0,0 +1,67 @@
+import json
+import pathlib
+
+from django.core.management.base import BaseCommand, CommandError
+
+from django_oemof import benchmarks, solvers
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmarks build, solve, store, restore and postprocessing of scenarios. "
+        "Results are written as JSON and can be compared against a baseline. "
+        "If given baseline does not exist yet, results are written as new baseline."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "scenarios", nargs="*", type=str, default=list(benchmarks.DEFAULT_SCENARIOS), help="Scenarios to benchmark"
+        )
+        parser.add_argument("--repeat", type=int, default=3, help="Number of runs per scenario")
+        parser.add_argument(
+            "--calculations",
+            nargs="+",
+            default=list(benchmarks.DEFAULT_CALCULATIONS),
+            help="Calculations used to benchmark postprocessing",
+        )
+        parser.add_argument("--solver", type=str, default=None, help="Solver used for all scenarios")
+        parser.add_argument("--output", type=pathlib.Path, default=None, help="Write results to given JSON file")
+        parser.add_argument(
+            "--baseline",
+            type=pathlib.Path,
+            default=None,
+            help="Compare results to baseline JSON (written on first run)",
+        )
+        parser.add_argument("--tolerance", type=float, default=0.2, help="Tolerated relative slowdown to baseline")
+
+    def handle(self, *args, **options):
+        if options["solver"]:
+            solvers.register_solver(solvers.Solver(options["solver"]))
+        benchmark_results = benchmarks.run_benchmarks(
+            options["scenarios"], options["calculations"], repeat=options["repeat"]
+        )
+        regressions = []
+        if options["baseline"] and not options["baseline"].exists():
+            options["baseline"].parent.mkdir(parents=True, exist_ok=True)
+            options["baseline"].write_text(json.dumps(benchmark_results, indent=2), encoding="utf-8")
+            self.stdout.write(
+                self.style.WARNING(
+                    f"Baseline '{options['baseline']}' did not exist, wrote current results as baseline."
+                )
+            )
+        elif options["baseline"]:
+            baseline = json.loads(options["baseline"].read_text(encoding="utf-8"))
+            regressions = benchmarks.compare_to_baseline(benchmark_results, baseline, options["tolerance"])
+            benchmark_results["regressions"] = regressions
+
+        output = json.dumps(benchmark_results, indent=2)
+        if options["output"]:
+            options["output"].write_text(output, encoding="utf-8")
+            self.stdout.write(self.style.SUCCESS(f"Wrote benchmark results to '{options['output']}'."))
+        else:
+            self.stdout.write(output)
+
+        if regressions:
+            for regression in regressions:
+                self.stdout.write(self.style.ERROR(f"Regression: {regression}"))
+            raise CommandError(f"Found {len(regressions)} performance regressions compared to baseline.")
@@ -0,0 +1,30 @@
+from django.core.management.base import BaseCommand
+
+from django_oemof import settings
+from django_oemof.models import Result
+
+
+class Command(BaseCommand):
+    help = "Converts encoding of stored postprocessing results (i.e. from JSON to Arrow)."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--encoding",
+            choices=["json", "arrow"],
+            default=settings.DJANGO_OEMOF_RESULT_ENCODING,
+            help="Target encoding of results",
+        )
+        parser.add_argument("--batch-size", type=int, default=100, help="Number of results loaded at once")
+
+    def handle(self, *args, **options):
+        encoding = options["encoding"]
+        results = Result.objects.exclude(encoding=encoding)
+        converted = 0
+        for result in results.iterator(chunk_size=options["batch_size"]):
+            result.set_result(result.get_result(), encoding)
+            if result.encoding != encoding:
+                self.stdout.write(self.style.WARNING(f"Could not convert result #{result.id} into {encoding}."))
+                continue
+            result.save(update_fields=["encoding", "data", "binary_data"])
+            converted += 1
+        self.stdout.write(self.style.SUCCESS(f"Converted {converted} results into {encoding}."))
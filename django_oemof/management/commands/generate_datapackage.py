@@ -0,0 +1,40 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from django_oemof import generator, settings
+
+
+class Command(BaseCommand):
+    help = (
+        "Generates synthetic oemof.tabular datapackage with given number of components and timesteps in oemof folder. "
+        "Generated datapackages can be simulated as scenario, i.e. for load and scaling tests."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("name", type=str, help="Name of scenario (datapackage folder in oemof folder)")
+        parser.add_argument("--buses", type=int, default=2, help="Number of buses (each bus holds one load)")
+        parser.add_argument("--volatiles", type=int, default=2, help="Number of volatile generators")
+        parser.add_argument("--dispatchables", type=int, default=2, help="Number of dispatchable generators")
+        parser.add_argument("--storages", type=int, default=1, help="Number of storages")
+        parser.add_argument("--links", type=int, default=1, help="Number of links between buses")
+        parser.add_argument("--timesteps", type=int, default=24, help="Number of hourly timesteps")
+        parser.add_argument("--seed", type=int, default=0, help="Seed used for random values and profiles")
+        parser.add_argument("--overwrite", action="store_true", help="Overwrite existing datapackage")
+
+    def handle(self, *args, **options):
+        path = settings.OEMOF_DIR / options["name"]
+        if path.exists() and not options["overwrite"]:
+            raise CommandError(f"Datapackage '{path}' already exists. Use '--overwrite' to replace it.")
+        try:
+            datapackage = generator.generate_datapackage(
+                path,
+                buses=options["buses"],
+                volatiles=options["volatiles"],
+                dispatchables=options["dispatchables"],
+                storages=options["storages"],
+                links=options["links"],
+                timesteps=options["timesteps"],
+                seed=options["seed"],
+            )
+        except ValueError as error:
+            raise CommandError(str(error)) from error
+        self.stdout.write(self.style.SUCCESS(f"Generated datapackage '{datapackage}'."))
@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+
+from django_oemof.models import OemofData
+
+
+class Command(BaseCommand):
+    help = "Packs sequences of existing oemof datasets into columnar binary blocks and removes related sequence rows."
+
+    def add_arguments(self, parser):
+        parser.add_argument("datasets", nargs="*", type=int, default=None, help="IDs of datasets to pack")
+
+    def handle(self, *args, **options):
+        oemof_data = OemofData.objects.filter(sequence_columns__isnull=True)
+        if options["datasets"]:
+            oemof_data = oemof_data.filter(data_input__in=options["datasets"]) | oemof_data.filter(
+                data_result__in=options["datasets"]
+            )
+        for data in oemof_data.distinct():
+            packed = data.pack_sequences()
+            self.stdout.write(self.style.SUCCESS(f"Packed {packed} sequences of oemof data #{data.id}."))
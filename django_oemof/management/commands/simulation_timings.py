@@ -0,0 +1,33 @@
+import json
+
+from django.core.management.base import BaseCommand
+
+from django_oemof.models import Simulation
+from django_oemof.profiling import aggregate_timings
+
+
+class Command(BaseCommand):
+    help = "Aggregates stored stage timings (seconds and peak RSS) of simulations into percentiles per scenario."
+
+    def add_arguments(self, parser):
+        parser.add_argument("scenarios", nargs="*", type=str, default=None, help="Scenarios to aggregate")
+        parser.add_argument("--json", action="store_true", help="Output aggregated timings as JSON")
+
+    def handle(self, *args, **options):
+        simulations = Simulation.objects.filter(timings__isnull=False)
+        if options["scenarios"]:
+            simulations = simulations.filter(scenario__in=options["scenarios"])
+        aggregated = aggregate_timings(simulations.values_list("scenario", "timings").iterator())
+        if options["json"]:
+            self.stdout.write(json.dumps(aggregated, indent=2))
+            return
+        for scenario, scenario_timings in aggregated.items():
+            self.stdout.write(self.style.SUCCESS(f"Scenario '{scenario}' ({scenario_timings['runs']} runs):"))
+            for stage, values in scenario_timings["stages"].items():
+                seconds = values["seconds"]
+                line = f"  {stage:<25} p50={seconds['p50']:.3f}s p90={seconds['p90']:.3f}s max={seconds['max']:.3f}s"
+                if "peak_rss_mb" in values:
+                    line += f" peak_rss_max={values['peak_rss_mb']['max']:.1f}MB"
+                if "rss_delta_mb" in values:
+                    line += f" rss_delta_p50={values['rss_delta_mb']['p50']:.1f}MB"
+                self.stdout.write(line)
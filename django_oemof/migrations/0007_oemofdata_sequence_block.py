@@ -0,0 +1,23 @@
+# Generated by Django 5.0.14 on 2026-10-18 12:21
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('django_oemof', '0006_oemofdataset_meta_results'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='oemofdata',
+            name='sequence_block',
+            field=models.BinaryField(null=True),
+        ),
+        migrations.AddField(
+            model_name='oemofdata',
+            name='sequence_columns',
+            field=models.JSONField(null=True),
+        ),
+    ]
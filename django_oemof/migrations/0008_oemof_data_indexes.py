@@ -0,0 +1,21 @@
+# Generated by Django 5.0.14 on 2026-10-18 12:22
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('django_oemof', '0007_oemofdata_sequence_block'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='oemofscalar',
+            index=models.Index(fields=['from_node', 'to_node', 'attribute'], name='django_oemo_from_no_2ea221_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='oemofsequence',
+            index=models.Index(fields=['from_node', 'to_node', 'attribute'], name='django_oemo_from_no_d0978e_idx'),
+        ),
+    ]
@@ -0,0 +1,62 @@
+# Generated by Django 5.0.14 on 2026-10-18 12:25
+
+import hashlib
+import json
+import numbers
+
+from django.db import migrations, models
+
+
+# Copy of `models.normalize_parameters` and `models.get_parameters_hash` at time of migration,
+# thus, later changes of the hash do not alter this migration
+def normalize_parameters(parameters):
+    """Normalizes parameters recursively (keys as str, integral numbers as int, other numbers as float)"""
+    if isinstance(parameters, dict):
+        return {str(key): normalize_parameters(value) for key, value in parameters.items()}
+    if isinstance(parameters, (list, tuple)):
+        return [normalize_parameters(value) for value in parameters]
+    if isinstance(parameters, bool) or not isinstance(parameters, numbers.Real):
+        return parameters
+    if isinstance(parameters, numbers.Integral):
+        return int(parameters)
+    value = float(parameters)
+    return int(value) if value.is_integer() else value
+
+
+def get_parameters_hash(parameters):
+    """Returns canonical hash of simulation parameters"""
+    canonical_parameters = json.dumps(normalize_parameters(parameters), sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(canonical_parameters.encode()).hexdigest()
+
+
+def set_parameters_hash(apps, schema_editor):
+    """Sets parameters hash for existing simulations; duplicates keep empty hash to satisfy unique constraint"""
+    Simulation = apps.get_model("django_oemof", "Simulation")
+    stored = set()
+    for simulation in Simulation.objects.order_by("id"):
+        parameters_hash = get_parameters_hash(simulation.parameters)
+        if (simulation.scenario, parameters_hash) in stored:
+            continue
+        stored.add((simulation.scenario, parameters_hash))
+        simulation.parameters_hash = parameters_hash
+        simulation.save(update_fields=["parameters_hash"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('django_oemof', '0008_oemof_data_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='simulation',
+            name='parameters_hash',
+            field=models.CharField(editable=False, max_length=64, null=True),
+        ),
+        migrations.RunPython(set_parameters_hash, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='simulation',
+            constraint=models.UniqueConstraint(fields=('scenario', 'parameters_hash'), name='unique_simulation_parameters'),
+        ),
+    ]
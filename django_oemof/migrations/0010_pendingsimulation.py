@@ -0,0 +1,27 @@
+# Generated by Django 5.0.14 on 2026-10-18 12:26
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('django_oemof', '0009_simulation_parameters_hash'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PendingSimulation',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('scenario', models.CharField(max_length=255)),
+                ('parameters_hash', models.CharField(max_length=64)),
+                ('task_id', models.CharField(max_length=255, unique=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='pendingsimulation',
+            constraint=models.UniqueConstraint(fields=('scenario', 'parameters_hash'), name='unique_pending_simulation'),
+        ),
+    ]
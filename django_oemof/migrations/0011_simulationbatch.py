@@ -0,0 +1,26 @@
+# Generated by Django 5.0.14 on 2026-10-18 12:30
+
+import django.contrib.postgres.fields
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('django_oemof', '0010_pendingsimulation'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SimulationBatch',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('scenario', models.CharField(max_length=255)),
+                ('parameters', models.JSONField()),
+                ('parameters_hashes', django.contrib.postgres.fields.ArrayField(base_field=models.CharField(max_length=64), size=None)),
+                ('task_ids', models.JSONField(default=dict)),
+                ('calculations', django.contrib.postgres.fields.ArrayField(base_field=models.CharField(max_length=255), blank=True, default=list, size=None)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+    ]
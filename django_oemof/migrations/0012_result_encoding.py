@@ -0,0 +1,28 @@
+# Generated by Django 5.0.14 on 2026-10-18 12:32
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('django_oemof', '0011_simulationbatch'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='result',
+            name='binary_data',
+            field=models.BinaryField(null=True),
+        ),
+        migrations.AddField(
+            model_name='result',
+            name='encoding',
+            field=models.CharField(choices=[('json', 'json'), ('arrow', 'arrow')], default='json', max_length=5),
+        ),
+        migrations.AlterField(
+            model_name='result',
+            name='data',
+            field=models.JSONField(null=True),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.0.14 on 2026-10-18 12:37
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('django_oemof', '0012_result_encoding'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='oemofdataset',
+            name='flow_totals',
+            field=models.JSONField(null=True),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.0.14 on 2026-10-18 12:38
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('django_oemof', '0013_oemofdataset_flow_totals'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='simulation',
+            name='timings',
+            field=models.JSONField(null=True),
+        ),
+    ]
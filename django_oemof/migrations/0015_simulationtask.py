@@ -0,0 +1,32 @@
+# Generated by Django 5.0.14 on 2026-10-18 12:45
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('django_oemof', '0014_simulation_timings'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SimulationTask',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('task_id', models.CharField(max_length=255, unique=True)),
+                ('scenario', models.CharField(max_length=255)),
+                ('parameters_hash', models.CharField(max_length=64)),
+                ('status', models.CharField(choices=[('pending', 'pending'), ('running', 'running'), ('finished', 'finished'), ('infeasible', 'infeasible'), ('failed', 'failed'), ('revoked', 'revoked')], default='pending', max_length=10)),
+                ('stage', models.CharField(max_length=32, null=True)),
+                ('error', models.TextField(null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('simulation', models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, to='django_oemof.simulation')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['scenario', 'parameters_hash'], name='django_oemo_scenari_0b444a_idx')],
+            },
+        ),
+    ]
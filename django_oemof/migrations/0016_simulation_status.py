@@ -0,0 +1,27 @@
+# Generated by Django 5.0.14 on 2026-10-18 13:07
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("django_oemof", "0015_simulationtask"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="simulation",
+            name="gap",
+            field=models.FloatField(null=True),
+        ),
+        migrations.AddField(
+            model_name="simulation",
+            name="status",
+            field=models.CharField(
+                choices=[("optimal", "optimal"), ("time_limit", "time_limit"), ("feasible", "feasible")],
+                default="optimal",
+                max_length=10,
+            ),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.0.14 on 2026-10-18 13:49
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("django_oemof", "0016_simulation_status"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="pendingsimulation",
+            name="calculations",
+            field=models.JSONField(default=list),
+        ),
+    ]
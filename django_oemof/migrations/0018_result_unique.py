@@ -0,0 +1,26 @@
+# Generated by Django 5.0.14 on 2026-10-18 13:49
+
+from django.db import migrations, models
+from django.db.models import Min
+
+
+def remove_duplicate_results(apps, schema_editor):
+    """Removes duplicate results of same simulation and name (stored by concurrent requests); first result is kept"""
+    Result = apps.get_model("django_oemof", "Result")
+    kept_ids = Result.objects.values("simulation", "name").annotate(kept_id=Min("id")).values("kept_id")
+    Result.objects.exclude(id__in=kept_ids).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("django_oemof", "0017_pendingsimulation_calculations"),
+    ]
+
+    operations = [
+        migrations.RunPython(remove_duplicate_results, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name="result",
+            constraint=models.UniqueConstraint(fields=("simulation", "name"), name="unique_simulation_result"),
+        ),
+    ]
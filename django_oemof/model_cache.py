@@ -0,0 +1,230 @@
+"""
+Module to keep solph models resident in worker and to re-solve them with changed parameters
+
+Models are cached per scenario and structural signature of the ES. Signature covers all data of the ES which is used
+to build the model, except for attributes of flows which end up as variable bounds or objective coefficients only
+(see `UPDATABLE_FLOW_ATTRIBUTES`). If a model with same signature is cached, these attributes are transferred to the
+cached model, bounds of flow variables are reset and objective is rebuilt; otherwise, model is built from scratch.
+Rebuilding the objective relies on private API of oemof.solph, thus, models are only cached for tested versions of
+oemof.solph (see `SUPPORTED_SOLPH_VERSIONS`).
+"""
+
+import dataclasses
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Optional
+
+import pandas
+from oemof import solph
+
+from . import settings as do_settings
+
+# Flow attributes which are applied to cached models by resetting variable bounds and rebuilding objective
+UPDATABLE_FLOW_ATTRIBUTES = ("nominal_value", "variable_costs", "max", "min", "fix")
+
+# Versions of oemof.solph (prefixes) whose `Model._add_objective(update=True)` is used to rebuild objective
+SUPPORTED_SOLPH_VERSIONS = ("0.5.",)
+
+# Attributes of parameters which are excluded (same as in `simulation.simulate_energysystem`)
+EXCLUDED_ATTRIBUTES = ["bus", "from_bus", "to_bus", "from_node", "to_node"]
+
+
+def is_updatable_flow(flow: solph.flows.Flow) -> bool:
+    """
+    Returns True if attributes of flow are only used as variable bounds or objective coefficients
+
+    Flows holding investments, nonconvex settings, full load times or gradient limits use their nominal value
+    in constraints, thus, they cannot be updated in cached models.
+    """
+    return (
+        flow.investment is None
+        and flow.nonconvex is None
+        and flow.full_load_time_max is None
+        and flow.full_load_time_min is None
+        and flow.positive_gradient_limit[0] is None
+        and flow.negative_gradient_limit[0] is None
+    )
+
+
+def is_supported_solph_version() -> bool:
+    """Returns True if cached models can be updated using installed version of oemof.solph"""
+    return solph.__version__.startswith(SUPPORTED_SOLPH_VERSIONS)
+
+
+def get_label_key(key: tuple) -> tuple:
+    """Returns key of node or flow with node labels instead of nodes"""
+    return tuple(None if node is None else str(node.label) for node in key)
+
+
+def get_structural_signature(energysystem: solph.EnergySystem) -> Optional[str]:
+    """
+    Returns signature of all data of ES used to build the model except for updatable flow attributes
+
+    Fields of oemof.tabular facades are skipped, as facades pass them to solph attributes (which are covered) on update.
+
+    Parameters
+    ----------
+    energysystem: solph.EnergySystem
+        Adapted energysystem
+
+    Returns
+    -------
+    Optional[str]
+        SHA256 hex digest or None if ES cannot be updated in cached models (multi-period ES)
+    """
+    if energysystem.periods is not None:
+        return None
+    signature = hashlib.sha256()
+    signature.update(pandas.util.hash_pandas_object(pandas.Series(energysystem.timeindex)).values.tobytes())
+    signature.update(repr(list(energysystem.timeincrement)).encode())
+    parameters = solph.processing.parameter_as_dict(energysystem, exclude_attrs=EXCLUDED_ATTRIBUTES)
+    for key, data in sorted(parameters.items(), key=lambda item: repr(get_label_key(item[0]))):
+        if key[1] is None:
+            excluded = {field.name for field in dataclasses.fields(key[0])} if dataclasses.is_dataclass(key[0]) else ()
+            signature.update(f"{get_label_key(key)}-{type(key[0]).__qualname__}".encode())
+        else:
+            flow = energysystem.flows()[key]
+            excluded = UPDATABLE_FLOW_ATTRIBUTES if is_updatable_flow(flow) else ()
+            signature.update(repr(get_label_key(key)).encode())
+        scalars = {name: value for name, value in data["scalars"].items() if name not in excluded}
+        signature.update(repr(sorted(scalars.items())).encode())
+        sequences = data["sequences"].drop(columns=[name for name in excluded if name in data["sequences"]])
+        if not sequences.empty:
+            sequences = sequences.reindex(sorted(sequences.columns), axis=1)
+            signature.update(repr(list(sequences.columns)).encode())
+            signature.update(pandas.util.hash_pandas_object(sequences, index=False).values.tobytes())
+    return signature.hexdigest()
+
+
+def set_flow_bounds(model: solph.Model, source, target):
+    """Sets bounds of flow variable (or fixes it) as done by `solph.Model` when building the model"""
+    flow = model.flows[source, target]
+    unidirectional = (source, target) in model.UNIDIRECTIONAL_FLOWS
+    fixed = flow.nominal_value is not None and flow.fix[model.TIMESTEPS.at(1)] is not None
+    for period, timestep in model.TIMEINDEX:
+        variable = model.flow[source, target, period, timestep]
+        if fixed:
+            variable.fix(flow.fix[timestep] * flow.nominal_value)
+            continue
+        variable.unfix()
+        if flow.nominal_value is None:
+            variable.setub(None)
+            variable.setlb(0 if unidirectional else None)
+        else:
+            variable.setub(flow.max[timestep] * flow.nominal_value)
+            variable.setlb(flow.min[timestep] * flow.nominal_value)
+
+
+@contextmanager
+def silenced_pyomo_warnings():
+    """
+    Silences warnings of pyomo about replaced components
+
+    Rebuilding the objective replaces objective expressions of blocks and re-applied model hooks replace their
+    components, which pyomo reports as warnings.
+    """
+    logger = logging.getLogger("pyomo.core")
+    level = logger.level
+    logger.setLevel(logging.ERROR)
+    try:
+        yield
+    finally:
+        logger.setLevel(level)
+
+
+def update_model(model: solph.Model, energysystem: solph.EnergySystem):
+    """
+    Transfers updatable flow attributes of given ES to cached model, resets variable bounds and rebuilds objective
+
+    Parameters
+    ----------
+    model: solph.Model
+        Cached model built from ES with same structural signature
+    energysystem: solph.EnergySystem
+        Adapted energysystem holding parameters of current simulation
+    """
+    flows = {get_label_key(key): flow for key, flow in energysystem.flows().items()}
+    for (source, target), flow in model.flows.items():
+        if not is_updatable_flow(flow):
+            continue
+        adapted_flow = flows[get_label_key((source, target))]
+        for attribute in UPDATABLE_FLOW_ATTRIBUTES:
+            setattr(flow, attribute, getattr(adapted_flow, attribute))
+        set_flow_bounds(model, source, target)
+    with silenced_pyomo_warnings():
+        model._add_objective(update=True)  # pylint: disable=W0212
+
+
+class ModelCache:
+    """
+    Bounded in-process LRU cache of solved models keyed by scenario and structural signature of ES
+
+    Models are checked out while being updated and solved and checked in afterwards, thus, a cached model is never
+    used by two simulations at the same time.
+    """
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._models = OrderedDict()
+        self._lock = threading.Lock()
+
+    def checkout(self, scenario: str, energysystem: solph.EnergySystem) -> tuple[Optional[solph.Model], Optional[str]]:
+        """
+        Returns cached model updated to given ES (or None if not cached) and structural signature of ES
+
+        Signature is None if cache is disabled or ES cannot be updated in cached models.
+        """
+        if self.max_entries <= 0:
+            return None, None
+        if not is_supported_solph_version():
+            logging.warning(
+                f"Model cache does not support oemof.solph {solph.__version__} "
+                f"(supported: {', '.join(SUPPORTED_SOLPH_VERSIONS)}). Models are not cached."
+            )
+            return None, None
+        signature = get_structural_signature(energysystem)
+        if signature is None:
+            return None, None
+        with self._lock:
+            model = self._models.pop((scenario, signature), None)
+            if model is None:
+                self.misses += 1
+                return None, signature
+            self.hits += 1
+        update_model(model, energysystem)
+        logging.info(f"Reusing cached model for {scenario=}.")
+        return model, signature
+
+    def checkin(self, scenario: str, signature: str, model: solph.Model):
+        """Puts model into cache; least recently used models are evicted"""
+        with self._lock:
+            self._models[(scenario, signature)] = model
+            self._models.move_to_end((scenario, signature))
+            while len(self._models) > self.max_entries:
+                (evicted_scenario, _), _ = self._models.popitem(last=False)
+                logging.debug(f"Evicted model of scenario '{evicted_scenario}' from cache.")
+
+    def invalidate(self, scenario: Optional[str] = None):
+        """Removes cached models of given scenario; clears cache if no scenario is given"""
+        with self._lock:
+            for key in list(self._models):
+                if scenario is None or key[0] == scenario:
+                    del self._models[key]
+
+    def info(self) -> dict:
+        """Returns hit and miss counters and current size of cache"""
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "entries": len(self._models),
+                "max_entries": self.max_entries,
+            }
+
+
+MODEL_CACHE = ModelCache(max_entries=do_settings.DJANGO_OEMOF_MODEL_CACHE_SIZE)
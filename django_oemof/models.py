@@ -1,18 +1,252 @@
 """Module holds models to store and restore oemof results in/from DB"""
 
+import hashlib
+import io
+import json
+import logging
+import numbers
+from typing import Any, Iterable, Optional, Union
+
+import numpy
 import pandas
 from django.contrib.postgres.fields import ArrayField
-from django.db import models
+from django.db import models, transaction
 from oemof.network.network import Node
 from oemof.solph.processing import convert_keys_to_strings
 
+from . import columnar
+from . import settings as do_settings
+
+TYPE_CONVERSIONS = {
+    "str": str,
+    "float": float,
+    "float64": float,
+    "int": int,
+    "int64": int,
+    "bool": bool,
+}
+
+
+def normalize_parameters(parameters: Any) -> Any:
+    """Normalizes parameters recursively (keys as str, integral numbers as int, other numbers as float)"""
+    if isinstance(parameters, dict):
+        return {str(key): normalize_parameters(value) for key, value in parameters.items()}
+    if isinstance(parameters, (list, tuple)):
+        return [normalize_parameters(value) for value in parameters]
+    if isinstance(parameters, bool) or not isinstance(parameters, numbers.Real):
+        return parameters
+    if isinstance(parameters, numbers.Integral):
+        return int(parameters)
+    value = float(parameters)
+    return int(value) if value.is_integer() else value
+
+
+def get_parameters_hash(parameters: Any) -> str:
+    """
+    Returns canonical hash of simulation parameters
+
+    Parameters are normalized and dumped with sorted keys, thus, key order and number format
+    (i.e. 5 vs. 5.0) do not change resulting hash.
+
+    Parameters
+    ----------
+    parameters: Any
+        JSON-able simulation parameters
+
+    Returns
+    -------
+    str
+        SHA256 hex digest
+    """
+    canonical_parameters = json.dumps(normalize_parameters(parameters), sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(canonical_parameters.encode()).hexdigest()
+
 
 class Simulation(models.Model):
-    """Holds information about simulation input parameters and related oemof results"""
+    """
+    Holds information about simulation input parameters and related oemof results
+
+    Status tells whether results are optimal or an incumbent solution, which has been found before solver stopped
+    (i.e. at time limit); in the latter case, `gap` holds relative gap of incumbent.
+    """
+
+    STATUSES = ("optimal", "time_limit", "feasible")
 
     scenario = models.CharField(max_length=255)
     parameters = models.JSONField()
+    parameters_hash = models.CharField(max_length=64, null=True, editable=False)
     dataset = models.ForeignKey("OemofDataset", on_delete=models.CASCADE, null=True)
+    timings = models.JSONField(null=True)
+    status = models.CharField(max_length=10, choices=[(status, status) for status in STATUSES], default="optimal")
+    gap = models.FloatField(null=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["scenario", "parameters_hash"], name="unique_simulation_parameters")
+        ]
+
+    def save(self, *args, **kwargs):
+        """Sets canonical parameters hash before saving"""
+        self.parameters_hash = get_parameters_hash(self.parameters)
+        super().save(*args, **kwargs)
+
+
+class PendingSimulation(models.Model):
+    """
+    Holds queued or running simulation tasks in order to prevent simulating identical requests in parallel
+
+    `calculations` holds calculations requested by identical requests, which have been served by the pending task
+    (see `simulation.add_pending_calculations`).
+    """
+
+    scenario = models.CharField(max_length=255)
+    parameters_hash = models.CharField(max_length=64)
+    task_id = models.CharField(max_length=255, unique=True)
+    calculations = models.JSONField(default=list)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["scenario", "parameters_hash"], name="unique_pending_simulation")
+        ]
+
+
+class SimulationTask(models.Model):
+    """
+    Holds status and progress stage of simulation tasks
+
+    Rows are updated by simulation task and are used to notify clients (long-polling or server-sent events)
+    without querying celery result backend.
+    """
+
+    STATUSES = ("pending", "running", "finished", "infeasible", "failed", "revoked")
+    FINAL_STATUSES = ("finished", "infeasible", "failed", "revoked")
+
+    task_id = models.CharField(max_length=255, unique=True)
+    scenario = models.CharField(max_length=255)
+    parameters_hash = models.CharField(max_length=64)
+    status = models.CharField(max_length=10, choices=[(status, status) for status in STATUSES], default="pending")
+    stage = models.CharField(max_length=32, null=True)
+    simulation = models.ForeignKey("Simulation", on_delete=models.SET_NULL, null=True)
+    error = models.TextField(null=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [models.Index(fields=["scenario", "parameters_hash"])]
+
+    def to_dict(self) -> dict:
+        """Returns status of task as JSON-able dict"""
+        return {
+            "task_id": self.task_id,
+            "status": self.status,
+            "stage": self.stage,
+            "simulation_id": self.simulation_id,
+            "error": self.error,
+            "updated_at": self.updated_at.isoformat(),
+        }
+
+
+class SimulationBatch(models.Model):
+    """Holds a batch of simulations (i.e. a parameter sweep) of one scenario"""
+
+    scenario = models.CharField(max_length=255)
+    parameters = models.JSONField()
+    parameters_hashes = ArrayField(models.CharField(max_length=64))
+    task_ids = models.JSONField(default=dict)
+    calculations = ArrayField(models.CharField(max_length=255), default=list, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    @property
+    def simulations(self) -> models.QuerySet:
+        """Returns stored simulations of batch members"""
+        # pylint: disable=E1101
+        return Simulation.objects.filter(scenario=self.scenario, parameters_hash__in=self.parameters_hashes)
+
+    def get_progress(self) -> dict:
+        """
+        Returns progress of batch
+
+        Members without stored simulation and without pending simulation task are counted as failed
+        (simulation was infeasible, raised an error or has been terminated).
+
+        Returns
+        -------
+        dict
+            Holding number of total, finished and failed members and simulation IDs (None if not available)
+            in order of batch parameters
+        """
+        simulation_ids = dict(self.simulations.values_list("parameters_hash", "id"))
+        # pylint: disable=E1101
+        pending = set(
+            PendingSimulation.objects.filter(
+                scenario=self.scenario, parameters_hash__in=self.parameters_hashes
+            ).values_list("parameters_hash", flat=True)
+        )
+        failed = [
+            parameters_hash
+            for parameters_hash in self.parameters_hashes
+            if parameters_hash not in simulation_ids and parameters_hash not in pending
+        ]
+        return {
+            "total": len(self.parameters_hashes),
+            "finished": len(simulation_ids) + len(failed),
+            "failed": len(failed),
+            "simulation_ids": [simulation_ids.get(parameters_hash) for parameters_hash in self.parameters_hashes],
+        }
+
+
+def serialize_data(data: dict) -> dict:
+    """
+    Returns oemof data (with nodes as str) as flat scalar and sequence entries, as stored in DB
+
+    Scalars are returned as [from_node, to_node, attribute, value, type] with values converted to str
+    (scalars holding nodes are skipped), sequences are returned as (from_node, to_node, attribute, sequence).
+    """
+    scalars = []
+    sequences = []
+    for (from_node, to_node), sc_sq_dict in data.items():
+        for key, value in sc_sq_dict["scalars"].items():
+            if isinstance(value, Node):
+                continue
+            scalars.append([from_node, to_node, key, str(value), type(value).__name__])
+        for key, series in sc_sq_dict["sequences"].items():
+            sequences.append((from_node, to_node, key, series))
+    return {"scalars": scalars, "sequences": sequences}
+
+
+def calculate_flow_totals(result_data: dict) -> list[dict]:
+    """
+    Calculates total flow per edge from oemof results
+
+    If DJANGO_OEMOF_FLOW_TOTALS_PERIOD is set (pandas offset alias, i.e. "M") and flow sequences are indexed by time,
+    flows are additionally summed per period.
+
+    Parameters
+    ----------
+    result_data: dict
+        Oemof results (or restored results) with nodes as str
+
+    Returns
+    -------
+    list[dict]
+        Holding source, target, total value and (optionally) values per period for each edge with flow sequence
+    """
+    period = do_settings.DJANGO_OEMOF_FLOW_TOTALS_PERIOD
+    flow_totals = []
+    for (from_node, to_node), data in result_data.items():
+        if "flow" not in data["sequences"]:
+            continue
+        flow = data["sequences"]["flow"]
+        flow_total = {
+            "source": from_node,
+            "target": to_node,
+            "value": float(numpy.nansum(numpy.asarray(flow, dtype=float))),
+        }
+        if period and isinstance(flow, pandas.Series) and isinstance(flow.index, pandas.DatetimeIndex):
+            flow_total["periods"] = {str(label): float(value) for label, value in flow.resample(period).sum().items()}
+        flow_totals.append(flow_total)
+    return flow_totals
 
 
 class OemofDataset(models.Model):
@@ -21,8 +255,8 @@ class OemofDataset(models.Model):
     input = models.ForeignKey("OemofData", on_delete=models.CASCADE, related_name="data_input")  # noqa: A003
     result = models.ForeignKey("OemofData", on_delete=models.CASCADE, related_name="data_result")
     meta_results = models.JSONField()
+    flow_totals = models.JSONField(null=True)
 
-    # pylint: disable=R0914
     @classmethod
     def store_results(cls, input_data, result_data, meta_results):
         """
@@ -33,6 +267,11 @@ class OemofDataset(models.Model):
         object representing either input or result data. At last, both OemofData
         objects are connected to OemofInputResult object and resulting index is
         returned.
+        All rows (including M2M relations) are inserted via bulk inserts within a single transaction.
+        Total flows per edge are precomputed and stored in field `flow_totals`.
+        Number of written rows is available via attribute `row_counts` of returned dataset.
+        If setting `DJANGO_OEMOF_SEQUENCE_STORAGE` is set to "columnar", sequences are not stored as
+        OemofSequence rows, but packed into a single binary block per OemofData instead.
 
         Parameters
         ----------
@@ -53,85 +292,214 @@ class OemofDataset(models.Model):
             input_data = convert_keys_to_strings(input_data)
         if not isinstance(next(iter(result_data)), str):
             result_data = convert_keys_to_strings(result_data)
-        oemof_dataset = OemofDataset()
-        oemof_dataset.meta_results = meta_results
-        for input_result_attr, data in (("input", input_data), ("result", result_data)):
-            scalars = []
-            sequences = []
-            for (from_node, to_node), sc_sq_dict in data.items():
-                for key, value in sc_sq_dict["scalars"].items():
-                    if isinstance(value, Node):
+        return cls.store_serialized_results(
+            serialize_data(input_data), serialize_data(result_data), meta_results, calculate_flow_totals(result_data)
+        )
+
+    # pylint: disable=R0914
+    @classmethod
+    def store_serialized_results(
+        cls, input_data: dict, result_data: dict, meta_results: dict, flow_totals: Optional[list[dict]]
+    ) -> "OemofDataset":
+        """
+        Stores serialized inputs and results (see `serialize_data`) into DB
+
+        Used by `store_results` and by store stage of simulation pipeline, which loads serialized data from
+        handoff directory (see `django_oemof.handoff`).
+
+        Parameters
+        ----------
+        input_data: dict
+            Serialized input data as returned by `serialize_data`
+        result_data: dict
+            Serialized result data as returned by `serialize_data`
+        meta_results: dict
+            Meta results of simulation
+        flow_totals: Optional[list[dict]]
+            Total flows per edge as returned by `calculate_flow_totals`
+
+        Returns
+        -------
+        OemofDataset: Instance of created OemofDataset
+        """
+        batch_size = do_settings.DJANGO_OEMOF_BULK_BATCH_SIZE
+        pack_sequences = do_settings.DJANGO_OEMOF_SEQUENCE_STORAGE == "columnar"
+        row_counts = {
+            "scalars": 0,
+            "sequences": 0,
+            "scalar_relations": 0,
+            "sequence_relations": 0,
+            "packed_sequences": 0,
+        }
+        with transaction.atomic():
+            oemof_dataset = OemofDataset()
+            oemof_dataset.meta_results = meta_results
+            oemof_dataset.flow_totals = flow_totals
+            for input_result_attr, data in (("input", input_data), ("result", result_data)):
+                scalars = [
+                    OemofScalar(from_node=from_node, to_node=to_node, attribute=key, value=value, type=value_type)
+                    for from_node, to_node, key, value, value_type in data["scalars"]
+                ]
+                sequences = []
+                packed_sequences = []
+                for from_node, to_node, key, series in data["sequences"]:
+                    if pack_sequences:
+                        packed_sequences.append((from_node, to_node, key, series))
                         continue
-                    scalar = OemofScalar(
-                        from_node=from_node, to_node=to_node, attribute=key, value=value, type=type(value).__name__
-                    )
-                    scalar.save()
-                    scalars.append(scalar)
-                for key, series in sc_sq_dict["sequences"].items():
                     list_type = "list"
                     if isinstance(series, pandas.Series):
                         series = series.values.tolist()
                         list_type = "series"
-                    sequence = OemofSequence(
-                        from_node=from_node, to_node=to_node, attribute=key, value=series, type=list_type
+                    sequences.append(
+                        OemofSequence(from_node=from_node, to_node=to_node, attribute=key, value=series, type=list_type)
                     )
-                    sequence.save()
-                    sequences.append(sequence)
-            oemof_data = OemofData()
-            oemof_data.save()
-            oemof_data.scalars.set(scalars)  # pylint: disable=E1101
-            oemof_data.sequences.set(sequences)  # pylint: disable=E1101
-            setattr(oemof_dataset, input_result_attr, oemof_data)
-        oemof_dataset.save()
+                # pylint: disable=E1101
+                scalars = OemofScalar.objects.bulk_create(scalars, batch_size=batch_size)
+                sequences = OemofSequence.objects.bulk_create(sequences, batch_size=batch_size)
+                oemof_data = OemofData()
+                if pack_sequences:
+                    oemof_data.sequence_block, oemof_data.sequence_columns = columnar.pack_sequences(packed_sequences)
+                oemof_data.save()
+                scalar_relations = OemofData.scalars.through.objects.bulk_create(
+                    [
+                        OemofData.scalars.through(oemofdata_id=oemof_data.id, oemofscalar_id=scalar.id)
+                        for scalar in scalars
+                    ],
+                    batch_size=batch_size,
+                )
+                sequence_relations = OemofData.sequences.through.objects.bulk_create(
+                    [
+                        OemofData.sequences.through(oemofdata_id=oemof_data.id, oemofsequence_id=sequence.id)
+                        for sequence in sequences
+                    ],
+                    batch_size=batch_size,
+                )
+                row_counts["scalars"] += len(scalars)
+                row_counts["sequences"] += len(sequences)
+                row_counts["scalar_relations"] += len(scalar_relations)
+                row_counts["sequence_relations"] += len(sequence_relations)
+                row_counts["packed_sequences"] += len(packed_sequences)
+                setattr(oemof_dataset, input_result_attr, oemof_data)
+            oemof_dataset.save()
+        oemof_dataset.row_counts = row_counts
+        logging.info(f"Stored OemofDataset #{oemof_dataset.id} using {row_counts=}.")
         return oemof_dataset
 
-    def restore_results(self):
+    def get_flow_totals(self) -> list[dict]:
+        """Returns precomputed flow totals; flow totals of datasets stored without are calculated and stored once"""
+        if self.flow_totals is None:
+            self.flow_totals = calculate_flow_totals(self.result.restore(attributes=["flow"]))  # pylint: disable=E1101
+            self.save(update_fields=["flow_totals"])
+        return self.flow_totals
+
+    def restore_results(self, nodes: Optional[Iterable[str]] = None, attributes: Optional[Iterable[str]] = None):
         """
         Restores input and result data from OemofDataset
 
+        Parameters
+        ----------
+        nodes: Optional[Iterable[str]]
+            If set, only entries starting or ending at given nodes are restored
+        attributes: Optional[Iterable[str]]
+            If set, only given attributes are restored
+
         Returns
         -------
         (dict, dict):
             Restored input- and result-data
         """
-
-        def type_conversion(value_str, value_type):
-            if value_type == "str":
-                return value_str
-            if value_type in ("float", "float64"):
-                return float(value_str)
-            if value_type in ("int", "int64"):
-                return int(value_str)
-            if value_type == "bool":
-                return bool(value_str)
-            raise TypeError('Unknown conversion type "' + value_type + '"')
-
-        input_data = {}
-        result_data = {}
-        for input_result_attr, data in (("input", input_data), ("result", result_data)):
-            ir_attr = getattr(self, input_result_attr)
-            for scalar in ir_attr.scalars.all():  # pylint: disable=E1101
-                nodes = (scalar.from_node, scalar.to_node)
-                if nodes not in data:
-                    data[nodes] = {"scalars": {}, "sequences": {}}
-                data[nodes]["scalars"][scalar.attribute] = type_conversion(scalar.value, scalar.type)
-            for sequence in ir_attr.sequences.all():  # pylint: disable=E1101
-                nodes = (sequence.from_node, sequence.to_node)
-                if nodes not in data:
-                    data[nodes] = {"scalars": {}, "sequences": {}}
-                if sequence.type == "series":
-                    series = pandas.Series(sequence.value)
-                else:
-                    series = sequence.value
-                data[nodes]["sequences"][sequence.attribute] = series
-        return input_data, result_data
+        return (
+            self.input.restore(nodes, attributes),  # pylint: disable=E1101
+            self.result.restore(nodes, attributes),  # pylint: disable=E1101
+        )
 
 
 class OemofData(models.Model):
-    """Model to hold input or results data from oemof"""
+    """
+    Model to hold input or results data from oemof
+
+    Sequences are either stored as related OemofSequence rows or packed into `sequence_block`
+    (see `django_oemof.columnar`). In the latter case, `sequence_columns` holds the column index.
+    """
 
     scalars = models.ManyToManyField("OemofScalar")
     sequences = models.ManyToManyField("OemofSequence")
+    sequence_block = models.BinaryField(null=True)
+    sequence_columns = models.JSONField(null=True)
+
+    def restore(self, nodes: Optional[Iterable[str]] = None, attributes: Optional[Iterable[str]] = None) -> dict:
+        """
+        Restores scalars and sequences
+
+        Filters are applied within DB query (or on column index for packed sequences),
+        thus, only requested data is loaded.
+
+        Parameters
+        ----------
+        nodes: Optional[Iterable[str]]
+            If set, only entries starting or ending at given nodes are restored
+        attributes: Optional[Iterable[str]]
+            If set, only given attributes are restored
+
+        Returns
+        -------
+        dict
+            Restored data in format of oemof.solph.processing.param_results (nodes as str)
+        """
+        nodes = set(nodes) if nodes is not None else None
+        attributes = set(attributes) if attributes is not None else None
+        query = models.Q()
+        if nodes is not None:
+            query &= models.Q(from_node__in=nodes) | models.Q(to_node__in=nodes)
+        if attributes is not None:
+            query &= models.Q(attribute__in=attributes)
+
+        data = {}
+        fields = ("from_node", "to_node", "attribute", "value", "type")
+        for from_node, to_node, attribute, value, value_type in self.scalars.filter(query).values_list(*fields):
+            if value_type not in TYPE_CONVERSIONS:
+                raise TypeError('Unknown conversion type "' + value_type + '"')
+            data.setdefault((from_node, to_node), {"scalars": {}, "sequences": {}})["scalars"][attribute] = (
+                TYPE_CONVERSIONS[value_type](value)
+            )
+
+        if self.sequence_columns is not None:
+            sequences = (
+                sequence
+                for sequence in columnar.unpack_sequences(self.sequence_block, self.sequence_columns)
+                if (nodes is None or sequence[0] in nodes or sequence[1] in nodes)
+                and (attributes is None or sequence[2] in attributes)
+            )
+        else:
+            sequences = (
+                (from_node, to_node, attribute, pandas.Series(value) if list_type == "series" else value)
+                for from_node, to_node, attribute, value, list_type in self.sequences.filter(query).values_list(*fields)
+            )
+        for from_node, to_node, attribute, series in sequences:
+            data.setdefault((from_node, to_node), {"scalars": {}, "sequences": {}})["sequences"][attribute] = series
+        return data
+
+    def pack_sequences(self) -> int:
+        """
+        Packs related OemofSequence rows into sequence block and deletes rows afterwards
+
+        Returns
+        -------
+        int
+            Number of packed sequences
+        """
+        sequences = self.sequences.all()  # pylint: disable=E1101
+        packed_sequences = [
+            (from_node, to_node, attribute, pandas.Series(value) if list_type == "series" else value)
+            for from_node, to_node, attribute, value, list_type in sequences.values_list(
+                "from_node", "to_node", "attribute", "value", "type"
+            )
+        ]
+        with transaction.atomic():
+            self.sequence_block, self.sequence_columns = columnar.pack_sequences(packed_sequences)
+            self.save()
+            sequences.delete()
+        return len(packed_sequences)
 
 
 class OemofScalar(models.Model):
@@ -143,6 +511,9 @@ class OemofScalar(models.Model):
     value = models.CharField(max_length=255)
     type = models.CharField(max_length=255)  # noqa: A003
 
+    class Meta:
+        indexes = [models.Index(fields=["from_node", "to_node", "attribute"])]
+
 
 class OemofSequence(models.Model):
     """Represents a sequence from oemof results"""
@@ -153,6 +524,9 @@ class OemofSequence(models.Model):
     value = ArrayField(base_field=models.FloatField())
     type = models.CharField(max_length=255)  # noqa: A003
 
+    class Meta:
+        indexes = [models.Index(fields=["from_node", "to_node", "attribute"])]
+
 
 class Result(models.Model):
     """Model to store results from postprocessing"""
@@ -160,4 +534,55 @@ class Result(models.Model):
     simulation = models.ForeignKey("Simulation", related_name="results", on_delete=models.CASCADE)
     name = models.TextField()
     data_type = models.CharField(max_length=9, choices=(("series", "series"), ("frame", "frame")))
-    data = models.JSONField()
+    encoding = models.CharField(max_length=5, choices=(("json", "json"), ("arrow", "arrow")), default="json")
+    data = models.JSONField(null=True)
+    binary_data = models.BinaryField(null=True)
+
+    class Meta:
+        constraints = [models.UniqueConstraint(fields=["simulation", "name"], name="unique_simulation_result")]
+
+    def set_result(self, result: Union[pandas.Series, pandas.DataFrame], encoding: Optional[str] = None) -> "Result":
+        """
+        Encodes given result and sets data type and (binary) data accordingly
+
+        If result cannot be encoded using Arrow (pyarrow not installed or unsupported dtypes),
+        JSON encoding is used instead.
+
+        Parameters
+        ----------
+        result: Union[pandas.Series, pandas.DataFrame]
+            Result of calculation
+        encoding: Optional[str]
+            Either "json" or "arrow", defaults to DJANGO_OEMOF_RESULT_ENCODING
+
+        Returns
+        -------
+        Result
+            Result instance (not saved yet)
+        """
+        encoding = encoding or do_settings.DJANGO_OEMOF_RESULT_ENCODING
+        self.data_type = "series" if isinstance(result, pandas.Series) else "frame"
+        if encoding == "arrow":
+            frame = result
+            if self.data_type == "series":
+                frame = result.to_frame(name=result.name if result.name is not None else "values")
+            try:
+                self.binary_data = columnar.frame_to_arrow(frame)
+            except (ImportError, ValueError, TypeError, NotImplementedError) as error:
+                logging.warning(f"Cannot encode result '{self.name}' using Arrow ({error}). Using JSON instead.")
+            else:
+                self.encoding = "arrow"
+                self.data = None
+                return self
+        self.encoding = "json"
+        self.data = result.to_json(orient="table")
+        self.binary_data = None
+        return self
+
+    def get_result(self) -> Union[pandas.Series, pandas.DataFrame]:
+        """Decodes stored result"""
+        if self.encoding == "arrow":
+            result = columnar.frame_from_arrow(self.binary_data)
+        else:
+            result = pandas.read_json(io.StringIO(self.data), orient="table")
+        return result.iloc[:, 0] if self.data_type == "series" else result
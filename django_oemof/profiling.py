@@ -0,0 +1,141 @@
+"""Module to time stages of simulation runs and to aggregate stored timings"""
+
+import logging
+import os
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from typing import Callable, Iterable, Optional
+
+import numpy
+
+PERCENTILES = (50, 90, 99)
+
+PROC_DIR = "/proc/self"
+
+
+def get_current_rss() -> Optional[float]:
+    """Returns current resident set size of process in MB (None if /proc is not available on platform)"""
+    try:
+        with open(f"{PROC_DIR}/statm", encoding="ascii") as statm:
+            resident_pages = int(statm.read().split()[1])
+    except (OSError, IndexError, ValueError):
+        return None
+    return round(resident_pages * os.sysconf("SC_PAGE_SIZE") / 1024**2, 1)
+
+
+def reset_peak_rss() -> bool:
+    """Resets peak resident set size of process (Linux only); returns False if peak cannot be reset"""
+    try:
+        with open(f"{PROC_DIR}/clear_refs", "w", encoding="ascii") as clear_refs:
+            clear_refs.write("5")
+    except OSError:
+        return False
+    return True
+
+
+def get_peak_rss() -> Optional[float]:
+    """Returns peak resident set size of process since last reset in MB (None if not available on platform)"""
+    try:
+        with open(f"{PROC_DIR}/status", encoding="ascii") as status:
+            for line in status:
+                if line.startswith("VmHWM:"):
+                    return round(int(line.split()[1]) / 1024, 1)
+    except (OSError, IndexError, ValueError):
+        pass
+    return None
+
+
+class StageTimer:
+    """
+    Collects wall time and memory usage per stage of a simulation run
+
+    Peak RSS of process is reset at start of each stage, thus, `peak_rss_mb` holds peak RSS reached within stage
+    (Linux only, None otherwise). `rss_delta_mb` holds change of current RSS during stage.
+    Seconds and RSS deltas of repeated stages are summed up, peak RSS of repeated stages is the maximum.
+    If callback `on_stage` is given, it is called with name of stage whenever a stage starts.
+    Timings of previous stages (i.e. of solve stage of simulation pipeline) can be continued via `stages`.
+    """
+
+    def __init__(self, on_stage: Optional[Callable[[str], None]] = None, stages: Optional[dict] = None):
+        self.stages = dict(stages or {})
+        self.on_stage = on_stage
+        self._active_stages = 0
+
+    @contextmanager
+    def stage(self, name: str):
+        """Context manager timing given stage"""
+        if self.on_stage:
+            self.on_stage(name)
+        # Nested stages must not reset peak of outer stage
+        peak_reset = self._active_stages == 0 and reset_peak_rss()
+        self._active_stages += 1
+        start_rss = get_current_rss()
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self._active_stages -= 1
+            # Repeated stages (i.e. solving multiple windows) are summed up
+            previous = self.stages.get(name, {})
+            seconds = time.perf_counter() - start + previous.get("seconds", 0)
+            end_rss = get_current_rss()
+            rss_delta = (
+                end_rss - start_rss + (previous.get("rss_delta_mb") or 0)
+                if start_rss is not None and end_rss is not None
+                else None
+            )
+            peak_rss = get_peak_rss() if peak_reset else None
+            if previous.get("peak_rss_mb") is not None:
+                peak_rss = max(peak_rss or 0, previous["peak_rss_mb"])
+            self.stages[name] = {
+                "seconds": round(seconds, 6),
+                "peak_rss_mb": peak_rss,
+                "rss_delta_mb": round(rss_delta, 1) if rss_delta is not None else None,
+            }
+            logging.debug(f"Stage '{name}' finished after {self.stages[name]['seconds']:.3f}s.")
+
+    def to_dict(self) -> dict:
+        """Returns timings of all stages and total time"""
+        total_seconds = sum(stage["seconds"] for stage in self.stages.values())
+        return {"stages": self.stages, "total_seconds": round(total_seconds, 6)}
+
+
+def aggregate_timings(timings: Iterable[tuple[str, dict]]) -> dict:
+    """
+    Aggregates stored stage timings per scenario
+
+    Parameters
+    ----------
+    timings: Iterable[tuple[str, dict]]
+        Scenario and timings (as returned by `StageTimer.to_dict`) per simulation
+
+    Returns
+    -------
+    dict
+        Number of runs and percentiles (and max) of seconds, peak RSS and RSS delta per stage and scenario
+    """
+    samples = defaultdict(lambda: defaultdict(lambda: defaultdict(list)))
+    runs = defaultdict(int)
+    for scenario, simulation_timings in timings:
+        if not simulation_timings:
+            continue
+        runs[scenario] += 1
+        samples[scenario]["total"]["seconds"].append(simulation_timings["total_seconds"])
+        for stage, values in simulation_timings["stages"].items():
+            for key in ("seconds", "peak_rss_mb", "rss_delta_mb"):
+                if values.get(key) is not None:
+                    samples[scenario][stage][key].append(values[key])
+
+    aggregated = {}
+    for scenario, stages in samples.items():
+        aggregated[scenario] = {"runs": runs[scenario], "stages": {}}
+        for stage, values in stages.items():
+            aggregated[scenario]["stages"][stage] = {
+                key: {
+                    **{f"p{percentile}": float(numpy.percentile(data, percentile)) for percentile in PERCENTILES},
+                    "max": float(max(data)),
+                }
+                for key, data in values.items()
+            }
+    return aggregated
@@ -1,12 +1,21 @@
 """Module to calculate oemof results"""
 
+import copy
 import inspect
-from typing import Union, Type, Dict
+import logging
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Union, Type, Dict
 import pandas
 
+from celery import shared_task
+from django.db.models.signals import post_delete
+from django.dispatch import receiver
 from oemof.tabular.postprocessing import core, calculations as standard_calculations
 
 from . import simulation, models
+from . import settings as do_settings
 
 
 CALCULATIONS: Dict[str, Union[Type[core.Calculation], core.ParametrizedCalculation]] = {
@@ -24,6 +33,105 @@ def register_calculation(*calculations: Union[Type[core.Calculation], core.Param
         CALCULATIONS[core.get_dependency_name(calculation)] = calculation
 
 
+class CalculatorCache:
+    """
+    Bounded in-process LRU cache of calculators (holding restored oemof datasets) keyed by simulation
+
+    Cache is limited by number of entries and (optionally) by estimated memory size of restored data.
+    Least recently used calculators are evicted first.
+    Cached calculators hold restored data only and are never handed out; each caller gets its own calculator sharing
+    restored data of cached calculator, thus, calculations added by concurrent requests are neither shared nor retained.
+    Restored data must not be modified by calculations.
+    """
+
+    def __init__(self, max_entries: int, max_bytes: int = 0):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._calculators = OrderedDict()
+        self._sizes = {}
+        self._lock = threading.Lock()
+
+    def get(self, sim: models.Simulation) -> core.Calculator:
+        """Returns new calculator for given simulation sharing restored data of cached (or newly restored) calculator"""
+        key = (sim.id, sim.dataset_id)
+        with self._lock:
+            if key in self._calculators:
+                self.hits += 1
+                self._calculators.move_to_end(key)
+                return self.copy_calculator(self._calculators[key])
+            self.misses += 1
+        calculator = core.Calculator(*sim.dataset.restore_results())
+        if self.max_entries <= 0:
+            return calculator
+        size = self.get_size(calculator) if self.max_bytes else 0
+        with self._lock:
+            self._calculators[key] = calculator
+            self._sizes[key] = size
+            while len(self._calculators) > self.max_entries or (
+                self.max_bytes and len(self._calculators) > 1 and sum(self._sizes.values()) > self.max_bytes
+            ):
+                evicted_key, _ = self._calculators.popitem(last=False)
+                del self._sizes[evicted_key]
+                logging.debug(f"Evicted calculator for simulation #{evicted_key[0]} from cache.")
+        return self.copy_calculator(calculator)
+
+    @staticmethod
+    def copy_calculator(calculator: core.Calculator) -> core.Calculator:
+        """Returns shallow copy of calculator without calculations (restored data is shared)"""
+        calculator = copy.copy(calculator)
+        calculator.calculations = {}
+        return calculator
+
+    def invalidate(self, simulation_id: Optional[int] = None, dataset_id: Optional[int] = None):
+        """Removes calculators for given simulation and/or dataset from cache; clears cache if no ID is given"""
+        with self._lock:
+            for key in list(self._calculators):
+                if (simulation_id is None and dataset_id is None) or simulation_id == key[0] or dataset_id == key[1]:
+                    del self._calculators[key]
+                    del self._sizes[key]
+
+    def info(self) -> dict:
+        """Returns hit and miss counters and current size of cache"""
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "entries": len(self._calculators),
+                "bytes": sum(self._sizes.values()),
+                "max_entries": self.max_entries,
+                "max_bytes": self.max_bytes,
+            }
+
+    @staticmethod
+    def get_size(calculator: core.Calculator) -> int:
+        """Estimates memory size of data restored in calculator (cached calculators hold no calculations)"""
+        size = 0
+        for data in (calculator.scalar_params, calculator.scalars, calculator.sequences_params, calculator.sequences):
+            memory_usage = data.memory_usage(deep=True)
+            size += int(memory_usage.sum() if isinstance(memory_usage, pandas.Series) else memory_usage)
+        return size
+
+
+CALCULATOR_CACHE = CalculatorCache(
+    max_entries=do_settings.DJANGO_OEMOF_CALCULATOR_CACHE_SIZE,
+    max_bytes=do_settings.DJANGO_OEMOF_CALCULATOR_CACHE_MAX_BYTES,
+)
+
+
+@receiver(post_delete, sender=models.Simulation, dispatch_uid="django_oemof_invalidate_simulation_calculator")
+def invalidate_simulation_calculator(sender, instance, **kwargs):  # pylint: disable=W0613
+    """Removes calculator of deleted simulation from cache"""
+    CALCULATOR_CACHE.invalidate(simulation_id=instance.id)
+
+
+@receiver(post_delete, sender=models.OemofDataset, dispatch_uid="django_oemof_invalidate_dataset_calculator")
+def invalidate_dataset_calculator(sender, instance, **kwargs):  # pylint: disable=W0613
+    """Removes calculators of deleted dataset from cache"""
+    CALCULATOR_CACHE.invalidate(dataset_id=instance.id)
+
+
 def get_results(
     simulation_id: int,
     calculations: Union[
@@ -63,34 +171,221 @@ def get_results(
         calculation if isinstance(calculation, str) else core.get_dependency_name(calculation): calculation
         for calculation in calculations
     } if isinstance(calculations, list) else calculations
+    calculation_names = {
+        calculation_result_name: calculation if isinstance(calculation, str) else core.get_dependency_name(calculation)
+        for calculation_result_name, calculation in calculations.items()
+    }
 
-    results = {}
-    for calculation_result_name, calculation in calculations.items():
-        calculation_name = calculation if isinstance(calculation, str) else core.get_dependency_name(calculation)
-        try:
-            calculation_result = sim.results.get(name=calculation_name)
-        except models.Result.DoesNotExist:  # pylint: disable=E1101
+    stored_results = {
+        calculation_result.name: calculation_result
+        for calculation_result in sim.results.filter(name__in=set(calculation_names.values()))
+    }
+    missing_calculations = {
+        calculation_names[calculation_result_name]: (
+            CALCULATIONS[calculation] if isinstance(calculation, str) else calculation
+        )
+        for calculation_result_name, calculation in calculations.items()
+        if calculation_names[calculation_result_name] not in stored_results
+    }
+    if missing_calculations:
+        calculator = CALCULATOR_CACHE.get(sim)
+        calculated_results = calculate_results(calculator, list(missing_calculations.values()))
+        # Results stored meanwhile by concurrent request or precomputation are kept and read again
+        models.Result.objects.bulk_create(  # pylint: disable=E1101
+            [
+                models.Result(simulation=sim, name=calculation_name).set_result(calculated_results[calculation_name])
+                for calculation_name in missing_calculations
+            ],
+            ignore_conflicts=True,
+        )
+        stored_results.update(
+            {
+                calculation_result.name: calculation_result
+                for calculation_result in sim.results.filter(name__in=missing_calculations)
+            }
+        )
+
+    return {
+        calculation_result_name: stored_results[calculation_name].get_result()
+        for calculation_result_name, calculation_name in calculation_names.items()
+    }
+
+
+def get_calculation_levels(
+    calculations: list[Union[Type[core.Calculation], core.ParametrizedCalculation]]
+) -> list[dict[str, Union[Type[core.Calculation], core.ParametrizedCalculation]]]:
+    """
+    Resolves dependencies of given calculations and groups them into levels of mutually independent calculations
+
+    Parameters
+    ----------
+    calculations : list[Union[Type[core.Calculation], core.ParametrizedCalculation]]
+        Calculations (by class) which shall be calculated
+
+    Returns
+    -------
+    list[dict[str, Union[Type[core.Calculation], core.ParametrizedCalculation]]]
+        Levels of calculations (including dependencies) by dependency name. Calculations of a level only depend on
+        calculations of previous levels.
+
+    Raises
+    ------
+    core.CalculationError
+        If dependencies of calculations are cyclic
+    """
+    specs = {}
+    dependencies = {}
+    stack = list(calculations)
+    while stack:
+        calculation = stack.pop()
+        calculation_name = core.get_dependency_name(calculation)
+        if calculation_name in specs:
             continue
-        result = pandas.read_json(calculation_result.data, orient="table")
-        results[calculation_result_name] = result.iloc[:, 0] if calculation_result.data_type == "series" else result
+        specs[calculation_name] = calculation
+        calculation_cls = (
+            calculation.calculation if isinstance(calculation, core.ParametrizedCalculation) else calculation
+        )
+        depends_on = list((calculation_cls.depends_on or {}).values())
+        dependencies[calculation_name] = {core.get_dependency_name(dependency) for dependency in depends_on}
+        stack.extend(depends_on)
 
-    if len(results) != len(calculations):
-        calculator = core.Calculator(*sim.dataset.restore_results())
-        for calculation_result_name, calculation in calculations.items():
-            if calculation_result_name in results:
-                continue
-            calculation_cls = CALCULATIONS[calculation] if isinstance(calculation, str) else calculation
-            if isinstance(calculation_cls, core.ParametrizedCalculation):
-                parameters = calculation_cls.parameters or {}
-                result = calculation_cls.calculation(calculator, **parameters).result
+    levels = []
+    resolved = set()
+    while len(resolved) < len(specs):
+        level = {
+            calculation_name: calculation
+            for calculation_name, calculation in specs.items()
+            if calculation_name not in resolved and dependencies[calculation_name] <= resolved
+        }
+        if not level:
+            raise core.CalculationError(f"Cyclic dependencies in calculations {set(specs) - resolved}.")
+        levels.append(level)
+        resolved.update(level)
+    return levels
+
+
+def calculate_results(
+    calculator: core.Calculator,
+    calculations: list[Union[Type[core.Calculation], core.ParametrizedCalculation]],
+) -> dict[str, Union[pandas.Series, pandas.DataFrame]]:
+    """
+    Calculates given calculations level by level
+
+    Shared dependencies are calculated only once; independent calculations of one level are calculated concurrently
+    using a thread pool (size is set via DJANGO_OEMOF_CALCULATION_WORKERS).
+    Calculations are added to a private copy of given calculator (see `CalculatorCache.copy_calculator`), thus,
+    worker threads only access calculations of this call and given calculator is not modified.
+
+    Parameters
+    ----------
+    calculator : core.Calculator
+        Calculator holding restored oemof results
+    calculations : list[Union[Type[core.Calculation], core.ParametrizedCalculation]]
+        Calculations (by class) which shall be calculated
+
+    Returns
+    -------
+    dict[str, Union[pandas.Series, pandas.DataFrame]]
+        Results of calculations (including dependencies) by dependency name
+    """
+    levels = get_calculation_levels(calculations)
+    calculator = CalculatorCache.copy_calculator(calculator)
+    workers = do_settings.DJANGO_OEMOF_CALCULATION_WORKERS
+    results = {}
+    with ThreadPoolExecutor(max_workers=max(workers, 1)) as executor:
+        for level in levels:
+            for calculation in level.values():
+                calculator.add(calculation)
+            if workers > 1 and len(level) > 1:
+                results.update(zip(level, executor.map(calculator.get_result, level)))
             else:
-                result = calculation_cls(calculator).result
-            calculation_name = calculation if isinstance(calculation, str) else core.get_dependency_name(calculation)
-            models.Result(
-                simulation=sim,
-                name=calculation_name,
-                data=result.to_json(orient="table"),
-                data_type="series" if isinstance(result, pandas.Series) else "frame",
-            ).save()
-            results[calculation_result_name] = result
+                results.update(
+                    (calculation_name, calculator.get_result(calculation_name)) for calculation_name in level
+                )
     return results
+
+
+def get_batch_results(
+    batch_id: int,
+    calculations: list[Union[str, Type[core.Calculation], core.ParametrizedCalculation]],
+) -> dict[str, pandas.DataFrame]:
+    """
+    Returns results of given calculations combined over all stored simulations of a batch
+
+    Parameters
+    ----------
+    batch_id : int
+        ID of simulation batch
+    calculations : list[Union[str, Type[core.Calculation], core.ParametrizedCalculation]]
+        List of calculations (by name or class) which shall be calculated for every batch member
+
+    Returns
+    -------
+    dict[str, pandas.DataFrame]
+        Dict containing calculation name as key and combined result as value.
+        Series results are combined into a frame holding one row per simulation,
+        frame results are concatenated using simulation ID as outer index level.
+    """
+    try:
+        batch = models.SimulationBatch.objects.get(pk=batch_id)  # pylint: disable=E1101
+    except models.SimulationBatch.DoesNotExist:  # pylint: disable=E1101
+        # pylint: disable=W0707
+        raise simulation.SimulationError(f"Simulation batch with ID#{batch_id} not present in database.")
+
+    member_results = {
+        simulation_id: get_results(simulation_id, calculations)
+        for simulation_id in batch.simulations.order_by("id").values_list("id", flat=True)
+    }
+    combined_results = {}
+    for calculation in calculations:
+        calculation_name = calculation if isinstance(calculation, str) else core.get_dependency_name(calculation)
+        results = {simulation_id: result[calculation_name] for simulation_id, result in member_results.items()}
+        if results and all(isinstance(result, pandas.Series) for result in results.values()):
+            combined_result = pandas.DataFrame(results).T
+        else:
+            combined_result = pandas.concat(results) if results else pandas.DataFrame()
+        combined_result.index.names = ["simulation_id"] + combined_result.index.names[1:]
+        combined_results[calculation_name] = combined_result
+    return combined_results
+
+
+@shared_task
+def calculate_batch_results(batch_id: int):
+    """Precomputes calculations requested for simulation batch for all stored batch members"""
+    batch = models.SimulationBatch.objects.get(pk=batch_id)  # pylint: disable=E1101
+    for simulation_id in batch.simulations.values_list("id", flat=True):
+        get_results(simulation_id, batch.calculations)
+
+
+def get_precompute_calculations(scenario: str) -> list[str]:
+    """
+    Returns names of calculations which are precomputed after simulation of given scenario has been stored
+
+    Calculations configured for all scenarios (DJANGO_OEMOF_PRECOMPUTE_CALCULATIONS) and for given scenario
+    (DJANGO_OEMOF_SCENARIO_PRECOMPUTE_CALCULATIONS) are combined; unknown calculations are skipped.
+    """
+    calculations = []
+    for calculation in (
+        *do_settings.DJANGO_OEMOF_PRECOMPUTE_CALCULATIONS,
+        *do_settings.DJANGO_OEMOF_SCENARIO_PRECOMPUTE_CALCULATIONS.get(scenario, []),
+    ):
+        if calculation not in CALCULATIONS:
+            logging.warning(f"Skipping unknown calculation '{calculation}' configured for precomputation.")
+            continue
+        if calculation not in calculations:
+            calculations.append(calculation)
+    return calculations
+
+
+@shared_task
+def precompute_results(simulation_id: Optional[int], calculations: list[str]) -> Optional[int]:
+    """
+    Precomputes given calculations for simulation and passes simulation ID on
+
+    Used as last stage of simulation chain and to precompute configured calculations after simulation has been stored
+    (see `get_precompute_calculations`). All calculations are calculated by one calculator, thus, oemof results are
+    restored only once.
+    """
+    if simulation_id is not None:
+        get_results(simulation_id, calculations)
+    return simulation_id
@@ -0,0 +1,239 @@
+"""
+Module to solve energysystems in consecutive windows (rolling horizon)
+
+Horizon is split into windows of given length; each window is solved with an additional look-ahead (overlap),
+whose results are discarded. Storage content at the end of each window is carried over as initial storage level of next
+window. Results of all windows are stitched into results of the full horizon, thus, peak memory is bounded by window
+size instead of horizon length.
+Balanced storages are balanced within the first window, which chooses their start level (unless initial storage level
+is set), and storage content at the end of the last window is fixed to this start level, as in the balanced model of the
+full horizon.
+"""
+
+from contextlib import contextmanager
+from typing import Iterator, Optional
+
+import numpy
+import pandas
+from oemof import solph
+
+from . import settings as do_settings
+
+# Key of rolling horizon settings in simulation parameters
+PARAMETER_KEY = "rolling_horizon"
+
+DEFAULT_SETTINGS = {"window_hours": None, "overlap_hours": 0}
+
+
+def get_rolling_horizon_settings(scenario: str, parameters: dict) -> Optional[dict]:
+    """
+    Returns rolling horizon settings for given scenario and parameters
+
+    Settings given in parameters (key "rolling_horizon") override settings of scenario
+    (see DJANGO_OEMOF_ROLLING_HORIZON). Settings can be given as window length in hours or as dict holding
+    "window_hours" and optionally "overlap_hours" (default 0).
+
+    Parameters
+    ----------
+    scenario: str
+        Name of scenario
+    parameters: dict
+        Simulation parameters
+
+    Returns
+    -------
+    Optional[dict]
+        Complete rolling horizon settings or None if horizon shall be solved at once
+
+    Raises
+    ------
+    ValueError
+        If settings are invalid
+    """
+    rolling_horizon_settings = parameters.get(PARAMETER_KEY, do_settings.DJANGO_OEMOF_ROLLING_HORIZON.get(scenario))
+    if not rolling_horizon_settings:
+        return None
+    if isinstance(rolling_horizon_settings, (int, float)) and not isinstance(rolling_horizon_settings, bool):
+        rolling_horizon_settings = {"window_hours": rolling_horizon_settings}
+    if not isinstance(rolling_horizon_settings, dict):
+        raise ValueError(f"Invalid rolling horizon settings '{rolling_horizon_settings}'.")
+    unknown_keys = set(rolling_horizon_settings) - set(DEFAULT_SETTINGS)
+    if unknown_keys:
+        raise ValueError(f"Unknown rolling horizon settings {sorted(unknown_keys)}.")
+    rolling_horizon_settings = {**DEFAULT_SETTINGS, **rolling_horizon_settings}
+    try:
+        window_hours = float(rolling_horizon_settings["window_hours"])
+        overlap_hours = float(rolling_horizon_settings["overlap_hours"])
+    except (TypeError, ValueError) as error:
+        raise ValueError(f"Invalid rolling horizon settings '{rolling_horizon_settings}'.") from error
+    if window_hours <= 0 or overlap_hours < 0:
+        raise ValueError("Window hours must be positive and overlap hours must not be negative.")
+    return {"window_hours": window_hours, "overlap_hours": overlap_hours}
+
+
+def add_rolling_horizon_settings(scenario: str, parameters: dict) -> dict:
+    """
+    Returns parameters including complete rolling horizon settings
+
+    Settings are recorded in simulation parameters, thus, simulations using different (or no) rolling horizon
+    are distinguished by their parameters hash. Function is idempotent.
+    If scenario defaults to rolling horizon (DJANGO_OEMOF_ROLLING_HORIZON), an opt-out in request is kept as `None`,
+    so that scenario default is not applied again by simulation task.
+    """
+    rolling_horizon_settings = get_rolling_horizon_settings(scenario, parameters)
+    parameters = {key: value for key, value in parameters.items() if key != PARAMETER_KEY}
+    if rolling_horizon_settings:
+        parameters[PARAMETER_KEY] = rolling_horizon_settings
+    elif do_settings.DJANGO_OEMOF_ROLLING_HORIZON.get(scenario):
+        parameters[PARAMETER_KEY] = None
+    return parameters
+
+
+def get_windows(timeincrement, window_hours: float, overlap_hours: float) -> list[tuple[int, int, int]]:
+    """
+    Returns windows of rolling horizon
+
+    Parameters
+    ----------
+    timeincrement
+        Time increment (in hours) of each timestep of full horizon
+    window_hours: float
+        Hours of each window whose results are kept
+    overlap_hours: float
+        Hours of look-ahead solved additionally with each window
+
+    Returns
+    -------
+    list[tuple[int, int, int]]
+        Start, end of kept results and end of look-ahead (exclusive) of each window as timesteps
+    """
+    hours = numpy.concatenate([[0.0], numpy.cumsum(numpy.asarray(timeincrement, dtype=float))])
+    timesteps = len(hours) - 1
+    windows = []
+    start = 0
+    while start < timesteps:
+        # At least one timestep is kept per window
+        keep_end = max(int(numpy.searchsorted(hours, hours[start] + window_hours, side="right")) - 1, start + 1)
+        keep_end = min(keep_end, timesteps)
+        end = min(int(numpy.searchsorted(hours, hours[keep_end] + overlap_hours, side="right")) - 1, timesteps)
+        windows.append((start, keep_end, max(end, keep_end)))
+        start = keep_end
+    return windows
+
+
+def check_energysystem(energysystem: solph.EnergySystem):
+    """Raises ValueError if energysystem cannot be solved in rolling horizon (investments or multiple periods)"""
+    if energysystem.periods is not None:
+        raise ValueError("Rolling horizon is not supported for multi-period energysystems.")
+    invest_flows = [flow for flow in energysystem.flows().values() if getattr(flow, "investment", None) is not None]
+    invest_storages = [
+        node
+        for node in energysystem.nodes
+        if isinstance(node, solph.components.GenericStorage) and node.investment is not None
+    ]
+    if invest_flows or invest_storages:
+        raise ValueError("Rolling horizon is not supported for energysystems holding investments.")
+
+
+def get_balanced_storages(energysystem: solph.EnergySystem) -> list[solph.components.GenericStorage]:
+    """Returns balanced storages of energysystem (storage content at end of horizon equals content at start)"""
+    return [node for node in energysystem.nodes if isinstance(node, solph.components.GenericStorage) and node.balanced]
+
+
+@contextmanager
+def carried_storage_levels(energysystem: solph.EnergySystem) -> Iterator[list[solph.components.GenericStorage]]:
+    """
+    Context manager yielding storages of energysystem, whose initial storage levels are carried between windows
+
+    Storages are not balanced within windows (see `fix_storage_end_levels` to balance storages over all windows);
+    initial storage levels and balancing are restored after leaving context.
+    """
+    storages = [node for node in energysystem.nodes if isinstance(node, solph.components.GenericStorage)]
+    original = [(storage.initial_storage_level, storage.balanced) for storage in storages]
+    try:
+        for storage in storages:
+            storage.balanced = False
+        yield storages
+    finally:
+        for storage, (initial_storage_level, balanced) in zip(storages, original):
+            storage.initial_storage_level, storage.balanced = initial_storage_level, balanced
+
+
+def get_storage_levels(
+    storages: list[solph.components.GenericStorage], results_data: dict, position: int
+) -> dict[solph.components.GenericStorage, float]:
+    """Returns relative storage levels of storages at given position of window results"""
+    levels = {}
+    for storage in storages:
+        content = results_data[(storage, None)]["sequences"]["storage_content"].iloc[position]
+        level = content / storage.nominal_storage_capacity if storage.nominal_storage_capacity else 0
+        # Clipping prevents infeasible levels due to numerical inaccuracies of solver
+        levels[storage] = float(numpy.clip(level, 0, 1))
+    return levels
+
+
+def carry_storage_levels(storages: list[solph.components.GenericStorage], results_data: dict, position: int):
+    """Sets initial storage level of storages to storage content at given position of window results"""
+    for storage, level in get_storage_levels(storages, results_data, position).items():
+        storage.initial_storage_level = level
+
+
+def fix_storage_end_levels(model: solph.Model, end_levels: dict[solph.components.GenericStorage, float]):
+    """Fixes storage content at last time point of model to given relative levels (used to balance last window)"""
+    last_timepoint = model.TIMEPOINTS.at(-1)
+    for storage, level in end_levels.items():
+        model.GenericStorageBlock.storage_content[storage, last_timepoint].fix(level * storage.nominal_storage_capacity)
+
+
+def trim_results(results_data: dict, length: Optional[int]) -> dict:
+    """Returns results of window holding first given number of timesteps of sequences (all if length is None)"""
+    return {
+        key: {**result, "sequences": result["sequences"].iloc[:length]} if "sequences" in result else result
+        for key, result in results_data.items()
+    }
+
+
+def stitch_results(window_results: list[dict], timeindex: Optional[pandas.DatetimeIndex]) -> dict:
+    """
+    Stitches trimmed results of all windows into results of full horizon
+
+    Scalars are taken from first window.
+
+    Parameters
+    ----------
+    window_results: list[dict]
+        Trimmed results of each window (see `trim_results`)
+    timeindex: Optional[pandas.DatetimeIndex]
+        Time index of full horizon
+
+    Returns
+    -------
+    dict
+        Results of full horizon
+    """
+    results_data = {}
+    for key, result in window_results[0].items():
+        results_data[key] = dict(result)
+        if "sequences" not in result:
+            continue
+        sequences = pandas.concat(
+            [window[key]["sequences"] for window in window_results if key in window], ignore_index=True
+        )
+        if timeindex is not None:
+            sequences.index = timeindex[: len(sequences)]
+        results_data[key]["sequences"] = sequences
+    return results_data
+
+
+def get_variable_costs(energysystem: solph.EnergySystem, results_data: dict) -> float:
+    """Returns variable costs of all flows of stitched results (used as objective of rolling horizon)"""
+    timeincrement = numpy.asarray(energysystem.timeincrement, dtype=float)
+    timesteps = len(timeincrement)
+    costs = 0.0
+    for (source, target), flow in energysystem.flows().items():
+        if (source, target) not in results_data or flow.variable_costs[0] is None:
+            continue
+        values = results_data[(source, target)]["sequences"]["flow"].to_numpy(dtype=float)[:timesteps]
+        variable_costs = numpy.array([flow.variable_costs[step] for step in range(timesteps)], dtype=float)
+        costs += float(numpy.nansum(values * variable_costs * timeincrement))
+    return costs
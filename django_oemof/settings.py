@@ -1,6 +1,7 @@
 """Settings for django_oemof"""
 
 import environ
+import importlib.util
 import pathlib
 from collections import defaultdict
 
@@ -10,8 +11,43 @@ env = environ.Env()
 
 OEMOF_DIR = pathlib.Path(settings.MEDIA_ROOT) / getattr(settings, "DJANGO_OEMOF_DIR", "oemof")
 OEMOF_STATIC_DIR = pathlib.Path(settings.MEDIA_ROOT) / getattr(settings, "DJANGO_OEMOF_STATIC_DIR", "oemof_static")
+OEMOF_ES_CACHE_DIR = OEMOF_DIR / ".cache"
+OEMOF_HANDOFF_DIR = OEMOF_DIR / ".handoff"
 
 HOOKS = defaultdict(list)
+SOLVERS = {}
 
 DJANGO_OEMOF_IGNORE_SIMULATION_PARAMETERS = env.list("DJANGO_OEMOF_IGNORE_SIMULATION_PARAMETERS", default=[])
 DJANGO_OEMOF_TIMELIMIT = env.int("DJANGO_OEMOF_TIMELIMIT", default=600)
+DJANGO_OEMOF_SOLVER = env.str("DJANGO_OEMOF_SOLVER", default="cbc")
+DJANGO_OEMOF_MIPGAP = env.float("DJANGO_OEMOF_MIPGAP", default=0.1)
+DJANGO_OEMOF_SOLVER_THREADS = env.int("DJANGO_OEMOF_SOLVER_THREADS", default=None)
+DJANGO_OEMOF_SOLVER_PRESOLVE = env.bool("DJANGO_OEMOF_SOLVER_PRESOLVE", default=None)
+DJANGO_OEMOF_SOLVER_OPTIONS = env.json("DJANGO_OEMOF_SOLVER_OPTIONS", default={})
+DJANGO_OEMOF_BULK_BATCH_SIZE = env.int("DJANGO_OEMOF_BULK_BATCH_SIZE", default=1000)
+DJANGO_OEMOF_SEQUENCE_STORAGE = env.str("DJANGO_OEMOF_SEQUENCE_STORAGE", default="rows")
+DJANGO_OEMOF_RESULT_ENCODING = env.str(
+    "DJANGO_OEMOF_RESULT_ENCODING", default="arrow" if importlib.util.find_spec("pyarrow") else "json"
+)
+DJANGO_OEMOF_CALCULATOR_CACHE_SIZE = env.int("DJANGO_OEMOF_CALCULATOR_CACHE_SIZE", default=8)
+DJANGO_OEMOF_CALCULATOR_CACHE_MAX_BYTES = env.int("DJANGO_OEMOF_CALCULATOR_CACHE_MAX_BYTES", default=0)
+DJANGO_OEMOF_CALCULATION_WORKERS = env.int("DJANGO_OEMOF_CALCULATION_WORKERS", default=4)
+DJANGO_OEMOF_EXPORT_CHUNK_SIZE = env.int("DJANGO_OEMOF_EXPORT_CHUNK_SIZE", default=10000)
+DJANGO_OEMOF_FLOW_TOTALS_PERIOD = env.str("DJANGO_OEMOF_FLOW_TOTALS_PERIOD", default=None)
+DJANGO_OEMOF_ES_CACHE = env.bool("DJANGO_OEMOF_ES_CACHE", default=False)
+DJANGO_OEMOF_PENDING_TIMEOUT = env.int("DJANGO_OEMOF_PENDING_TIMEOUT", default=3600)
+DJANGO_OEMOF_AGGREGATION = env.json("DJANGO_OEMOF_AGGREGATION", default={})
+DJANGO_OEMOF_ROLLING_HORIZON = env.json("DJANGO_OEMOF_ROLLING_HORIZON", default={})
+DJANGO_OEMOF_MODEL_CACHE_SIZE = env.int("DJANGO_OEMOF_MODEL_CACHE_SIZE", default=0)
+DJANGO_OEMOF_WARM_START = env.bool("DJANGO_OEMOF_WARM_START", default=False)
+DJANGO_OEMOF_WARM_START_CANDIDATES = env.int("DJANGO_OEMOF_WARM_START_CANDIDATES", default=100)
+DJANGO_OEMOF_ACCEPT_INCUMBENT = env.bool("DJANGO_OEMOF_ACCEPT_INCUMBENT", default=True)
+DJANGO_OEMOF_TIMELIMIT_FACTOR = env.float("DJANGO_OEMOF_TIMELIMIT_FACTOR", default=2.0)
+DJANGO_OEMOF_PIPELINE = env.bool("DJANGO_OEMOF_PIPELINE", default=False)
+DJANGO_OEMOF_SOLVE_QUEUE = env.str("DJANGO_OEMOF_SOLVE_QUEUE", default=None)
+DJANGO_OEMOF_STORE_QUEUE = env.str("DJANGO_OEMOF_STORE_QUEUE", default=None)
+DJANGO_OEMOF_PRECOMPUTE_QUEUE = env.str("DJANGO_OEMOF_PRECOMPUTE_QUEUE", default=None)
+DJANGO_OEMOF_PRECOMPUTE_CALCULATIONS = env.list("DJANGO_OEMOF_PRECOMPUTE_CALCULATIONS", default=[])
+DJANGO_OEMOF_SCENARIO_PRECOMPUTE_CALCULATIONS = env.json("DJANGO_OEMOF_SCENARIO_PRECOMPUTE_CALCULATIONS", default={})
+DJANGO_OEMOF_STATUS_TIMEOUT = env.int("DJANGO_OEMOF_STATUS_TIMEOUT", default=30)
+DJANGO_OEMOF_STATUS_POLL_INTERVAL = env.float("DJANGO_OEMOF_STATUS_POLL_INTERVAL", default=0.5)
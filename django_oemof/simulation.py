@@ -1,35 +1,373 @@
 """Simulation module"""
 
+import dataclasses
+import hashlib
+import itertools
 import json
 import logging
-from typing import Optional
+import math
+import os
+import pathlib
+import pickle
+import tempfile
+import time
+import uuid
+from contextlib import ExitStack, nullcontext
+from datetime import timedelta
+from typing import Optional, Union
 from collections import namedtuple
 
 # pylint: disable=W0611
+import numpy
+import oemof.tabular
 import oemof.tabular.datapackage  # noqa
-from celery import shared_task
+from celery import chain, group, shared_task
+from celery.canvas import Signature
 from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.utils import timezone
 from . import settings as do_settings
 from oemof import solph
 from oemof.tabular.facades import TYPEMAP
 
-from django_oemof import hooks, models
-
+from django_oemof import (
+    aggregation,
+    handoff,
+    hooks,
+    model_cache,
+    models,
+    profiling,
+    rolling_horizon,
+    solvers,
+    task_status,
+    warm_start,
+)
 
 FlowAttribute = namedtuple("FlowAttribute", ("from_node", "to_node", "attribute", "value"))
 
+# Attributes of energysystem which are not cached, as they are rebuilt on access (groups) or set on restore (typemap)
+ENERGYSYSTEM_CACHE_EXCLUDED_ATTRIBUTES = ("_groupings", "_groups", "_first_ungrouped_node_index_", "typemap")
+
 
 class SimulationError(Exception):
     """Raised if simulation failed or simulation is not present"""
 
 
+def start_simulation(scenario: str, parameters: dict, calculations: Optional[list[str]] = None) -> str:
+    """
+    Starts simulation task for given scenario and parameters
+
+    If an identical simulation is already queued or running, ID of related task is returned instead of starting
+    another task; given calculations are precomputed once the pending simulation has been stored
+    (see `add_pending_calculations`). Pending simulations older than `DJANGO_OEMOF_PENDING_TIMEOUT` are considered
+    as lost.
+    If DJANGO_OEMOF_PIPELINE is set, simulation is run as chain of pipeline stages (see `get_simulation_signature`).
+
+    Parameters
+    ----------
+    scenario: str
+        Name of scenario (used to load related datapackage)
+    parameters: dict
+        Parameters which are adapted to ES before simulation
+    calculations: Optional[list[str]]
+        Names of calculations (see `results.CALCULATIONS`) to precompute after simulation has been stored
+
+    Returns
+    -------
+    str
+        Celery task ID of (already) started simulation
+    """
+    parameters = add_simulation_settings(scenario, parameters)
+    task_id, created = reserve_simulation(scenario, parameters)
+    if not created:
+        if calculations:
+            add_pending_calculations(scenario, models.get_parameters_hash(parameters), calculations)
+        return task_id
+    try:
+        if do_settings.DJANGO_OEMOF_PIPELINE or calculations:
+            get_simulation_signature(scenario, parameters, task_id, calculations).apply_async()
+        else:
+            simulate_scenario.apply_async((scenario, parameters), task_id=task_id)
+    except Exception:
+        # pylint: disable=E1101
+        models.PendingSimulation.objects.filter(task_id=task_id).delete()
+        models.SimulationTask.objects.filter(task_id=task_id).delete()
+        raise
+    return task_id
+
+
+def add_simulation_settings(scenario: str, parameters: dict) -> dict:
+    """
+    Returns parameters including settings of time series aggregation and rolling horizon
+
+    Settings are recorded in parameters (and therefore in parameters hash of simulation), as they change results.
+    """
+    return rolling_horizon.add_rolling_horizon_settings(
+        scenario, aggregation.add_aggregation_settings(scenario, parameters)
+    )
+
+
+def get_queue_options(queue: Optional[str]) -> dict:
+    """Returns options routing task to given queue (default routing if queue is not set)"""
+    return {"queue": queue} if queue else {}
+
+
+def get_simulation_signature(
+    scenario: str, parameters: dict, task_id: str, calculations: Optional[list[str]] = None
+) -> Signature:
+    """
+    Returns celery signature simulating given scenario and parameters
+
+    If DJANGO_OEMOF_PIPELINE is set, simulation is split into chained stages, which are routed to their own queues:
+    build and solve scenario and serialize results into handoff directory (`solve_scenario`, DJANGO_OEMOF_SOLVE_QUEUE)
+    and store serialized results (`store_scenario`, DJANGO_OEMOF_STORE_QUEUE). Thus, solver workers can move on to
+    next model while results of previous model are stored by I/O workers.
+    If calculations are given, they are precomputed in a final stage (DJANGO_OEMOF_PRECOMPUTE_QUEUE); calculations
+    configured for precomputation are skipped, as they are precomputed anyway once results have been stored.
+
+    Parameters
+    ----------
+    scenario: str
+        Name of scenario
+    parameters: dict
+        Parameters which are adapted to ES before simulation
+    task_id: str
+        Celery task ID of (first stage of) simulation, used to track and to revoke simulation
+    calculations: Optional[list[str]]
+        Names of calculations (see `results.CALCULATIONS`) to precompute after simulation has been stored
+
+    Returns
+    -------
+    Signature
+        Signature of simulation task or chain of pipeline stages
+    """
+    # pylint: disable=C0415
+    from django_oemof.results import get_precompute_calculations, precompute_results
+
+    # Configured calculations are precomputed right after storing results (see `schedule_precomputation`)
+    configured_calculations = get_precompute_calculations(scenario) if calculations else []
+    calculations = [calculation for calculation in calculations or [] if calculation not in configured_calculations]
+    if do_settings.DJANGO_OEMOF_PIPELINE:
+        stages = [
+            solve_scenario.signature(
+                (scenario, parameters), task_id=task_id, **get_queue_options(do_settings.DJANGO_OEMOF_SOLVE_QUEUE)
+            ),
+            store_scenario.signature(**get_queue_options(do_settings.DJANGO_OEMOF_STORE_QUEUE)),
+        ]
+    else:
+        stages = [simulate_scenario.signature((scenario, parameters), task_id=task_id)]
+    if calculations:
+        stages.append(
+            precompute_results.signature(
+                (calculations,), **get_queue_options(do_settings.DJANGO_OEMOF_PRECOMPUTE_QUEUE)
+            )
+        )
+    return stages[0] if len(stages) == 1 else chain(*stages)
+
+
+def reserve_simulation(scenario: str, parameters: dict) -> tuple[str, bool]:
+    """
+    Reserves task ID for simulation of given scenario and parameters (see `start_simulation`)
+
+    Status of newly reserved tasks is tracked in `models.SimulationTask`.
+
+    Parameters
+    ----------
+    scenario: str
+        Name of scenario
+    parameters: dict
+        Parameters which are adapted to ES before simulation
+
+    Returns
+    -------
+    tuple[str, bool]
+        Celery task ID and whether task ID has been reserved newly (task must be started by caller)
+        or belongs to an already pending simulation
+    """
+    parameters_hash = models.get_parameters_hash(parameters)
+    # pylint: disable=E1101
+    lost_simulations = models.PendingSimulation.objects.filter(
+        scenario=scenario,
+        parameters_hash=parameters_hash,
+        created_at__lt=timezone.now() - timedelta(seconds=do_settings.DJANGO_OEMOF_PENDING_TIMEOUT),
+    )
+    models.SimulationTask.objects.filter(task_id__in=lost_simulations.values("task_id")).update(
+        status="failed", error="Simulation task lost", updated_at=timezone.now()
+    )
+    lost_simulations.delete()
+    pending_simulation, created = models.PendingSimulation.objects.get_or_create(
+        scenario=scenario, parameters_hash=parameters_hash, defaults={"task_id": str(uuid.uuid4())}
+    )
+    if created:
+        models.SimulationTask.objects.create(
+            task_id=pending_simulation.task_id, scenario=scenario, parameters_hash=parameters_hash
+        )
+    else:
+        logging.info(
+            f"Simulation for {scenario=} and {parameters=} is already pending in task #{pending_simulation.task_id}."
+        )
+    return pending_simulation.task_id, created
+
+
+def add_pending_calculations(scenario: str, parameters_hash: str, calculations: list[str]):
+    """
+    Records calculations requested for an already pending simulation
+
+    Recorded calculations are precomputed once the pending simulation has been stored (see `finish_simulation_task`).
+    If simulation has been finished meanwhile, precomputation is started for stored simulation directly.
+    """
+    # pylint: disable=E1101
+    with transaction.atomic():
+        pending_simulation = (
+            models.PendingSimulation.objects.select_for_update()
+            .filter(scenario=scenario, parameters_hash=parameters_hash)
+            .first()
+        )
+        if pending_simulation:
+            pending_simulation.calculations += [
+                calculation for calculation in calculations if calculation not in pending_simulation.calculations
+            ]
+            pending_simulation.save(update_fields=["calculations"])
+            return
+    stored_simulation = get_stored_simulations(scenario).filter(parameters_hash=parameters_hash).first()
+    if stored_simulation:
+        schedule_precomputation(scenario, stored_simulation.id, calculations)
+
+
+def get_sweep_parameters(
+    parameter_sets: Optional[list[dict]] = None, grid: Optional[dict] = None, base_parameters: Optional[dict] = None
+) -> list[dict]:
+    """
+    Returns parameter sets of all variants of a parameter sweep
+
+    Parameters
+    ----------
+    parameter_sets: Optional[list[dict]]
+        Explicit parameter sets, i.e. [{"wind": {"capacity": 5}}, {"wind": {"capacity": 10}}]
+    grid: Optional[dict]
+        Candidate values per component attribute, i.e. {"wind": {"capacity": [5, 10]}, "pv": {"capacity": [1, 2]}};
+        cartesian product of all candidate values is added to parameter sets
+    base_parameters: Optional[dict]
+        Parameters shared by all variants; attributes given in variants override base attributes
+
+    Returns
+    -------
+    list[dict]
+        Parameter sets of all variants
+    """
+    base_parameters = base_parameters or {}
+    variants = list(parameter_sets or [])
+    if grid:
+        keys = [(component, attribute) for component, attributes in grid.items() for attribute in attributes]
+        for values in itertools.product(*(grid[component][attribute] for component, attribute in keys)):
+            variant = {}
+            for (component, attribute), value in zip(keys, values):
+                variant.setdefault(component, {})[attribute] = value
+            variants.append(variant)
+    sweep_parameters = []
+    for variant in variants or [{}]:
+        parameters = {key: dict(value) if isinstance(value, dict) else value for key, value in base_parameters.items()}
+        for component, attributes in variant.items():
+            if isinstance(attributes, dict) and isinstance(parameters.get(component), dict):
+                parameters[component].update(attributes)
+            else:
+                parameters[component] = attributes
+        sweep_parameters.append(parameters)
+    return sweep_parameters
+
+
+def simulate_sweep(
+    scenario: str,
+    parameter_sets: Optional[list[dict]] = None,
+    grid: Optional[dict] = None,
+    base_parameters: Optional[dict] = None,
+    calculations: Optional[list[str]] = None,
+) -> models.SimulationBatch:
+    """
+    Starts simulations of all variants of a parameter sweep as one batch
+
+    Variants already stored are skipped, variants already pending are shared with the pending task.
+    Remaining variants are dispatched as celery group. If calculations are given, they are precomputed for each
+    started variant right after it has been stored (see `get_simulation_signature`), thus, failing variants do not
+    block others, and for already stored variants in a separate task. Variants pending in other tasks are not waited
+    for; their results are calculated on demand when collecting batch results (see `results.get_batch_results`).
+
+    Parameters
+    ----------
+    scenario: str
+        Name of scenario (used to load related datapackage)
+    parameter_sets: Optional[list[dict]]
+        Explicit parameter sets (see `get_sweep_parameters`)
+    grid: Optional[dict]
+        Candidate values per component attribute (see `get_sweep_parameters`)
+    base_parameters: Optional[dict]
+        Parameters shared by all variants
+    calculations: Optional[list[str]]
+        Names of calculations (see `results.CALCULATIONS`) to precompute for all batch members
+
+    Returns
+    -------
+    models.SimulationBatch
+        Batch holding all variants, which can be used to track progress and to collect results
+    """
+    # pylint: disable=E1101
+    variants = {}
+    for parameters in get_sweep_parameters(parameter_sets, grid, base_parameters):
+        parameters = add_simulation_settings(scenario, parameters)
+        variants.setdefault(models.get_parameters_hash(parameters), parameters)
+    stored = set(
+        get_stored_simulations(scenario).filter(parameters_hash__in=variants).values_list("parameters_hash", flat=True)
+    )
+
+    task_ids = {}
+    started_task_ids = []
+    signatures = []
+    for parameters_hash, parameters in variants.items():
+        if parameters_hash in stored:
+            continue
+        task_id, created = reserve_simulation(scenario, parameters)
+        task_ids[parameters_hash] = task_id
+        if created:
+            started_task_ids.append(task_id)
+            signatures.append(get_simulation_signature(scenario, parameters, task_id, calculations))
+
+    batch = models.SimulationBatch.objects.create(
+        scenario=scenario,
+        parameters=list(variants.values()),
+        parameters_hashes=list(variants),
+        task_ids=task_ids,
+        calculations=calculations or [],
+    )
+    logging.info(
+        f"Started simulation batch #{batch.id} for {scenario=} with {len(variants)} variants "
+        f"({len(stored)} already stored, {len(signatures)} new simulation tasks)."
+    )
+
+    # pylint: disable=C0415
+    from django_oemof.results import calculate_batch_results
+
+    try:
+        if signatures:
+            group(signatures).apply_async()
+        if stored and calculations:
+            calculate_batch_results.delay(batch.id)
+    except Exception:
+        models.PendingSimulation.objects.filter(task_id__in=started_task_ids).delete()
+        models.SimulationTask.objects.filter(task_id__in=started_task_ids).delete()
+        raise
+    return batch
+
+
 @shared_task
 def simulate_scenario(scenario: str, parameters: dict, lp_file: Optional[str] = None) -> int:
     """
     Returns ID to oemof results from simulated/restored scenario
 
     Already stored scenarios are identified by scenario name and
-    adapted parameters.
+    canonical hash of adapted parameters.
+    Settings of time series aggregation and rolling horizon are added to parameters (see `add_simulation_settings`).
+    Related pending simulation (see `start_simulation`) is removed after run.
+    Status and progress stage of run are tracked in related `models.SimulationTask`.
 
     Parameters
     ----------
@@ -45,41 +383,369 @@ def simulate_scenario(scenario: str, parameters: dict, lp_file: Optional[str] =
     int
         Simulation ID where results are stored
     """
+    parameters = add_simulation_settings(scenario, parameters)
+    parameters_hash = models.get_parameters_hash(parameters)
     try:
-        simulation = models.Simulation.objects.get(scenario=scenario, parameters=parameters)  # pylint: disable=E1101
+        simulation_id = _simulate_scenario(scenario, parameters, parameters_hash, lp_file)
+    except Exception as error:
+        fail_simulation_task(scenario, parameters_hash, error)
+        raise
+    finish_simulation_task(scenario, parameters_hash, simulation_id)
+    return simulation_id
+
+
+def _simulate_scenario(scenario: str, parameters: dict, parameters_hash: str, lp_file: Optional[str] = None) -> int:
+    """
+    Looks up stored simulation or simulates scenario (see `simulate_scenario`)
+
+    Stored incumbent solutions (i.e. found before time limit) are only used if DJANGO_OEMOF_ACCEPT_INCUMBENT is set;
+    otherwise, simulation is solved again using a longer time limit and stored results are replaced.
+    """
+    # pylint: disable=E1101
+    stored_simulation = models.Simulation.objects.filter(scenario=scenario, parameters_hash=parameters_hash).first()
+    if stored_simulation and is_reusable(stored_simulation):
         logging.info(f"Simulation for {scenario=} and {parameters=} already present.")
-    except models.Simulation.DoesNotExist:  # pylint: disable=E1101
+        return stored_simulation.id
+    solved = solve_scenario_results(scenario, parameters, parameters_hash, stored_simulation, lp_file)
+    if solved is None:
+        return None
+    input_data, results_data, meta_results, timer = solved
+    with timer.stage("store_results"):
+        dataset = models.OemofDataset.store_results(input_data, results_data, meta_results)
+    return save_simulation(scenario, parameters, parameters_hash, stored_simulation, dataset, timer.to_dict())
+
+
+def solve_scenario_results(
+    scenario: str,
+    parameters: dict,
+    parameters_hash: str,
+    stored_simulation: Optional[models.Simulation] = None,
+    lp_file: Optional[str] = None,
+) -> Optional[tuple[dict, dict, dict, profiling.StageTimer]]:
+    """
+    Builds and solves scenario and returns processed inputs and results (see `simulate_energysystem`)
+
+    If a stored simulation is given (holding incumbent solution only), time limit of solver is extended.
+
+    Returns
+    -------
+    Optional[tuple[dict, dict, dict, profiling.StageTimer]]
+        Inputs, results and meta results of simulation and timer holding timings of stages
+        or None if simulation is infeasible
+
+    Raises
+    ------
+    SimulationError
+        If solver terminated without feasible solution
+    """
+    solver = None
+    if stored_simulation:
+        solver = get_extended_solver(scenario, stored_simulation)
+        logging.info(
+            f"Simulation #{stored_simulation.id} for {scenario=} holds incumbent solution only "
+            f"(status '{stored_simulation.status}', gap {stored_simulation.gap}). "
+            f"Solving again with time limit of {solver.timelimit}s."
+        )
+    else:
         logging.info(f"Simulating energysystem for {scenario=} and {parameters=}.")
-        oemof_datapackage = f"{settings.MEDIA_ROOT}/oemof/{scenario}/datapackage.json"
+    timer = profiling.StageTimer(on_stage=task_status.get_stage_callback(scenario, parameters_hash))
+    oemof_datapackage = f"{settings.MEDIA_ROOT}/oemof/{scenario}/datapackage.json"
+    with timer.stage("build_energysystem"):
         energysystem = build_energysystem(oemof_datapackage)
+    with timer.stage("parameter_hooks"):
         build_parameters = hooks.apply_hooks(hook_type=hooks.HookType.PARAMETER, scenario=scenario, data=parameters)
+    aggregation_settings = build_parameters.pop(aggregation.PARAMETER_KEY, None)
+    rolling_horizon_settings = build_parameters.pop(rolling_horizon.PARAMETER_KEY, None)
+    with timer.stage("adapt_energysystem"):
         energysystem = adapt_energysystem(energysystem, build_parameters)
+    with timer.stage("energysystem_hooks"):
         energysystem = hooks.apply_hooks(hook_type=hooks.HookType.ENERGYSYSTEM, scenario=scenario, data=energysystem)
-        termination_condition, input_data, results_data, meta_results = simulate_energysystem(
-            scenario, energysystem, lp_file
-        )
+    initial_solution = None
+    warm_start_key = None
+    if do_settings.DJANGO_OEMOF_WARM_START and not (aggregation_settings or rolling_horizon_settings):
+        with timer.stage("warm_start"):
+            warm_start_key = warm_start.get_warm_start_key(get_datapackage_hash(oemof_datapackage), energysystem)
+            initial_solution = warm_start.get_warm_start(scenario, parameters, warm_start_key)
+    termination_condition, input_data, results_data, meta_results = simulate_energysystem(
+        scenario,
+        energysystem,
+        lp_file,
+        timer=timer,
+        aggregation_settings=aggregation_settings,
+        rolling_horizon_settings=rolling_horizon_settings,
+        initial_solution=initial_solution,
+        solver=solver,
+    )
+    if results_data is None:
         if termination_condition == "infeasible":
             logging.warning(f"Simulation run for {scenario=} and {parameters=} is infeasible.")
-            return
-        dataset = models.OemofDataset.store_results(input_data, results_data, meta_results)
-        # pylint: disable=E1101
-        try:
-            # Add additional check in case simulation with same parameters has been run in parallel
-            simulation = models.Simulation.objects.get(scenario=scenario, parameters=parameters)
-            logging.info(
-                f"Simulation results for {scenario=} and {parameters=} are stored already by other simulation run."
+            return None
+        raise SimulationError(
+            f"Simulation run for {scenario=} and {parameters=} terminated with '{termination_condition}' "
+            "without feasible solution."
+        )
+    if meta_results["status"] != "optimal":
+        logging.warning(
+            f"Simulation run for {scenario=} and {parameters=} terminated with '{termination_condition}'. "
+            f"Storing incumbent solution (gap {meta_results['gap']})."
+        )
+    if warm_start_key:
+        meta_results["warm_start_key"] = warm_start_key
+    return input_data, results_data, meta_results, timer
+
+
+def save_simulation(
+    scenario: str,
+    parameters: dict,
+    parameters_hash: str,
+    stored_simulation: Optional[models.Simulation],
+    dataset: models.OemofDataset,
+    timings: dict,
+) -> int:
+    """
+    Creates simulation for stored dataset or replaces results of given stored simulation and returns its ID
+
+    Precomputation of configured calculations is started for created or replaced simulations
+    (see `schedule_precomputation`).
+    """
+    # pylint: disable=E1101
+    logging.info(f"Simulation for {scenario=} took {timings['total_seconds']:.3f}s.")
+    solution = {"status": dataset.meta_results["status"], "gap": dataset.meta_results["gap"]}
+    if stored_simulation:
+        replace_simulation_results(stored_simulation, dataset, timings, **solution)
+        logging.info(f"Replaced simulation results for {scenario=} and {parameters=}.")
+        schedule_precomputation(scenario, stored_simulation.id)
+        return stored_simulation.id
+    try:
+        with transaction.atomic():
+            simulation = models.Simulation.objects.create(
+                scenario=scenario, parameters=parameters, dataset=dataset, timings=timings, **solution
             )
-        except models.Simulation.DoesNotExist:
-            simulation = models.Simulation.objects.create(scenario=scenario, parameters=parameters, dataset=dataset)
-            simulation.save()
-            logging.info(f"Stored simulation results for {scenario=} and {parameters=}.")
+        logging.info(f"Stored simulation results for {scenario=} and {parameters=}.")
+        schedule_precomputation(scenario, simulation.id)
+    except IntegrityError:
+        # Unique constraint is violated in case simulation with same parameters has been run in parallel
+        simulation = models.Simulation.objects.get(scenario=scenario, parameters_hash=parameters_hash)
+        logging.info(
+            f"Simulation results for {scenario=} and {parameters=} are stored already by other simulation run."
+        )
     return simulation.id
 
 
+def schedule_precomputation(scenario: str, simulation_id: int, calculations: Optional[list[str]] = None):
+    """
+    Starts background task precomputing given calculations for simulation
+
+    If no calculations are given, calculations configured for scenario are used
+    (see `results.get_precompute_calculations`).
+    Task is routed to DJANGO_OEMOF_PRECOMPUTE_QUEUE. Failing to start the task does not fail the simulation,
+    as results are calculated on request anyway.
+    """
+    # pylint: disable=C0415
+    from django_oemof.results import get_precompute_calculations, precompute_results
+
+    calculations = calculations if calculations is not None else get_precompute_calculations(scenario)
+    if not calculations:
+        return
+    try:
+        precompute_results.apply_async(
+            (simulation_id, calculations), **get_queue_options(do_settings.DJANGO_OEMOF_PRECOMPUTE_QUEUE)
+        )
+    except Exception as error:  # pylint: disable=W0703
+        logging.warning(f"Could not start precomputation of {calculations} for simulation #{simulation_id}: {error}")
+
+
+@shared_task
+def solve_scenario(scenario: str, parameters: dict, lp_file: Optional[str] = None) -> Union[dict, int, None]:
+    """
+    Solve stage of simulation pipeline (see `get_simulation_signature`)
+
+    Builds and solves scenario (unless already stored) and serializes results into handoff directory
+    (see `django_oemof.handoff`), which is passed on to store stage (`store_scenario`).
+    Handoff directory is named after task ID, thus, it can be removed when simulation is terminated.
+
+    Parameters
+    ----------
+    scenario: str
+        Name of scenario (used to load related datapackage)
+    parameters: dict
+        Parameters which are adapted to ES before simulation
+    lp_file: Optional[str]
+        If set, LP file is stored under given path
+
+    Returns
+    -------
+    Union[dict, int, None]
+        Handoff to store stage, ID of already stored simulation or None if simulation is infeasible
+    """
+    parameters = add_simulation_settings(scenario, parameters)
+    parameters_hash = models.get_parameters_hash(parameters)
+    try:
+        # pylint: disable=E1101
+        stored_simulation = models.Simulation.objects.filter(scenario=scenario, parameters_hash=parameters_hash).first()
+        if stored_simulation and is_reusable(stored_simulation):
+            logging.info(f"Simulation for {scenario=} and {parameters=} already present.")
+            finish_simulation_task(scenario, parameters_hash, stored_simulation.id)
+            return stored_simulation.id
+        solved = solve_scenario_results(scenario, parameters, parameters_hash, stored_simulation, lp_file)
+        if solved is None:
+            finish_simulation_task(scenario, parameters_hash, None)
+            return None
+        input_data, results_data, meta_results, timer = solved
+        with timer.stage("serialize_results"):
+            handoff_path = handoff.write_handoff(
+                input_data, results_data, meta_results, handoff_id=solve_scenario.request.id
+            )
+    except Exception as error:
+        fail_simulation_task(scenario, parameters_hash, error)
+        raise
+    return {
+        "handoff": handoff_path,
+        "task_id": solve_scenario.request.id,
+        "scenario": scenario,
+        "parameters": parameters,
+        "parameters_hash": parameters_hash,
+        "simulation_id": stored_simulation.id if stored_simulation else None,
+        "timings": timer.to_dict(),
+    }
+
+
+@shared_task
+def store_scenario(solved: Union[dict, int, None]) -> Optional[int]:
+    """
+    Store stage of simulation pipeline (see `get_simulation_signature`)
+
+    Stores serialized results from handoff directory and removes handoff directory afterwards.
+    If simulation has been terminated after solve stage, results are discarded (and None is passed on).
+
+    Parameters
+    ----------
+    solved: Union[dict, int, None]
+        Output of solve stage (see `solve_scenario`); simulation IDs and None are passed through
+
+    Returns
+    -------
+    Optional[int]
+        Simulation ID where results are stored (None if simulation is infeasible)
+    """
+    if not isinstance(solved, dict):
+        return solved
+    if task_status.is_revoked(solved["task_id"]):
+        logging.info(f"Simulation task #{solved['task_id']} has been terminated. Discarding results.")
+        handoff.remove_handoff(solved["handoff"])
+        return None
+    scenario, parameters, parameters_hash = solved["scenario"], solved["parameters"], solved["parameters_hash"]
+    timer = profiling.StageTimer(
+        on_stage=task_status.get_stage_callback(scenario, parameters_hash), stages=solved["timings"]["stages"]
+    )
+    try:
+        with timer.stage("load_handoff"):
+            serialized = handoff.read_handoff(solved["handoff"])
+        with timer.stage("store_results"):
+            dataset = models.OemofDataset.store_serialized_results(
+                serialized.input_data, serialized.result_data, serialized.meta_results, serialized.flow_totals
+            )
+        # Stored simulation may have been deleted in the meantime
+        stored_simulation = (
+            models.Simulation.objects.filter(pk=solved["simulation_id"]).first()  # pylint: disable=E1101
+            if solved["simulation_id"]
+            else None
+        )
+        simulation_id = save_simulation(
+            scenario, parameters, parameters_hash, stored_simulation, dataset, timer.to_dict()
+        )
+    except Exception as error:
+        fail_simulation_task(scenario, parameters_hash, error)
+        raise
+    finally:
+        handoff.remove_handoff(solved["handoff"])
+    finish_simulation_task(scenario, parameters_hash, simulation_id)
+    return simulation_id
+
+
+def finish_simulation_task(scenario: str, parameters_hash: str, simulation_id: Optional[int]):
+    """
+    Sets status of simulation task to finished (infeasible if simulation ID is None), removes pending simulation
+
+    Calculations requested by identical requests while simulation was pending are precomputed
+    (see `add_pending_calculations`).
+    """
+    # pylint: disable=E1101
+    task_status.update_task_status(
+        scenario,
+        parameters_hash,
+        status="finished" if simulation_id is not None else "infeasible",
+        simulation_id=simulation_id,
+    )
+    with transaction.atomic():
+        pending_simulation = (
+            models.PendingSimulation.objects.select_for_update()
+            .filter(scenario=scenario, parameters_hash=parameters_hash)
+            .first()
+        )
+        calculations = pending_simulation.calculations if pending_simulation else []
+        models.PendingSimulation.objects.filter(scenario=scenario, parameters_hash=parameters_hash).delete()
+    if simulation_id is not None and calculations:
+        schedule_precomputation(scenario, simulation_id, calculations)
+
+
+def fail_simulation_task(scenario: str, parameters_hash: str, error: Exception):
+    """Sets status of simulation task to failed and removes pending simulation"""
+    # pylint: disable=E1101
+    task_status.update_task_status(scenario, parameters_hash, status="failed", error=str(error))
+    models.PendingSimulation.objects.filter(scenario=scenario, parameters_hash=parameters_hash).delete()
+
+
+def is_reusable(simulation: models.Simulation) -> bool:
+    """Returns True if stored simulation satisfies lookups (incumbent solutions only if accepted via settings)"""
+    return simulation.status == "optimal" or do_settings.DJANGO_OEMOF_ACCEPT_INCUMBENT
+
+
+def get_stored_simulations(scenario: str):
+    """Returns queryset of stored simulations of scenario which satisfy lookups (see `is_reusable`)"""
+    simulations = models.Simulation.objects.filter(scenario=scenario)  # pylint: disable=E1101
+    if not do_settings.DJANGO_OEMOF_ACCEPT_INCUMBENT:
+        simulations = simulations.filter(status="optimal")
+    return simulations
+
+
+def get_extended_solver(scenario: str, simulation: models.Simulation) -> solvers.Solver:
+    """
+    Returns solver of scenario with time limit extended by DJANGO_OEMOF_TIMELIMIT_FACTOR
+
+    Time limit used for stored simulation is extended; if unknown, time limit of solver is extended.
+    """
+    solver = solvers.get_solver(scenario)
+    timelimit = simulation.dataset.meta_results.get("timelimit") if simulation.dataset else None
+    timelimit = timelimit or solver.timelimit
+    if timelimit is None:
+        return solver
+    return dataclasses.replace(solver, timelimit=int(math.ceil(timelimit * do_settings.DJANGO_OEMOF_TIMELIMIT_FACTOR)))
+
+
+def replace_simulation_results(
+    simulation: models.Simulation, dataset: models.OemofDataset, timings: dict, status: str, gap: Optional[float]
+):
+    """Replaces results of stored simulation and removes outdated dataset and calculated results"""
+    with transaction.atomic():
+        outdated_dataset = simulation.dataset
+        simulation.dataset = dataset
+        simulation.timings = timings
+        simulation.status = status
+        simulation.gap = gap
+        simulation.save()
+        simulation.results.all().delete()
+        if outdated_dataset:
+            outdated_dataset.delete()
+
+
 def build_energysystem(oemof_datapackage: str):
     """
     Builds energysystem from datapackage
 
+    If setting `DJANGO_OEMOF_ES_CACHE` is active, built energysystem is cached on disk (keyed by content hash of
+    datapackage) and restored from cache on next build.
+
     Parameters
     ----------
     oemof_datapackage: str
@@ -89,8 +755,143 @@ def build_energysystem(oemof_datapackage: str):
     -------
     energysystem: Energysystem build from datapacakge
     """
+    if not do_settings.DJANGO_OEMOF_ES_CACHE:
+        logging.info(f"Building energysystem from datapackage at '{oemof_datapackage}'.")
+        return solph.EnergySystem.from_datapackage(oemof_datapackage, typemap=TYPEMAP)
+
+    cache_file = get_energysystem_cache_file(oemof_datapackage)
+    if cache_file.exists():
+        try:
+            energysystem = restore_energysystem(cache_file)
+        except Exception as error:  # pylint: disable=W0703
+            logging.warning(f"Could not restore energysystem from cache file '{cache_file}': {error}")
+        else:
+            logging.info(f"Restored energysystem for datapackage at '{oemof_datapackage}' from cache.")
+            return energysystem
+
     logging.info(f"Building energysystem from datapackage at '{oemof_datapackage}'.")
-    return solph.EnergySystem.from_datapackage(oemof_datapackage, typemap=TYPEMAP)
+    energysystem = solph.EnergySystem.from_datapackage(oemof_datapackage, typemap=TYPEMAP)
+    try:
+        cache_energysystem(energysystem, cache_file)
+    except Exception as error:  # pylint: disable=W0703
+        logging.warning(f"Could not cache energysystem for datapackage at '{oemof_datapackage}': {error}")
+    return energysystem
+
+
+def get_datapackage_hash(oemof_datapackage: str) -> str:
+    """
+    Returns content hash of datapackage
+
+    Hash covers datapackage.json, all related resources and versions of oemof.solph and oemof.tabular.
+
+    Parameters
+    ----------
+    oemof_datapackage: str
+        Path to oemof.tabular datapackage
+
+    Returns
+    -------
+    str
+        SHA256 hex digest
+    """
+    datapackage_path = pathlib.Path(oemof_datapackage)
+    content_hash = hashlib.sha256(f"{solph.__version__}-{oemof.tabular.__version__}".encode())
+    descriptor = datapackage_path.read_bytes()
+    content_hash.update(descriptor)
+    for resource in json.loads(descriptor).get("resources", []):
+        paths = resource.get("path", [])
+        for path in paths if isinstance(paths, list) else [paths]:
+            content_hash.update(path.encode())
+            content_hash.update((datapackage_path.parent / path).read_bytes())
+    return content_hash.hexdigest()
+
+
+def get_energysystem_cache_file(oemof_datapackage: str) -> pathlib.Path:
+    """Returns path to cache file of energysystem built from given datapackage"""
+    scenario = pathlib.Path(oemof_datapackage).parent.name
+    return do_settings.OEMOF_ES_CACHE_DIR / f"{scenario}-{get_datapackage_hash(oemof_datapackage)}.pickle"
+
+
+def cache_energysystem(energysystem: solph.EnergySystem, cache_file: pathlib.Path):
+    """
+    Stores snapshot of energysystem in cache file and removes outdated cache files of same datapackage
+
+    Parameters
+    ----------
+    energysystem: EnergySystem
+        Energysystem as built from datapackage
+    cache_file: pathlib.Path
+        Path to cache file
+    """
+    snapshot = {
+        key: value for key, value in energysystem.__dict__.items() if key not in ENERGYSYSTEM_CACHE_EXCLUDED_ATTRIBUTES
+    }
+    cache_file.parent.mkdir(parents=True, exist_ok=True)
+    with tempfile.NamedTemporaryFile(dir=cache_file.parent, delete=False) as tmp_file:
+        pickle.dump(snapshot, tmp_file, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp_file.name, cache_file)
+    scenario = cache_file.name.rsplit("-", 1)[0]
+    for outdated_cache_file in cache_file.parent.glob(f"{scenario}-*.pickle"):
+        if outdated_cache_file != cache_file:
+            outdated_cache_file.unlink(missing_ok=True)
+    logging.info(f"Cached energysystem in '{cache_file}'.")
+
+
+def restore_energysystem(cache_file: pathlib.Path) -> solph.EnergySystem:
+    """
+    Restores energysystem from cache file
+
+    Groupings are set up freshly by EnergySystem and groups are rebuilt on first access.
+
+    Parameters
+    ----------
+    cache_file: pathlib.Path
+        Path to cache file
+
+    Returns
+    -------
+    energysystem: Energysystem restored from cache
+    """
+    energysystem = solph.EnergySystem()
+    with open(cache_file, "rb") as snapshot_file:
+        energysystem.__dict__.update(pickle.load(snapshot_file))  # noqa: S301
+    rehash_node_containers(energysystem.nodes)
+    energysystem.typemap = TYPEMAP
+    return energysystem
+
+
+def rehash_node_containers(nodes):
+    """
+    Rebuilds dicts and sets holding nodes of unpickled energysystem
+
+    Hashes of nodes depend on their labels. As nodes are referencing each other, some of them are hashed while
+    unpickling before their labels are restored. Rebuilding related dicts and sets fixes their hashes.
+    """
+    seen = set()
+    stack = list(nodes)
+    while stack:
+        obj = stack.pop()
+        if id(obj) in seen:
+            continue
+        seen.add(id(obj))
+        if isinstance(obj, dict):
+            items = list(obj.items())
+            obj.clear()
+            obj.update(items)
+            stack.extend(item for key_value in items for item in key_value)
+        elif isinstance(obj, set):
+            items = list(obj)
+            obj.clear()
+            obj.update(items)
+            stack.extend(items)
+        elif isinstance(obj, (list, tuple)):
+            stack.extend(obj)
+        elif type(obj).__module__.startswith("oemof"):
+            stack.extend(getattr(obj, "__dict__", {}).values())
+            for cls in type(obj).__mro__:
+                slots = getattr(cls, "__slots__", ())
+                slots = (slots,) if isinstance(slots, str) else slots
+                stack.extend(getattr(obj, slot) for slot in slots if hasattr(obj, slot))
 
 
 def adapt_energysystem(energysystem: solph.EnergySystem, parameters: dict):
@@ -114,25 +915,30 @@ def adapt_energysystem(energysystem: solph.EnergySystem, parameters: dict):
     parameters = parameters or {}
     logging.info(f"Adapting parameters in ES using {parameters=}.")
 
+    start = time.perf_counter()
+    nodes = {node.label: node for node in energysystem.nodes}
+    index_time = time.perf_counter()
+
+    adapted_nodes = []
     for node_name, attributes in parameters.items():
         if node_name == "flow":
             logging.warning(
                 f"This is deprecated. Flows are adapted using input_parameters and output_parameters instead."
             )
             continue
-        if node_name not in [n.label for n in energysystem.nodes]:
+        if node_name not in nodes:
             log_msg = f"Cannot adapt component '{node_name}', as it cannot be found in energysystem."
             logging.warning(log_msg)
             continue
         if not isinstance(attributes, dict):
             log_msg = (
-                f"Cannot adapt attributes for component '{node_name}', as there is no dictionary. Skipping it." 
+                f"Cannot adapt attributes for component '{node_name}', as there is no dictionary. Skipping it."
                 """Try something like {"wind_onshore": {"capacity": 100}} instead."""
             )
             logging.warning(log_msg)
             continue
 
-        node = next(n for n in energysystem.nodes if node_name == n.label)
+        node = nodes[node_name]
         for attribute, value in attributes.items():
             if not hasattr(node, attribute):
                 logging.warning(
@@ -140,11 +946,32 @@ def adapt_energysystem(energysystem: solph.EnergySystem, parameters: dict):
                     "Adapting the attribute might have no effect."
                 )
             setattr(node, attribute, value)
+        adapted_nodes.append(node)
+    attribute_time = time.perf_counter()
+
+    for node in adapted_nodes:
         node.update()
+    update_time = time.perf_counter()
+
+    logging.info(
+        f"Adapted {len(adapted_nodes)} components in ES "
+        f"(indexing: {index_time - start:.3f}s, "
+        f"attributes: {attribute_time - index_time:.3f}s, "
+        f"update: {update_time - attribute_time:.3f}s)."
+    )
     return energysystem
 
 
-def simulate_energysystem(scenario, energysystem, lp_file: Optional[str] = None):
+def simulate_energysystem(
+    scenario,
+    energysystem,
+    lp_file: Optional[str] = None,
+    timer: Optional[profiling.StageTimer] = None,
+    aggregation_settings: Optional[dict] = None,
+    rolling_horizon_settings: Optional[dict] = None,
+    initial_solution: Optional[warm_start.WarmStart] = None,
+    solver: Optional[solvers.Solver] = None,
+):
     """
     Simulates ES, stores results to DB and returns simulation ID
 
@@ -156,38 +983,280 @@ def simulate_energysystem(scenario, energysystem, lp_file: Optional[str] = None)
         Built energysystem to be solved
     lp_file: Optional[str]
         If set, LP file is stored under given path
+    timer: Optional[profiling.StageTimer]
+        If set, stages of simulation are timed using given timer
+    aggregation_settings: Optional[dict]
+        If set, time series of ES are aggregated into typical periods before building the model and results are
+        disaggregated to full timeline afterwards (see `aggregation.get_aggregation_settings`)
+    rolling_horizon_settings: Optional[dict]
+        If set, ES is solved in consecutive windows and results are stitched afterwards
+        (see `rolling_horizon.get_rolling_horizon_settings`)
+    initial_solution: Optional[warm_start.WarmStart]
+        If set, results of stored simulation are passed to solver as initial solution (see `warm_start.get_warm_start`)
+    solver: Optional[solvers.Solver]
+        Solver used instead of solver registered for scenario
 
     Returns
     -------
     results : tuple(bool, dict, dict, dict, dict)
-        Simulation termination condition, input, results, meta results and custom results
-    """
-    logging.info(f"Building model for {scenario=}.")
-    model = solph.Model(energysystem)
-    model = hooks.apply_hooks(hook_type=hooks.HookType.MODEL, scenario=scenario, data=model)
-    logging.info(f"Starting simulation for {scenario=}.")
-    model_results = model.solve(
-        solver="cbc", cmdline_options={"mipgap": "0.1", "seconds": do_settings.DJANGO_OEMOF_TIMELIMIT}
-    )
-    if lp_file:
-        model.write(lp_file, io_options={"symbolic_solver_labels": True})
-    logging.info(f"Simulation for {scenario=} finished.")
+        Simulation termination condition, input, results, meta results and custom results.
+        Input and results are None if no feasible solution has been found.
+        Meta results hold status of solution (see `solvers.get_solution_status`) and its gap.
+    """
+    timer = timer or profiling.StageTimer()
+    if rolling_horizon_settings:
+        if aggregation_settings:
+            raise ValueError("Time series aggregation and rolling horizon cannot be combined.")
+        if initial_solution:
+            raise ValueError("Warm start is not supported for rolling horizon.")
+        termination_condition, results_data, meta_results, model = solve_rolling_horizon(
+            scenario, energysystem, rolling_horizon_settings, lp_file, timer, solver=solver
+        )
+    else:
+        termination_condition, results_data, meta_results, model = solve_energysystem(
+            scenario,
+            energysystem,
+            lp_file,
+            timer,
+            aggregation_settings,
+            initial_solution=initial_solution,
+            solver=solver,
+        )
+    if results_data is None:
+        return termination_condition, None, None, meta_results
+
+    with timer.stage("parameter_as_dict"):
+        input_data = solph.processing.parameter_as_dict(
+            energysystem,
+            exclude_attrs=["bus", "from_bus", "to_bus", "from_node", "to_node"],
+        )
+    with timer.stage("postprocessing_hooks"):
+        meta_results = hooks.apply_hooks(
+            hook_type=hooks.HookType.POSTPROCESSING, scenario=scenario, data=meta_results, additional_data=model
+        )
+    with timer.stage("convert_keys_to_strings"):
+        input_data, results_data = map(solph.processing.convert_keys_to_strings, (input_data, results_data))
+
+    return termination_condition, input_data, results_data, meta_results
 
-    input_data = solph.processing.parameter_as_dict(
-        energysystem,
-        exclude_attrs=["bus", "from_bus", "to_bus", "from_node", "to_node"],
-    )
-    results_data = solph.processing.results(model)
-    # Clean-up meta results by dumping and loading and neglecting non-serializable key/values
-    meta_results = json.loads(
-        json.dumps(solph.processing.meta_results(model), skipkeys=True, default=lambda x: "Not serializable")
-    )
-    meta_results = hooks.apply_hooks(
-        hook_type=hooks.HookType.POSTPROCESSING, scenario=scenario, data=meta_results, additional_data=model
-    )
 
-    return (
-        model_results.solver.termination_condition,
-        *map(solph.processing.convert_keys_to_strings, (input_data, results_data)),
-        meta_results,
+def solve_energysystem(
+    scenario,
+    energysystem,
+    lp_file: Optional[str] = None,
+    timer: Optional[profiling.StageTimer] = None,
+    aggregation_settings: Optional[dict] = None,
+    reuse_model: bool = True,
+    initial_solution: Optional[warm_start.WarmStart] = None,
+    solver: Optional[solvers.Solver] = None,
+    storage_end_levels: Optional[dict] = None,
+):
+    """
+    Builds and solves model of ES and processes results
+
+    If model cache is enabled (see DJANGO_OEMOF_MODEL_CACHE_SIZE), cached model of same structure is updated and reused
+    instead of building a new model.
+
+    Parameters
+    ----------
+    scenario: str
+        Name of current scenario (used to apply hooks and to get solver)
+    energysystem : EnergySystem
+        Built energysystem to be solved
+    lp_file: Optional[str]
+        If set, LP file is stored under given path
+    timer: Optional[profiling.StageTimer]
+        If set, stages are timed using given timer
+    aggregation_settings: Optional[dict]
+        If set, time series of ES are aggregated into typical periods (see `simulate_energysystem`)
+    reuse_model: bool
+        If False, model is neither taken from nor put into model cache
+    initial_solution: Optional[warm_start.WarmStart]
+        If set, values of model variables are initialized from results of stored simulation and passed to solver
+        (not supported together with time series aggregation)
+    solver: Optional[solvers.Solver]
+        Solver used instead of solver registered for scenario
+    storage_end_levels: Optional[dict]
+        If set, storage content at end of horizon is fixed to given relative levels (by storage),
+        used to balance storages over all windows of rolling horizon
+
+    Returns
+    -------
+    tuple
+        Termination condition, results (keyed by nodes, None if no feasible solution has been found),
+        meta results and solved model
+    """
+    timer = timer or profiling.StageTimer()
+    with ExitStack() as stack:
+        with timer.stage("aggregate_timeseries"):
+            typical_periods = stack.enter_context(
+                aggregation.aggregated_energysystem(energysystem, aggregation_settings)
+            )
+        logging.info(f"Building model for {scenario=}.")
+        with timer.stage("build_model"):
+            model, signature = None, None
+            if typical_periods:
+                model = solph.Model(
+                    energysystem,
+                    objective_weighting=aggregation.get_objective_weighting(
+                        typical_periods, energysystem.timeincrement
+                    ),
+                )
+            elif reuse_model:
+                model, signature = model_cache.MODEL_CACHE.checkout(scenario, energysystem)
+            model_reused = model is not None
+            if not model_reused:
+                model = solph.Model(energysystem)
+        # Model hooks are re-applied to cached models, as objective has been rebuilt and parameters may have changed
+        with timer.stage("model_hooks"):
+            with model_cache.silenced_pyomo_warnings() if model_reused else nullcontext():
+                model = hooks.apply_hooks(hook_type=hooks.HookType.MODEL, scenario=scenario, data=model)
+        if storage_end_levels:
+            rolling_horizon.fix_storage_end_levels(model, storage_end_levels)
+        if initial_solution:
+            if typical_periods:
+                raise ValueError("Warm start is not supported for time series aggregation.")
+            with timer.stage("initial_values"):
+                initialized_variables = warm_start.set_initial_values(model, initial_solution.results_data)
+        logging.info(f"Starting simulation for {scenario=}.")
+        solver = solver or solvers.get_solver(scenario)
+        with timer.stage("solve"):
+            model_results = solver.solve(model, warmstart=initial_solution is not None)
+        if lp_file:
+            model.write(lp_file, io_options={"symbolic_solver_labels": True})
+        logging.info(f"Simulation for {scenario=} finished.")
+
+        status = solvers.get_solution_status(model_results)
+        results_data = None
+        if status:
+            with timer.stage("processing_results"):
+                results_data = solph.processing.results(model)
+        # Clean-up meta results by dumping and loading and neglecting non-serializable key/values
+        # (NaN and infinite values, i.e. reported by HiGHS, are not supported by DB JSON fields and are set to None)
+        meta_results = json.loads(
+            json.dumps(solph.processing.meta_results(model), skipkeys=True, default=lambda x: "Not serializable"),
+            parse_constant=lambda constant: None,
+        )
+        meta_results["solver_setup"] = solver.to_dict()
+        meta_results["timelimit"] = solver.timelimit
+        meta_results["status"] = status
+        meta_results["gap"] = solvers.get_gap(model_results) if status else None
+        meta_results["model_reused"] = model_reused
+        meta_results["time_to_first_incumbent"] = getattr(model, "time_to_first_incumbent", None)
+        if initial_solution:
+            meta_results["warm_start"] = {**initial_solution.to_dict(), "variables": initialized_variables}
+        if signature:
+            model_cache.MODEL_CACHE.checkin(scenario, signature, model)
+    # Energysystem is restored to full timeline after leaving aggregation context
+    if typical_periods:
+        if results_data is not None:
+            with timer.stage("disaggregate_results"):
+                results_data = aggregation.disaggregate_results(results_data, typical_periods, energysystem.timeindex)
+        meta_results["aggregation"] = {**aggregation_settings, **typical_periods.to_dict()}
+    return model_results.solver.termination_condition, results_data, meta_results, model
+
+
+def solve_rolling_horizon(
+    scenario,
+    energysystem,
+    rolling_horizon_settings: dict,
+    lp_file: Optional[str] = None,
+    timer: Optional[profiling.StageTimer] = None,
+    solver: Optional[solvers.Solver] = None,
+):
+    """
+    Solves ES in consecutive windows (rolling horizon) and stitches results of all windows
+
+    Storage content at the end of each window is carried over as initial storage level of next window.
+    Balanced storages are balanced over full horizon: they are balanced within first window (which chooses start
+    level, if initial storage level is not set) and storage content at end of last window is fixed to start level.
+    Objective in meta results holds variable costs of stitched flows; status and gap are taken from worst window.
+
+    Parameters
+    ----------
+    scenario: str
+        Name of current scenario (used to apply hooks and to get solver)
+    energysystem : EnergySystem
+        Built energysystem to be solved
+    rolling_horizon_settings: dict
+        Complete rolling horizon settings (see `rolling_horizon.get_rolling_horizon_settings`)
+    lp_file: Optional[str]
+        If set, LP file of each window is stored under given path suffixed by window number
+    timer: Optional[profiling.StageTimer]
+        If set, stages are timed (summed over all windows) using given timer
+    solver: Optional[solvers.Solver]
+        Solver used instead of solver registered for scenario
+
+    Returns
+    -------
+    tuple
+        Termination condition, results (keyed by nodes), meta results and model of last window
+    """
+    rolling_horizon.check_energysystem(energysystem)
+    windows = rolling_horizon.get_windows(
+        energysystem.timeincrement, rolling_horizon_settings["window_hours"], rolling_horizon_settings["overlap_hours"]
     )
+    if not windows:
+        raise ValueError(f"Energysystem of {scenario=} holds no timesteps to solve in rolling horizon.")
+    logging.info(f"Solving {scenario=} in {len(windows)} windows (rolling horizon).")
+    references = aggregation.get_time_series(energysystem)
+    balanced_storages = rolling_horizon.get_balanced_storages(energysystem)
+    start_levels = {}
+    termination_condition = "optimal"
+    window_results, window_meta = [], []
+    with rolling_horizon.carried_storage_levels(energysystem) as storages:
+        for number, (start, keep_end, end) in enumerate(windows):
+            window_lp_file = f"{lp_file}.{number}" if lp_file else None
+            is_last_window = number == len(windows) - 1
+            # First window chooses start level of balanced storages by balancing them within first window
+            for storage in balanced_storages:
+                storage.balanced = number == 0
+            with aggregation.reduced_energysystem(energysystem, numpy.arange(start, end), references):
+                window_termination_condition, results_data, meta_results, model = solve_energysystem(
+                    scenario,
+                    energysystem,
+                    window_lp_file,
+                    timer,
+                    reuse_model=False,
+                    solver=solver,
+                    storage_end_levels=start_levels if is_last_window else None,
+                )
+                window_meta.append(
+                    {
+                        "start": start,
+                        "end": keep_end,
+                        "overlap_end": end,
+                        "objective": meta_results.get("objective"),
+                        "termination_condition": str(window_termination_condition),
+                        "status": meta_results["status"],
+                        "gap": meta_results["gap"],
+                    }
+                )
+                if window_termination_condition != "optimal":
+                    logging.warning(
+                        f"Window #{number} ({start}-{end}) of {scenario=} terminated with "
+                        f"'{window_termination_condition}'."
+                    )
+                    termination_condition = window_termination_condition
+                    if results_data is None:
+                        break
+                if number == 0:
+                    start_levels = rolling_horizon.get_storage_levels(balanced_storages, results_data, 0)
+                rolling_horizon.carry_storage_levels(storages, results_data, keep_end - start)
+                # Last window keeps additional last time point (i.e. storage content at end of horizon)
+                window_results.append(
+                    rolling_horizon.trim_results(results_data, None if is_last_window else keep_end - start)
+                )
+                del results_data
+
+    rolling_horizon_meta = {**rolling_horizon_settings, "windows": window_meta}
+    if len(window_results) < len(windows):
+        return termination_condition, None, {"rolling_horizon": rolling_horizon_meta, "status": None}, model
+    results_data = rolling_horizon.stitch_results(window_results, energysystem.timeindex)
+    meta_results["objective"] = rolling_horizon.get_variable_costs(energysystem, results_data)
+    meta_results["rolling_horizon"] = rolling_horizon_meta
+    statuses = [window["status"] for window in window_meta]
+    meta_results["status"] = next((status for status in ("time_limit", "feasible") if status in statuses), "optimal")
+    gaps = [window["gap"] for window in window_meta if window["gap"] is not None]
+    meta_results["gap"] = max(gaps) if gaps else None
+    return termination_condition, results_data, meta_results, model
@@ -0,0 +1,202 @@
+"""Solvers can be registered to change solver backend and options per scenario."""
+
+import logging
+import math
+import re
+import sys
+import warnings
+from dataclasses import dataclass, field
+from typing import Optional, Union
+
+from pyomo.common.tee import capture_output
+from pyomo.opt import SolverFactory
+
+from django_oemof import settings
+from django_oemof.hooks import ALL_SCENARIOS, AllScenarios
+
+# Maps generic solver options to option names of supported solvers
+OPTION_NAMES = {
+    "cbc": {"mipgap": "mipgap", "timelimit": "seconds", "threads": "threads", "presolve": "presolve"},
+    "highs": {"mipgap": "mip_rel_gap", "timelimit": "time_limit", "threads": "threads", "presolve": "presolve"},
+    "appsi_highs": {"mipgap": "mip_rel_gap", "timelimit": "time_limit", "threads": "threads", "presolve": "presolve"},
+    "glpk": {"mipgap": "mipgap", "timelimit": "tmlim"},
+    "gurobi": {"mipgap": "MIPGap", "timelimit": "TimeLimit", "threads": "Threads", "presolve": "Presolve"},
+}
+
+# Patterns of log lines reporting a new incumbent (group "seconds" holds elapsed time)
+INCUMBENT_PATTERNS = {
+    "cbc": re.compile(r"^Cbc00(?:04|12)I Integer solution of \S+ found.*\((?P<seconds>[\d.]+) seconds\)", re.MULTILINE),
+    # HiGHS MIP log: first column holds source of new solution, "BestSol" column is set once incumbent is found
+    "highs": re.compile(
+        r"^ ?[A-Za-z]\s+\d+\s+\d+\s+\d+\s+\S+\s+\S+\s+(?!inf\b)[-\d.e+]+\s.*\s(?P<seconds>[\d.]+)s\s*$", re.MULTILINE
+    ),
+}
+INCUMBENT_PATTERNS["appsi_highs"] = INCUMBENT_PATTERNS["highs"]
+
+
+def get_time_to_first_incumbent(solver_name: str, log: str) -> Optional[float]:
+    """Returns seconds until first incumbent was found as reported in solver log (None if not found or not parsable)"""
+    pattern = INCUMBENT_PATTERNS.get(solver_name)
+    match = pattern.search(log) if pattern else None
+    return float(match.group("seconds")) if match else None
+
+
+# Termination conditions of solvers stopped by time limit, whose incumbent (if any) can be used as solution
+TIME_LIMIT_TERMINATION_CONDITIONS = ("maxTimeLimit",)
+
+
+def get_bounds(solver_results) -> tuple[Optional[float], Optional[float]]:
+    """Returns primal bound (objective of incumbent) and dual bound as reported by solver (None if not finite)"""
+    problem = solver_results.problem
+    bounds = []
+    for bound in (problem.lower_bound, problem.upper_bound):
+        try:
+            bound = float(bound)
+        except (TypeError, ValueError):
+            bound = math.nan
+        bounds.append(bound if math.isfinite(bound) else None)
+    lower_bound, upper_bound = bounds
+    if str(problem.sense).endswith("maximize"):
+        return lower_bound, upper_bound
+    return upper_bound, lower_bound
+
+
+def get_gap(solver_results) -> Optional[float]:
+    """Returns relative gap between incumbent and dual bound (None if one of the bounds is not available)"""
+    primal_bound, dual_bound = get_bounds(solver_results)
+    if primal_bound is None or dual_bound is None:
+        return None
+    return abs(primal_bound - dual_bound) / max(abs(primal_bound), 1e-10)
+
+
+def get_solution_status(solver_results) -> Optional[str]:
+    """
+    Returns status of solution
+
+    Returns
+    -------
+    Optional[str]
+        "optimal", "time_limit" (incumbent found before time limit), "feasible" (incumbent found before solver
+        stopped for other reasons) or None if no feasible solution is available
+    """
+    termination_condition = solver_results.solver.termination_condition
+    if termination_condition == "optimal":
+        return "optimal"
+    if termination_condition == "infeasible" or get_bounds(solver_results)[0] is None:
+        return None
+    if termination_condition in TIME_LIMIT_TERMINATION_CONDITIONS:
+        return "time_limit"
+    return "feasible"
+
+
+@dataclass
+class Solver:
+    """
+    Solver class is used to set up solver backend and options
+
+    Generic options (mipgap, timelimit, threads and presolve) are translated into solver-specific options;
+    `options` are passed to solver as is and override generic options.
+    Unset generic options fall back to related django_oemof settings.
+    """
+
+    name: str = field(default_factory=lambda: settings.DJANGO_OEMOF_SOLVER)
+    mipgap: Optional[float] = field(default_factory=lambda: settings.DJANGO_OEMOF_MIPGAP)
+    timelimit: Optional[int] = field(default_factory=lambda: settings.DJANGO_OEMOF_TIMELIMIT)
+    threads: Optional[int] = field(default_factory=lambda: settings.DJANGO_OEMOF_SOLVER_THREADS)
+    presolve: Optional[bool] = field(default_factory=lambda: settings.DJANGO_OEMOF_SOLVER_PRESOLVE)
+    options: dict = field(default_factory=lambda: dict(settings.DJANGO_OEMOF_SOLVER_OPTIONS))
+    solver_io: Optional[str] = None
+    solve_kwargs: dict = field(default_factory=dict)
+
+    def __str__(self):
+        return f"<Solver '{self.name}'>"
+
+    def get_options(self) -> dict:
+        """Returns solver-specific options built from generic options and additional options"""
+        option_names = OPTION_NAMES.get(self.name, {})
+        options = {}
+        for generic_option in ("mipgap", "timelimit", "threads", "presolve"):
+            value = getattr(self, generic_option)
+            if value is None:
+                continue
+            if generic_option not in option_names:
+                logging.warning(f"Option '{generic_option}' is not supported by solver '{self.name}' and is skipped.")
+                continue
+            if generic_option == "presolve" and self.name != "gurobi":
+                value = "on" if value else "off"
+            options[option_names[generic_option]] = value
+        options.update(self.options)
+        return options
+
+    def to_dict(self) -> dict:
+        """Returns solver name and solver-specific options, used to store solver setup in meta results"""
+        return {"name": self.name, "options": self.get_options(), "solver_io": self.solver_io}
+
+    def solve(self, model, warmstart: bool = False):
+        """
+        Solves given model
+
+        Mirrors `oemof.solph.Model.solve`, but solver interface is only passed to solver factory if set,
+        as newer solver interfaces (i.e. HiGHS) do not accept it.
+        Solver log is captured in order to set seconds until first incumbent as `time_to_first_incumbent` of model.
+
+        Parameters
+        ----------
+        model: oemof.solph.Model
+            Model to solve
+        warmstart: bool
+            If set, current values of model variables are passed to solver as initial solution
+            (only if solver supports warm start)
+
+        Returns
+        -------
+        pyomo.opt.SolverResults
+            Results of solver
+        """
+        solver_factory_kwargs = {"solver_io": self.solver_io} if self.solver_io else {}
+        opt = SolverFactory(self.name, **solver_factory_kwargs)
+        for option, value in self.get_options().items():
+            opt.options[option] = value
+
+        solve_kwargs = dict(self.solve_kwargs)
+        if warmstart:
+            if getattr(opt, "warm_start_capable", lambda: False)():
+                solve_kwargs["warmstart"] = True
+            else:
+                logging.info(f"{self} does not support warm start. Initial values are ignored.")
+        tee = solve_kwargs.pop("tee", False)
+
+        logging.info(f"Solving model using {self} with options {self.get_options()}.")
+        with capture_output() as solver_log:
+            solver_results = opt.solve(model, tee=True, **solve_kwargs)
+        log = solver_log.getvalue()
+        if tee:
+            sys.stdout.write(log)
+        model.time_to_first_incumbent = get_time_to_first_incumbent(self.name, log)
+
+        status = solver_results["Solver"][0]["Status"]
+        termination_condition = solver_results["Solver"][0]["Termination condition"]
+        if status == "ok" and termination_condition == "optimal":
+            logging.info("Optimization successful...")
+        else:
+            warnings.warn(
+                f"Optimization ended with status {status} and termination condition {termination_condition}",
+                UserWarning,
+            )
+        model.es.results = solver_results
+        model.solver_results = solver_results
+        return solver_results
+
+
+def register_solver(solver: Solver, scenario: Union[str, AllScenarios] = ALL_SCENARIOS):
+    """Registers solver for given scenario (or all scenarios)"""
+    settings.SOLVERS[scenario] = solver
+
+
+def get_solver(scenario: str) -> Solver:
+    """Returns solver registered for given scenario, solver registered for all scenarios or default solver"""
+    if scenario in settings.SOLVERS:
+        return settings.SOLVERS[scenario]
+    if ALL_SCENARIOS in settings.SOLVERS:
+        return settings.SOLVERS[ALL_SCENARIOS]
+    return Solver()
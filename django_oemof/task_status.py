@@ -0,0 +1,185 @@
+"""Module to track status and progress stages of simulation tasks (used for long-polling and server-sent events)"""
+
+import json
+import logging
+import time
+from typing import Callable, Iterator, Optional
+
+from django.utils import timezone
+from rest_framework.renderers import BaseRenderer
+
+from . import models
+from . import settings as do_settings
+
+# Maps stages of simulation timer (see `profiling.StageTimer`) to progress stages reported to clients
+PROGRESS_STAGES = {
+    "build_energysystem": "building",
+    "parameter_hooks": "building",
+    "adapt_energysystem": "building",
+    "energysystem_hooks": "building",
+    "warm_start": "building",
+    "aggregate_timeseries": "building",
+    "build_model": "building",
+    "model_hooks": "building",
+    "initial_values": "building",
+    "solve": "solving",
+    "parameter_as_dict": "processing",
+    "processing_results": "processing",
+    "disaggregate_results": "processing",
+    "postprocessing_hooks": "processing",
+    "convert_keys_to_strings": "processing",
+    "serialize_results": "processing",
+    "load_handoff": "storing",
+    "store_results": "storing",
+}
+
+
+class EventStreamRenderer(BaseRenderer):
+    """
+    Renderer used to negotiate server-sent events via `Accept` header or `format` parameter
+
+    Events are streamed by view directly; renderer is only used to render (error) messages.
+    """
+
+    media_type = "text/event-stream"
+    format = "event-stream"
+    charset = "utf-8"
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        return format_event(data).encode(self.charset) if data is not None else b""
+
+
+def format_event(data: dict, event: str = "status") -> str:
+    """Returns data formatted as server-sent event"""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+def update_task_status(scenario: str, parameters_hash: str, **fields):
+    """
+    Updates status of all active (not finished) tasks simulating given scenario and parameters
+
+    Tasks are looked up by scenario and parameters hash, thus, status is tracked even if simulation is run
+    outside of celery worker (i.e. in eager mode).
+
+    Parameters
+    ----------
+    scenario: str
+        Name of scenario
+    parameters_hash: str
+        Canonical hash of simulation parameters
+    fields
+        Fields of `models.SimulationTask` to update (i.e. status, stage, simulation_id or error)
+    """
+    # pylint: disable=E1101
+    models.SimulationTask.objects.filter(scenario=scenario, parameters_hash=parameters_hash).exclude(
+        status__in=models.SimulationTask.FINAL_STATUSES
+    ).update(updated_at=timezone.now(), **fields)
+
+
+def is_revoked(task_id: Optional[str]) -> bool:
+    """Returns True if simulation task has been revoked (see `views.TerminateSimulationView`)"""
+    # pylint: disable=E1101
+    return task_id is not None and models.SimulationTask.objects.filter(task_id=task_id, status="revoked").exists()
+
+
+def get_stage_callback(scenario: str, parameters_hash: str) -> Callable[[str], None]:
+    """Returns callback for `profiling.StageTimer` which updates task status only if progress stage changes"""
+    current = {"stage": None}
+
+    def on_stage(stage: str):
+        progress_stage = PROGRESS_STAGES.get(stage, stage)
+        if progress_stage == current["stage"]:
+            return
+        current["stage"] = progress_stage
+        update_task_status(scenario, parameters_hash, status="running", stage=progress_stage)
+
+    return on_stage
+
+
+def get_task_status(task_id: str) -> Optional[dict]:
+    """Returns status of given task (None if task is unknown)"""
+    try:
+        task = models.SimulationTask.objects.get(task_id=task_id)  # pylint: disable=E1101
+    except models.SimulationTask.DoesNotExist:  # pylint: disable=E1101
+        return None
+    return task.to_dict()
+
+
+def is_final(task_status: dict) -> bool:
+    """Returns whether task has reached final status"""
+    return task_status["status"] in models.SimulationTask.FINAL_STATUSES
+
+
+def get_timeout(timeout: Optional[float] = None) -> float:
+    """Returns requested timeout limited by DJANGO_OEMOF_STATUS_TIMEOUT"""
+    if timeout is None:
+        return do_settings.DJANGO_OEMOF_STATUS_TIMEOUT
+    return max(0.0, min(timeout, do_settings.DJANGO_OEMOF_STATUS_TIMEOUT))
+
+
+def wait_for_task_status(
+    task_id: str, known_status: Optional[dict] = None, timeout: Optional[float] = None
+) -> Optional[dict]:
+    """
+    Waits until status or stage of task differs from known status, task has finished or timeout expired (long-poll)
+
+    Parameters
+    ----------
+    task_id: str
+        Celery task ID
+    known_status: Optional[dict]
+        Status and stage already known by client; if not set, current status is returned immediately
+    timeout: Optional[float]
+        Maximum seconds to wait, defaults to (and is limited by) DJANGO_OEMOF_STATUS_TIMEOUT
+
+    Returns
+    -------
+    Optional[dict]
+        Current status of task (None if task is unknown)
+    """
+    deadline = time.monotonic() + get_timeout(timeout)
+    while True:
+        task_status = get_task_status(task_id)
+        if task_status is None or is_final(task_status) or not known_status:
+            return task_status
+        if any(task_status[key] != known_status.get(key) for key in ("status", "stage")):
+            return task_status
+        if time.monotonic() >= deadline:
+            return task_status
+        time.sleep(do_settings.DJANGO_OEMOF_STATUS_POLL_INTERVAL)
+
+
+def iter_task_status_events(task_id: str, timeout: Optional[float] = None) -> Iterator[str]:
+    """
+    Yields server-sent event on every status change of given task until task has finished or timeout expired
+
+    Parameters
+    ----------
+    task_id: str
+        Celery task ID
+    timeout: Optional[float]
+        Maximum seconds to stream, defaults to (and is limited by) DJANGO_OEMOF_STATUS_TIMEOUT
+
+    Yields
+    ------
+    str
+        Status of task as server-sent event; stream ends with event "timeout" if task has not finished in time
+    """
+    deadline = time.monotonic() + get_timeout(timeout)
+    task_status = get_task_status(task_id)
+    if task_status is None:
+        yield format_event({"msg": f"Unknown task #{task_id}"}, event="error")
+        return
+    yield format_event(task_status)
+    while not is_final(task_status):
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            logging.debug(f"Status stream for task #{task_id} timed out.")
+            yield format_event(task_status, event="timeout")
+            return
+        new_status = wait_for_task_status(task_id, task_status, timeout=remaining)
+        if new_status is None:
+            return
+        if new_status != task_status:
+            yield format_event(new_status)
+        task_status = new_status
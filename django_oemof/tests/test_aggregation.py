@@ -0,0 +1,105 @@
+"""Tests for time series aggregation into typical periods"""
+
+import pathlib
+import tempfile
+import unittest
+from unittest import mock
+
+import numpy
+from django.test import SimpleTestCase, TransactionTestCase, override_settings
+from pyomo.opt import SolverFactory
+
+from django_oemof import aggregation, generator, models, settings, simulation, solvers, task_status
+
+
+class AggregationSettingsTest(SimpleTestCase):
+    """Test case for aggregation settings"""
+
+    def test_settings(self):
+        """Settings are completed and request settings override scenario settings"""
+        assert aggregation.get_aggregation_settings("dispatch", {}) is None
+        assert aggregation.get_aggregation_settings("dispatch", {"tsa": 4}) == {
+            "typical_periods": 4,
+            "period_hours": 24,
+            "seed": 0,
+        }
+        with mock.patch.object(settings, "DJANGO_OEMOF_AGGREGATION", {"dispatch": {"typical_periods": 2}}):
+            assert aggregation.get_aggregation_settings("dispatch", {})["typical_periods"] == 2
+            assert aggregation.get_aggregation_settings("dispatch", {"tsa": None}) is None
+            parameters = aggregation.add_aggregation_settings("dispatch", {"wind": {"capacity": 5}})
+            assert parameters["tsa"]["typical_periods"] == 2
+            assert aggregation.add_aggregation_settings("dispatch", parameters) == parameters
+            for opt_out in (None, 0):
+                parameters = aggregation.add_aggregation_settings("dispatch", {"tsa": opt_out})
+                assert parameters == {"tsa": None}
+                assert aggregation.add_aggregation_settings("dispatch", parameters) == parameters
+        assert aggregation.add_aggregation_settings("dispatch", {"tsa": None}) == {}
+        with self.assertRaises(ValueError):
+            aggregation.get_aggregation_settings("dispatch", {"tsa": {"typical_days": 4}})
+
+    def test_typical_periods(self):
+        """Periods of same type are clustered together and trailing partial period is assigned"""
+        sunny = numpy.sin(numpy.linspace(0, numpy.pi, 24)).clip(0)
+        cloudy = sunny * 0.1
+        days = [sunny, cloudy, sunny, sunny, cloudy]
+        features = numpy.concatenate(days + [sunny[:6]])[:, None]
+        typical_periods = aggregation.get_typical_periods(features, period_length=24, typical_periods=2)
+
+        assert len(typical_periods.representatives) == 2
+        assignments = typical_periods.assignments
+        assert assignments[0] == assignments[2] == assignments[3] == assignments[5]
+        assert assignments[1] == assignments[4] != assignments[0]
+        assert typical_periods.weights.sum() == len(features)
+        numpy.testing.assert_allclose(features[typical_periods.reduced_steps][typical_periods.full_steps], features)
+
+
+class AggregationOptOutTest(TransactionTestCase):
+    """Test case for opting out of scenario aggregation settings"""
+
+    @mock.patch.object(settings, "DJANGO_OEMOF_AGGREGATION", {"dispatch": {"typical_periods": 4}})
+    @mock.patch.object(simulation.simulate_scenario, "apply_async")
+    def test_opt_out(self, apply_async):
+        """Opt-out is kept by simulation task and task is finished under reserved parameters hash"""
+        # pylint: disable=E1101
+        task_id = simulation.start_simulation("dispatch", {"tsa": None})
+        reserved_hash = models.PendingSimulation.objects.get(task_id=task_id).parameters_hash
+        sim = models.Simulation.objects.create(scenario="other", parameters={})
+        with mock.patch.object(simulation, "_simulate_scenario", return_value=sim.id) as simulate:
+            simulation.simulate_scenario(*apply_async.call_args.args[0])
+        assert simulate.call_args.args[1] == {"tsa": None}
+        assert simulate.call_args.args[2] == reserved_hash
+        assert not models.PendingSimulation.objects.exists()
+        assert task_status.get_task_status(task_id)["status"] == "finished"
+
+
+@unittest.skipUnless(SolverFactory("highs").available(exception_flag=False), "HiGHS not available")
+@mock.patch.object(settings, "SOLVERS", {"synthetic": solvers.Solver("highs")})
+class AggregatedSimulationTest(TransactionTestCase):
+    """Test case for simulations using typical periods"""
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()  # pylint: disable=R1732
+        self.datapackage = generator.generate_datapackage(
+            pathlib.Path(self.tmp_dir.name) / "oemof" / "synthetic", buses=2, links=1, timesteps=24 * 6, seed=1
+        )
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_aggregated_simulation(self):
+        """Results are disaggregated to full timeline and aggregation is recorded in parameters and meta results"""
+        with override_settings(MEDIA_ROOT=self.tmp_dir.name):
+            simulation_id = simulation.simulate_scenario("synthetic", {"tsa": 2})
+        sim = models.Simulation.objects.get(pk=simulation_id)  # pylint: disable=E1101
+        assert sim.parameters == {"tsa": {"typical_periods": 2, "period_hours": 24, "seed": 0}}
+        assert sim.dataset.meta_results["aggregation"]["reduced_timesteps"] == 48
+        assert sum(sim.dataset.meta_results["aggregation"]["period_weights"]) == 6
+
+        _, results_data = sim.dataset.restore_results()
+        demand = results_data[("bus0", "demand0")]["sequences"]
+        assert len(demand["flow"].dropna()) == 24 * 6
+
+        energysystem = simulation.build_energysystem(str(self.datapackage))
+        _, _, full_results, meta_results = simulation.simulate_energysystem("synthetic", energysystem)
+        numpy.testing.assert_allclose(sim.dataset.meta_results["objective"], meta_results["objective"], rtol=0.1)
+        assert len(energysystem.timeincrement) == 24 * 6
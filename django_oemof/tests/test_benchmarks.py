@@ -0,0 +1,66 @@
+"""Tests for benchmark suite"""
+
+import json
+import pathlib
+import tempfile
+import unittest
+from unittest import mock
+
+from django.core.management import CommandError, call_command
+from django.test import SimpleTestCase, TransactionTestCase
+from pyomo.opt import SolverFactory
+
+from django_oemof import benchmarks, models, settings, simulation, solvers
+
+
+class CompareToBaselineTest(SimpleTestCase):
+    """Test case for comparison of benchmark results to baseline"""
+
+    def test_compare_to_baseline(self):
+        """Only slowdowns beyond tolerance and noise are reported"""
+        baseline = {"scenarios": {"dispatch": {"solve": {"median": 1.0}, "store": {"median": 0.001}}}}
+        current = {"scenarios": {"dispatch": {"solve": {"median": 1.1}, "store": {"median": 0.002}}}}
+        assert not benchmarks.compare_to_baseline(current, baseline, tolerance=0.2)
+
+        current["scenarios"]["dispatch"]["solve"]["median"] = 1.5
+        regressions = benchmarks.compare_to_baseline(current, baseline, tolerance=0.2)
+        assert [regression["benchmark"] for regression in regressions] == ["solve"]
+        assert regressions[0]["ratio"] == 1.5
+
+        current["scenarios"]["dispatch"] = {"error": "ValueError: broken"}
+        assert benchmarks.compare_to_baseline(current, baseline)[0]["error"] == "ValueError: broken"
+
+    def test_baseline_first_run(self):
+        """Missing baseline is written on first run and used for comparison afterwards"""
+        results = {"scenarios": {"dispatch": {"solve": {"median": 1.0}}}}
+        with tempfile.TemporaryDirectory() as tmp_dir, mock.patch.object(benchmarks, "run_benchmarks") as run:
+            baseline = pathlib.Path(tmp_dir) / "baseline.json"
+            run.return_value = results
+            call_command("benchmark", "dispatch", "--baseline", str(baseline), stdout=mock.MagicMock())
+            assert json.loads(baseline.read_text(encoding="utf-8")) == results
+
+            run.return_value = {"scenarios": {"dispatch": {"solve": {"median": 2.0}}}}
+            with self.assertRaises(CommandError):
+                call_command("benchmark", "dispatch", "--baseline", str(baseline), stdout=mock.MagicMock())
+            assert json.loads(baseline.read_text(encoding="utf-8")) == results
+
+
+@unittest.skipUnless(SolverFactory("highs").available(exception_flag=False), "HiGHS not available")
+@mock.patch.object(settings, "SOLVERS", {"dispatch": solvers.Solver("highs")})
+class RunBenchmarksTest(TransactionTestCase):
+    """Test case for running benchmarks"""
+
+    def test_run_benchmarks(self):
+        """All benchmarks are timed and stored data is removed afterwards"""
+        benchmark_results = benchmarks.run_benchmarks(["dispatch"], repeat=1)
+        assert {"build_energysystem", "simulate_energysystem", "store_results", "flows_view"} <= set(
+            benchmark_results["scenarios"]["dispatch"]
+        )
+        assert benchmark_results["scenarios"]["dispatch"]["build_energysystem_cached"]["median"] < (
+            benchmark_results["scenarios"]["dispatch"]["build_energysystem"]["median"]
+        )
+        assert not simulation.get_energysystem_cache_file(
+            str(settings.OEMOF_DIR / "dispatch" / "datapackage.json")
+        ).exists()
+        assert not models.OemofDataset.objects.exists()  # pylint: disable=E1101
+        assert not models.OemofScalar.objects.exists()  # pylint: disable=E1101
@@ -0,0 +1,85 @@
+"""Tests for streamed export of results"""
+
+import io
+import unittest
+from unittest import mock
+
+import pandas
+from django.test import SimpleTestCase, TransactionTestCase
+from pyomo.opt import SolverFactory
+from rest_framework.test import APIRequestFactory
+
+from django_oemof import export, settings, simulation, solvers, views
+
+
+class StreamingRendererTest(SimpleTestCase):
+    """Test case for streaming renderers"""
+
+    def setUp(self):
+        self.frame = pandas.DataFrame(
+            {"flow": [float(i) for i in range(10)], "node": [f"node{i}" for i in range(10)]},
+            index=pandas.date_range("2020-01-01", periods=10, freq="h", name="timeindex"),
+        )
+
+    def test_abstract_renderer(self):
+        """Streaming renderers must implement `stream`"""
+        with self.assertRaises(TypeError):
+            export.StreamingRenderer()  # pylint: disable=E0110
+
+    def test_csv(self):
+        """CSV is streamed in chunks and restored completely"""
+        chunks = list(export.CSVRenderer().stream(self.frame, chunk_size=4))
+        assert len(chunks) == 4
+        restored = pandas.read_csv(io.BytesIO(b"".join(chunks)), index_col=0, parse_dates=True)
+        pandas.testing.assert_frame_equal(restored, self.frame, check_freq=False)
+
+    @unittest.skipUnless(export.ArrowRenderer in export.STREAMING_RENDERERS, "pyarrow not available")
+    def test_arrow(self):
+        """Arrow IPC and Parquet are streamed in chunks and restored with index and dtypes"""
+        chunks = list(export.ArrowRenderer().stream(self.frame, chunk_size=4))
+        restored = export.pyarrow.ipc.open_stream(b"".join(chunks)).read_pandas()
+        pandas.testing.assert_frame_equal(restored, self.frame, check_freq=False)
+
+        chunks = list(export.ParquetRenderer().stream(self.frame, chunk_size=4))
+        restored = pandas.read_parquet(io.BytesIO(b"".join(chunks)))
+        pandas.testing.assert_frame_equal(restored, self.frame, check_freq=False)
+
+
+@unittest.skipUnless(SolverFactory("highs").available(exception_flag=False), "HiGHS not available")
+@mock.patch.object(settings, "SOLVERS", {"dispatch": solvers.Solver("highs")})
+class CalculateResultsExportTest(TransactionTestCase):
+    """Test case for content negotiation of calculated results"""
+
+    def test_export_formats(self):
+        """Format is selected via format parameter or Accept header"""
+        simulation_id = simulation.simulate_scenario("dispatch", {})
+        view = views.CalculateResults.as_view()
+        factory = APIRequestFactory()
+
+        response = view(
+            factory.get(
+                "/calculate",
+                {"simulation_id": simulation_id, "calculations": "total_system_costs", "format": "csv"},
+            )
+        )
+        assert response.status_code == 200
+        assert response["Content-Type"] == "text/csv"
+        assert b"total_system_cost" in b"".join(response.streaming_content)
+
+        response = view(
+            factory.get(
+                "/calculate",
+                {"simulation_id": simulation_id, "calculations": "total_system_costs"},
+                HTTP_ACCEPT="text/csv",
+            )
+        )
+        assert response["Content-Type"] == "text/csv"
+
+        response = view(
+            factory.get(
+                "/calculate",
+                {"simulation_id": simulation_id, "calculations": ["total_system_costs", "summed_marginal_costs"]},
+                HTTP_ACCEPT="text/csv",
+            )
+        )
+        assert response.status_code == 400
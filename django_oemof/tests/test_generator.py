@@ -0,0 +1,70 @@
+"""Tests for generator of synthetic datapackages"""
+
+import pathlib
+import tempfile
+import unittest
+from unittest import mock
+
+from django.core.management import CommandError, call_command
+from django.test import SimpleTestCase
+from pyomo.opt import SolverFactory
+
+from django_oemof import generator, settings, simulation, solvers
+
+
+class GenerateDatapackageTest(SimpleTestCase):
+    """Test case for generation of synthetic datapackages"""
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()  # pylint: disable=R1732
+        self.path = pathlib.Path(self.tmp_dir.name) / "synthetic"
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_generate_datapackage(self):
+        """Generated datapackage holds given number of components and timesteps"""
+        datapackage = generator.generate_datapackage(
+            self.path, buses=3, volatiles=2, dispatchables=2, storages=1, links=3, timesteps=12
+        )
+        energysystem = simulation.build_energysystem(str(datapackage))
+        assert len(energysystem.nodes) == 3 + 3 + 2 + 2 + 1 + 3
+        assert len(energysystem.timeincrement) == 12
+        assert {"bus0", "volatile1", "dispatchable1", "storage0", "link2"} <= {
+            str(node.label) for node in energysystem.nodes
+        }
+        storage = next(node for node in energysystem.nodes if str(node.label) == "storage0")
+        assert storage.initial_storage_level == 0.5
+
+    def test_generate_datapackage_is_deterministic(self):
+        """Same seed results in same data, different seed in different data"""
+        profile = self.path / "data" / "sequences" / "volatile_profile.csv"
+        generator.generate_datapackage(self.path, seed=1)
+        first = profile.read_text(encoding="utf-8")
+        generator.generate_datapackage(self.path, seed=1)
+        assert profile.read_text(encoding="utf-8") == first
+        generator.generate_datapackage(self.path, seed=2)
+        assert profile.read_text(encoding="utf-8") != first
+
+    def test_too_few_dispatchables(self):
+        """Every group of connected buses needs a dispatchable"""
+        with self.assertRaises(ValueError):
+            generator.generate_datapackage(self.path, buses=3, links=1, dispatchables=1)
+
+    def test_command_does_not_overwrite(self):
+        """Existing datapackages are only replaced if requested"""
+        with mock.patch.object(settings, "OEMOF_DIR", pathlib.Path(self.tmp_dir.name)):
+            call_command("generate_datapackage", "synthetic", "--timesteps", "6", stdout=mock.MagicMock())
+            with self.assertRaises(CommandError):
+                call_command("generate_datapackage", "synthetic", stdout=mock.MagicMock())
+            call_command("generate_datapackage", "synthetic", "--overwrite", stdout=mock.MagicMock())
+        assert (self.path / "datapackage.json").exists()
+
+    @unittest.skipUnless(SolverFactory("highs").available(exception_flag=False), "HiGHS not available")
+    @mock.patch.object(settings, "SOLVERS", {"synthetic": solvers.Solver("highs")})
+    def test_generated_datapackage_is_feasible(self):
+        """Generated energysystem can be solved"""
+        datapackage = generator.generate_datapackage(self.path, buses=4, links=2, dispatchables=2, timesteps=24)
+        energysystem = simulation.build_energysystem(str(datapackage))
+        termination_condition, *_ = simulation.simulate_energysystem("synthetic", energysystem)
+        assert termination_condition == "optimal"
@@ -1,13 +1,21 @@
 """Tests for hooks"""
 
+from unittest import mock
+
 from django.test import TestCase
 
-from django_oemof import hooks
+from django_oemof import hooks, settings
 
 
 class TestHooks(TestCase):
     """Testing hooks"""
 
+    def setUp(self):
+        # Registered hooks must not leak into other tests
+        hooks_patcher = mock.patch.object(settings, "HOOKS", type(settings.HOOKS)(list))
+        hooks_patcher.start()
+        self.addCleanup(hooks_patcher.stop)
+
     def test_parameter_hook(self):
         """Testing multiple hooks but for different scenarios"""
 
@@ -0,0 +1,98 @@
+"""Tests for reuse of cached models"""
+
+import pathlib
+import tempfile
+import unittest
+from unittest import mock
+
+import pandas
+import pyomo.environ as po
+from django.test import SimpleTestCase
+from pyomo.opt import SolverFactory
+
+from django_oemof import generator, hooks, model_cache, settings, simulation, solvers
+
+ADAPTED_PARAMETERS = {
+    "dispatchable0": {"marginal_cost": 10},
+    "volatile0": {"capacity": 150},
+    "demand1": {"amount": 9000},
+}
+
+
+@unittest.skipUnless(SolverFactory("highs").available(exception_flag=False), "HiGHS not available")
+@mock.patch.object(settings, "SOLVERS", {"synthetic": solvers.Solver("highs")})
+class ModelCacheTest(SimpleTestCase):
+    """Test case for reusing cached models with changed parameters"""
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()  # pylint: disable=R1732
+        self.datapackage = str(
+            generator.generate_datapackage(pathlib.Path(self.tmp_dir.name) / "synthetic", timesteps=24, seed=2)
+        )
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def build_energysystem(self, parameters: dict):
+        """Returns energysystem adapted by given parameters"""
+        return simulation.adapt_energysystem(simulation.build_energysystem(self.datapackage), parameters)
+
+    def test_structural_signature(self):
+        """Costs and capacities of flows do not change signature, storage capacities do"""
+        signature = model_cache.get_structural_signature(self.build_energysystem({}))
+        assert model_cache.get_structural_signature(self.build_energysystem(ADAPTED_PARAMETERS)) == signature
+        assert (
+            model_cache.get_structural_signature(self.build_energysystem({"storage0": {"storage_capacity": 1000}}))
+            != signature
+        )
+
+    def test_reused_model(self):
+        """Reused model delivers same results as newly built model"""
+        with mock.patch.object(model_cache, "MODEL_CACHE", model_cache.ModelCache(max_entries=1)):
+            *_, base_meta_results = simulation.simulate_energysystem("synthetic", self.build_energysystem({}))
+            assert not base_meta_results["model_reused"]
+            _, input_data, results_data, meta_results = simulation.simulate_energysystem(
+                "synthetic", self.build_energysystem(ADAPTED_PARAMETERS)
+            )
+            assert meta_results["model_reused"]
+            assert abs(meta_results["objective"] - base_meta_results["objective"]) > 1
+            assert model_cache.MODEL_CACHE.info() == {"hits": 1, "misses": 1, "entries": 1, "max_entries": 1}
+        _, expected_input_data, expected_results_data, expected_meta_results = simulation.simulate_energysystem(
+            "synthetic", self.build_energysystem(ADAPTED_PARAMETERS)
+        )
+        assert not expected_meta_results["model_reused"]
+        self.assertAlmostEqual(meta_results["objective"], expected_meta_results["objective"], places=3)
+        assert input_data.keys() == expected_input_data.keys()
+        assert results_data.keys() == expected_results_data.keys()
+        for key, result in expected_results_data.items():
+            pandas.testing.assert_frame_equal(results_data[key]["sequences"], result["sequences"], atol=1e-4)
+
+    def test_model_hooks(self):
+        """Model hooks are re-applied to reused models"""
+        limits = []
+
+        def limit_dispatch(scenario, model, additional_data):  # pylint: disable=W0613
+            nodes = {str(node.label): node for node in model.es.nodes}
+            model.dispatch_limit = po.Constraint(
+                expr=sum(model.flow[nodes["dispatchable1"], nodes["bus1"], 0, t] for t in model.TIMESTEPS) <= limits[-1]
+            )
+            return model
+
+        hook = hooks.Hook("synthetic", limit_dispatch)
+        with mock.patch.object(model_cache, "MODEL_CACHE", model_cache.ModelCache(max_entries=1)), mock.patch.dict(
+            settings.HOOKS, {hooks.HookType.MODEL: [hook]}
+        ):
+            limits.append(1e9)
+            simulation.simulate_energysystem("synthetic", self.build_energysystem({}))
+            limits.append(1000)
+            _, _, results_data, meta_results = simulation.simulate_energysystem(
+                "synthetic", self.build_energysystem({})
+            )
+        assert meta_results["model_reused"]
+        assert results_data[("dispatchable1", "bus1")]["sequences"]["flow"].sum() <= 1000 + 1e-6
+
+    def test_unsupported_solph_version(self):
+        """Models are not cached for unsupported versions of oemof.solph"""
+        cache = model_cache.ModelCache(max_entries=1)
+        with mock.patch.object(model_cache.solph, "__version__", "0.6.0"):
+            assert cache.checkout("synthetic", self.build_energysystem({})) == (None, None)
@@ -1,16 +1,35 @@
 """Tests storing and restoring of oemof results in DB"""
 
+import io
 import pathlib
+from unittest import mock
 
 # pylint: disable=W0611
 import oemof.tabular.datapackage  # noqa
-from django.test import TransactionTestCase
+import pandas
+from django.core.management import call_command
+from django.db import IntegrityError
+from django.test import SimpleTestCase, TransactionTestCase
 from oemof import solph
+from rest_framework.test import APIRequestFactory
 
-from django_oemof import models, simulation
+from django_oemof import columnar, models, simulation, views
+from django_oemof import settings as do_settings
 
 OEMOF_DATAPACKAGE = pathlib.Path(__file__).parent / "test_data" / "dispatch" / "datapackage.json"
 
+INPUT_DATA = {
+    ("wind", "bus0"): {
+        "scalars": {"nominal_value": 50.0, "label": "wind"},
+        "sequences": {"fix": pandas.Series([0.2, 0.5, 0.1])},
+    },
+    ("demand", "None"): {"scalars": {"amount": 100}, "sequences": {}},
+}
+RESULT_DATA = {
+    ("wind", "bus0"): {"scalars": {}, "sequences": {"flow": pandas.Series([10.0, 25.0, 5.0])}},
+    ("bus0", "demand"): {"scalars": {"invest": 0.0}, "sequences": {"flow": pandas.Series([10.0, 25.0, 5.0])}},
+}
+
 
 class OemofDBTest(TransactionTestCase):
     """Test case for (re-)storing oemof results in DB"""
@@ -30,3 +49,161 @@ class OemofDBTest(TransactionTestCase):
         assert len(input_data) == len(restored_input)
         assert len(results_data) == len(restored_results)
         assert len(results_data) == len(restored_results)
+
+    def test_bulk_store(self):
+        """Stores handcrafted data via bulk inserts and checks written rows and restored data"""
+        dataset = models.OemofDataset.store_results(INPUT_DATA, RESULT_DATA, {"objective": 1.0})
+        assert dataset.row_counts == {
+            "scalars": 4,
+            "sequences": 3,
+            "scalar_relations": 4,
+            "sequence_relations": 3,
+            "packed_sequences": 0,
+        }
+        assert dataset.input.scalars.count() == 3  # pylint: disable=E1101
+        assert dataset.result.sequences.count() == 2  # pylint: disable=E1101
+
+        restored_input, restored_results = models.OemofDataset.objects.get(pk=dataset.id).restore_results()
+        assert restored_input[("demand", "None")]["scalars"]["amount"] == 100
+        assert restored_input[("wind", "bus0")]["sequences"]["fix"].tolist() == [0.2, 0.5, 0.1]
+        assert restored_results[("bus0", "demand")]["sequences"]["flow"].tolist() == [10.0, 25.0, 5.0]
+
+    @mock.patch.object(do_settings, "DJANGO_OEMOF_SEQUENCE_STORAGE", "columnar")
+    def test_columnar_store(self):
+        """Stores sequences as packed binary block and restores them"""
+        dataset = models.OemofDataset.store_results(INPUT_DATA, RESULT_DATA, {"objective": 1.0})
+        assert dataset.row_counts["sequences"] == 0
+        assert dataset.row_counts["packed_sequences"] == 3
+        assert not models.OemofSequence.objects.exists()  # pylint: disable=E1101
+
+        restored_input, restored_results = models.OemofDataset.objects.get(pk=dataset.id).restore_results()
+        assert restored_input[("wind", "bus0")]["sequences"]["fix"].tolist() == [0.2, 0.5, 0.1]
+        assert restored_results[("bus0", "demand")]["sequences"]["flow"].tolist() == [10.0, 25.0, 5.0]
+        assert restored_results[("bus0", "demand")]["scalars"]["invest"] == 0.0
+        assert list(dataset.result.restore(nodes=["wind"])) == [("wind", "bus0")]  # pylint: disable=E1101
+
+    def test_pack_sequences(self):
+        """Packs sequence rows of existing dataset into binary block"""
+        dataset = models.OemofDataset.store_results(INPUT_DATA, RESULT_DATA, {"objective": 1.0})
+        _, results = dataset.restore_results()
+        assert dataset.result.pack_sequences() == 2  # pylint: disable=E1101
+        assert not dataset.result.sequences.exists()  # pylint: disable=E1101
+
+        _, packed_results = models.OemofDataset.objects.get(pk=dataset.id).restore_results()
+        for nodes, data in results.items():
+            assert packed_results[nodes]["sequences"]["flow"].tolist() == data["sequences"]["flow"].tolist()
+
+    def test_filtered_restore(self):
+        """Restores only requested nodes and attributes"""
+        dataset = models.OemofDataset.store_results(INPUT_DATA, RESULT_DATA, {"objective": 1.0})
+        restored_input, restored_results = dataset.restore_results(nodes=["demand"])
+        assert list(restored_input) == [("demand", "None")]
+        assert list(restored_results) == [("bus0", "demand")]
+
+        restored_results = dataset.result.restore(attributes=["flow"])  # pylint: disable=E1101
+        assert set(restored_results) == {("wind", "bus0"), ("bus0", "demand")}
+        assert all(not data["scalars"] for data in restored_results.values())
+
+    def test_flow_totals(self):
+        """Flow totals are stored with dataset and calculated lazily for datasets stored without"""
+        dataset = models.OemofDataset.store_results(INPUT_DATA, RESULT_DATA, {"objective": 1.0})
+        expected = [
+            {"source": "wind", "target": "bus0", "value": 40.0},
+            {"source": "bus0", "target": "demand", "value": 40.0},
+        ]
+        assert models.OemofDataset.objects.get(pk=dataset.id).flow_totals == expected  # pylint: disable=E1101
+
+        models.OemofDataset.objects.filter(pk=dataset.id).update(flow_totals=None)  # pylint: disable=E1101
+        dataset = models.OemofDataset.objects.get(pk=dataset.id)  # pylint: disable=E1101
+        assert dataset.get_flow_totals() == expected
+        assert models.OemofDataset.objects.get(pk=dataset.id).flow_totals == expected  # pylint: disable=E1101
+
+    def test_flows_data_view(self):
+        """Sankey data is served from flow totals"""
+        dataset = models.OemofDataset.store_results(INPUT_DATA, RESULT_DATA, {"objective": 1.0})
+        sim = models.Simulation.objects.create(scenario="dispatch", parameters={}, dataset=dataset)
+        request = APIRequestFactory().get("/flows/data", {"simulation_id": sim.id})
+        with self.assertNumQueries(1):
+            response = views.FlowsDataView.as_view()(request)
+        assert {name["name"] for name in response.data["names"]} == {"wind", "bus0", "demand"}
+        assert len(response.data["links"]) == 2
+
+    @mock.patch.object(do_settings, "DJANGO_OEMOF_FLOW_TOTALS_PERIOD", "D")
+    def test_flow_totals_per_period(self):
+        """Flow totals are summed per period for time-indexed flows"""
+        timeindex = pandas.date_range("2020-01-01 22:00", periods=3, freq="h")
+        flow = pandas.Series([1.0, 2.0, 3.0], index=timeindex)
+        result_data = {("wind", "bus0"): {"scalars": {}, "sequences": {"flow": flow}}}
+        flow_totals = models.calculate_flow_totals(result_data)
+        assert flow_totals[0]["value"] == 6.0
+        assert list(flow_totals[0]["periods"].values()) == [3.0, 3.0]
+
+    def test_parameters_hash(self):
+        """Parameters hash ignores key order and number format and is unique per scenario"""
+        parameters = {"wind": {"capacity": 5, "marginal_cost": 0.5}, "pv": {"capacity": 10}}
+        reordered_parameters = {"pv": {"capacity": 10.0}, "wind": {"marginal_cost": 0.5, "capacity": 5.0}}
+        assert models.get_parameters_hash(parameters) == models.get_parameters_hash(reordered_parameters)
+        assert models.get_parameters_hash(parameters) != models.get_parameters_hash({"wind": {"capacity": 6}})
+
+        simulation_ = models.Simulation.objects.create(scenario="dispatch", parameters=parameters)
+        assert models.Simulation.objects.get(  # pylint: disable=E1101
+            scenario="dispatch", parameters_hash=models.get_parameters_hash(reordered_parameters)
+        ) == simulation_
+        models.Simulation.objects.create(scenario="other", parameters=reordered_parameters)
+        with self.assertRaises(IntegrityError):
+            models.Simulation.objects.create(scenario="dispatch", parameters=reordered_parameters)
+
+
+class ColumnarTest(SimpleTestCase):
+    """Test case for packing sequences into float block"""
+
+    def test_pack_and_unpack(self):
+        """Sequences of different lengths and types are restored"""
+        sequences = [("wind", "bus0", "flow", pandas.Series([1.0, 2.5, 3.0])), ("bus0", "demand", "max", [0.5])]
+        block, columns = columnar.pack_sequences(sequences)
+        restored = list(columnar.unpack_sequences(block, columns))
+        assert [sequence[:3] for sequence in restored] == [sequence[:3] for sequence in sequences]
+        pandas.testing.assert_series_equal(restored[0][3], sequences[0][3])
+        assert restored[1][3] == [0.5]
+
+    def test_empty_sequences(self):
+        """Empty sequences are restored from empty block"""
+        sequences = [("wind", "bus0", "flow", pandas.Series([], dtype=float)), ("bus0", "demand", "max", [])]
+        block, columns = columnar.pack_sequences(sequences)
+        assert block == b""
+        restored = list(columnar.unpack_sequences(block, columns))
+        assert restored[0][3].empty
+        assert restored[1] == ("bus0", "demand", "max", [])
+
+
+class ResultEncodingTest(TransactionTestCase):
+    """Test case for encoding of postprocessing results"""
+
+    def setUp(self):
+        index = pandas.MultiIndex.from_tuples([("pv", "bus"), ("wind", "bus")], names=["from_node", "to_node"])
+        self.series = pandas.Series([1.5, 2.0], index=index, name="summed_flows")
+        self.frame = pandas.DataFrame({"capacity": [1.0, 2.5], "count": [1, 2]}, index=index)
+        self.simulation = models.Simulation.objects.create(scenario="dispatch", parameters={})
+
+    def test_encodings(self):
+        """Results are restored with index and dtypes for all encodings"""
+        for encoding in ("json", "arrow"):
+            for result in (self.series, self.frame):
+                models.Result(simulation=self.simulation, name="test").set_result(result, encoding).save()
+                stored_result = models.Result.objects.get(simulation=self.simulation, name="test")
+                assert stored_result.encoding == encoding
+                restored = stored_result.get_result()
+                if isinstance(result, pandas.Series):
+                    pandas.testing.assert_series_equal(restored, result)
+                else:
+                    pandas.testing.assert_frame_equal(restored, result)
+                stored_result.delete()
+
+    def test_convert_results(self):
+        """Existing JSON results are converted into Arrow"""
+        models.Result(simulation=self.simulation, name="series").set_result(self.series, "json").save()
+        models.Result(simulation=self.simulation, name="frame").set_result(self.frame, "json").save()
+        call_command("convert_results", encoding="arrow", stdout=io.StringIO())
+        assert not models.Result.objects.filter(encoding="json").exists()  # pylint: disable=E1101
+        restored = models.Result.objects.get(name="frame").get_result()  # pylint: disable=E1101
+        pandas.testing.assert_frame_equal(restored, self.frame)
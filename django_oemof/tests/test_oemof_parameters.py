@@ -2,8 +2,11 @@
 
 import copy
 import pathlib
+import shutil
+import tempfile
 import time
 import unittest
+from unittest import mock
 
 # pylint: disable=W0611
 import oemof.tabular.datapackage  # noqa
@@ -11,6 +14,7 @@ import pytest
 from django.test import TransactionTestCase
 
 from django_oemof import simulation
+from django_oemof import settings as do_settings
 
 OEMOF_DATAPACKAGE = pathlib.Path(__file__).parent / "test_data" / "oemof" / "dispatch" / "datapackage.json"
 OEMOF_BIG_DATAPACKAGE = pathlib.Path(__file__).parent / "test_data" / "oemof" / "test_scenario" / "datapackage.json"
@@ -27,6 +31,15 @@ class OemofParameterTest(TransactionTestCase):
         assert list(results_data.values())[6]["sequences"].flow[1] == pytest.approx(9.20905)
         assert list(results_data.values())[6]["sequences"].flow[2] == pytest.approx(11.19685)
 
+    def test_adapt_energysystem(self):
+        """Adapt components in ES and skip unknown components"""
+        parameters = {"wind": {"capacity": 5}, "unknown": {"capacity": 1}}
+        energysystem = simulation.build_energysystem(str(OEMOF_DATAPACKAGE))
+        energysystem = simulation.adapt_energysystem(energysystem, parameters)
+        wind = next(node for node in energysystem.nodes if node.label == "wind")
+        assert wind.capacity == 5
+        assert all(flow.nominal_value == 5 for flow in wind.outputs.values())
+
     def test_with_parameterization(self):
         """Build ES from datapacakge and change parameter afterwards before simulation"""
         parameters = {"wind": {"capacity": 5}}
@@ -50,6 +63,30 @@ class OemofBuildTest(TransactionTestCase):
         simulation.simulate_energysystem(energysystem)
         print("Time to simulate ES:", time.time() - start)  # 28s
 
+    def test_cached_build(self):
+        """Test restoring ES from cache and invalidating cache if datapackage changes"""
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            datapackage = pathlib.Path(tmp_dir) / "dispatch"
+            shutil.copytree(OEMOF_DATAPACKAGE.parent, datapackage)
+            cache_dir = pathlib.Path(tmp_dir) / ".cache"
+            with mock.patch.object(do_settings, "OEMOF_ES_CACHE_DIR", cache_dir), mock.patch.object(
+                do_settings, "DJANGO_OEMOF_ES_CACHE", True
+            ):
+                energysystem = simulation.build_energysystem(str(datapackage / "datapackage.json"))
+                cache_file = simulation.get_energysystem_cache_file(str(datapackage / "datapackage.json"))
+                assert cache_file.exists()
+
+                with mock.patch.object(simulation.solph.EnergySystem, "from_datapackage") as from_datapackage:
+                    cached_energysystem = simulation.build_energysystem(str(datapackage / "datapackage.json"))
+                    from_datapackage.assert_not_called()
+                assert {n.label for n in cached_energysystem.nodes} == {n.label for n in energysystem.nodes}
+                assert cached_energysystem.timeindex.equals(energysystem.timeindex)
+                assert len(cached_energysystem.flows()) == len(energysystem.flows())
+
+                with open(datapackage / "data" / "elements" / "load.csv", "a", encoding="utf-8") as load_file:
+                    load_file.write("\n")
+                assert simulation.get_energysystem_cache_file(str(datapackage / "datapackage.json")) != cache_file
+
     @unittest.skip("Copying ES does not work!")
     def test_copying_es(self):
         """Test to copy ES"""
@@ -0,0 +1,129 @@
+"""Tests for running simulations as pipeline of solve and store stages"""
+
+import pathlib
+import tempfile
+import unittest
+from unittest import mock
+
+import pandas
+from django.test import RequestFactory, SimpleTestCase, TransactionTestCase
+from pyomo.opt import SolverFactory
+
+from django_oemof import handoff, models, settings, simulation, solvers, task_status, views
+
+
+class PipelineSignatureTest(SimpleTestCase):
+    """Test case for chaining and routing of pipeline stages"""
+
+    @mock.patch.object(settings, "DJANGO_OEMOF_PIPELINE", True)
+    @mock.patch.object(settings, "DJANGO_OEMOF_SOLVE_QUEUE", "solve")
+    @mock.patch.object(settings, "DJANGO_OEMOF_STORE_QUEUE", "store")
+    @mock.patch.object(settings, "DJANGO_OEMOF_PRECOMPUTE_QUEUE", None)
+    def test_pipeline_signature(self):
+        """Stages are chained and routed to configured queues; task ID is assigned to solve stage"""
+        signature = simulation.get_simulation_signature("dispatch", {}, "task", ["total_system_costs"])
+        solve, store, precompute = signature.tasks
+        assert solve.task == simulation.solve_scenario.name
+        assert solve.args == ("dispatch", {})
+        assert solve.options == {"task_id": "task", "queue": "solve"}
+        assert store.task == simulation.store_scenario.name
+        assert store.options == {"queue": "store"}
+        assert precompute.args == (["total_system_costs"],)
+        assert "queue" not in precompute.options
+
+    def test_signature_without_pipeline(self):
+        """Without pipeline, simulation is run in a single task"""
+        signature = simulation.get_simulation_signature("dispatch", {}, "task")
+        assert signature.task == simulation.simulate_scenario.name
+        assert signature.options == {"task_id": "task"}
+
+
+class HandoffTest(SimpleTestCase):
+    """Test case for handing off serialized results via MEDIA_ROOT"""
+
+    def test_handoff(self):
+        """Serialized results are restored from handoff directory, which is removed afterwards"""
+        input_data = {("wind", "electricity"): {"scalars": {"nominal_value": 5.0}, "sequences": {"max": [0.1, 0.2]}}}
+        result_data = {
+            ("wind", "electricity"): {
+                "scalars": {"invest": 2},
+                "sequences": {"flow": pandas.Series([0.5, 1.0], index=pandas.date_range("2020", periods=2, freq="h"))},
+            }
+        }
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            with mock.patch.object(settings, "OEMOF_HANDOFF_DIR", pathlib.Path(tmp_dir)):
+                path = handoff.write_handoff(input_data, result_data, {"objective": 1.5})
+            assert [p.name for p in pathlib.Path(tmp_dir).iterdir()] == [pathlib.Path(path).name]
+            restored = handoff.read_handoff(path)
+            handoff.remove_handoff(path)
+            assert not any(pathlib.Path(tmp_dir).iterdir())
+
+        assert restored.meta_results == {"objective": 1.5}
+        assert restored.flow_totals == [{"source": "wind", "target": "electricity", "value": 1.5}]
+        assert restored.input_data["scalars"] == [["wind", "electricity", "nominal_value", "5.0", "float"]]
+        assert restored.input_data["sequences"] == [("wind", "electricity", "max", [0.1, 0.2])]
+        assert restored.result_data["scalars"] == [["wind", "electricity", "invest", "2", "int"]]
+        (from_node, to_node, attribute, sequence) = restored.result_data["sequences"][0]
+        assert (from_node, to_node, attribute) == ("wind", "electricity", "flow")
+        assert sequence.tolist() == [0.5, 1.0]
+
+
+@unittest.skipUnless(SolverFactory("highs").available(exception_flag=False), "HiGHS not available")
+@mock.patch.object(settings, "SOLVERS", {"dispatch": solvers.Solver("highs")})
+class PipelineSimulationTest(TransactionTestCase):
+    """Test case for simulating scenario in solve and store stages"""
+
+    def test_pipeline(self):
+        """Results stored via pipeline equal results of single simulation task"""
+        # pylint: disable=E1101
+        parameters = simulation.add_simulation_settings("dispatch", {})
+        task_id, _ = simulation.reserve_simulation("dispatch", parameters)
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            with mock.patch.object(settings, "OEMOF_HANDOFF_DIR", pathlib.Path(tmp_dir)):
+                solved = simulation.solve_scenario("dispatch", {})
+                current_status = task_status.get_task_status(task_id)
+                assert (current_status["status"], current_status["stage"]) == ("running", "processing")
+                simulation_id = simulation.store_scenario(solved)
+                assert not any(pathlib.Path(tmp_dir).iterdir())
+                # Already stored simulations are passed through store stage
+                assert simulation.store_scenario(simulation.solve_scenario("dispatch", {})) == simulation_id
+
+        assert task_status.get_task_status(task_id)["status"] == "finished"
+        assert not models.PendingSimulation.objects.exists()
+        pipeline_simulation = models.Simulation.objects.get(pk=simulation_id)
+        assert {"solve", "serialize_results", "load_handoff", "store_results"} <= set(
+            pipeline_simulation.timings["stages"]
+        )
+        pipeline_inputs, pipeline_results = pipeline_simulation.dataset.restore_results()
+        pipeline_simulation.delete()
+
+        reference_id = simulation.simulate_scenario("dispatch", {})
+        inputs, results = models.Simulation.objects.get(pk=reference_id).dataset.restore_results()
+        assert pipeline_inputs.keys() == inputs.keys()
+        assert pipeline_results.keys() == results.keys()
+        for key, result in results.items():
+            assert pipeline_results[key]["scalars"] == result["scalars"]
+            for attribute, sequence in result["sequences"].items():
+                pandas.testing.assert_series_equal(
+                    pandas.Series(pipeline_results[key]["sequences"][attribute]), pandas.Series(sequence), atol=1e-6
+                )
+
+    def test_terminate_pipeline(self):
+        """Results of terminated simulation are discarded by store stage and handoff folder is removed"""
+        # pylint: disable=E1101
+        parameters = simulation.add_simulation_settings("dispatch", {})
+        task_id, _ = simulation.reserve_simulation("dispatch", parameters)
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            with mock.patch.object(settings, "OEMOF_HANDOFF_DIR", pathlib.Path(tmp_dir)):
+                solved = simulation.solve_scenario.apply(("dispatch", {}), task_id=task_id).get()
+                assert pathlib.Path(solved["handoff"]) == pathlib.Path(tmp_dir) / task_id
+                with mock.patch.object(views, "AsyncResult") as async_result:
+                    request = RequestFactory().post("/terminate", {"task_id": task_id})
+                    views.TerminateSimulationView.as_view()(request)
+                async_result.assert_called_once_with(task_id)
+                assert not any(pathlib.Path(tmp_dir).iterdir())
+                assert simulation.store_scenario(solved) is None
+
+        assert task_status.get_task_status(task_id)["status"] == "revoked"
+        assert not models.PendingSimulation.objects.exists()
+        assert not models.Simulation.objects.exists()
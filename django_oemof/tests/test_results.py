@@ -0,0 +1,165 @@
+"""Tests for calculation of postprocessing results"""
+
+import unittest
+from unittest import mock
+
+from django.test import SimpleTestCase, TransactionTestCase
+from oemof.tabular.postprocessing import calculations, core
+from pyomo.opt import SolverFactory
+
+from django_oemof import models, results, settings, simulation, solvers
+
+
+@unittest.skipUnless(SolverFactory("highs").available(exception_flag=False), "HiGHS not available")
+@mock.patch.object(settings, "SOLVERS", {"dispatch": solvers.Solver("highs")})
+class CalculatorCacheTest(TransactionTestCase):
+    """Test case for in-process cache of calculators"""
+
+    def test_calculator_cache(self):
+        """Calculators are reused for subsequent requests and evicted in LRU order"""
+        simulation_ids = [
+            simulation.simulate_scenario("dispatch", {"wind": {"capacity": capacity}}) for capacity in (5, 10)
+        ]
+        cache = results.CalculatorCache(max_entries=1)
+        with mock.patch.object(results, "CALCULATOR_CACHE", cache):
+            results.get_results(simulation_ids[0], ["total_system_costs"])
+            results.get_results(simulation_ids[0], ["summed_marginal_costs"])
+            assert (cache.hits, cache.misses) == (1, 1)
+
+            results.get_results(simulation_ids[1], ["summed_marginal_costs"])
+            results.get_results(simulation_ids[0], ["summed_variable_costs"])
+            assert (cache.hits, cache.misses) == (1, 3)
+            assert cache.info()["entries"] == 1
+
+    def test_request_calculators(self):
+        """Each request gets its own calculator sharing restored data; calculations are not retained in cache"""
+        simulation_id = simulation.simulate_scenario("dispatch", {})
+        sim = models.Simulation.objects.get(pk=simulation_id)  # pylint: disable=E1101
+        cache = results.CalculatorCache(max_entries=1, max_bytes=10**9)
+        calculator = cache.get(sim)
+        size = cache.info()["bytes"]
+        results.calculate_results(calculator, [results.CALCULATIONS["total_system_costs"]])
+        assert not calculator.calculations
+
+        other_calculator = cache.get(sim)
+        assert other_calculator is not calculator
+        assert other_calculator.sequences is calculator.sequences
+        assert not other_calculator.calculations
+        assert cache.info()["bytes"] == size
+
+    def test_invalidation(self):
+        """Calculators are removed from cache if related dataset is deleted"""
+        simulation_id = simulation.simulate_scenario("dispatch", {})
+        sim = models.Simulation.objects.get(pk=simulation_id)  # pylint: disable=E1101
+        cache = results.CalculatorCache(max_entries=2, max_bytes=10**9)
+        with mock.patch.object(results, "CALCULATOR_CACHE", cache):
+            cache.get(sim)
+            assert cache.info()["entries"] == 1
+            assert cache.info()["bytes"] > 0
+            sim.dataset.delete()
+            assert cache.info()["entries"] == 0
+
+
+class CalculationLevelsTest(SimpleTestCase):
+    """Test case for dependency resolution of calculations"""
+
+    def test_calculation_levels(self):
+        """Dependencies are resolved into levels, shared dependencies are added once"""
+        levels = results.get_calculation_levels(
+            [calculations.TotalSystemCosts, calculations.SummedMarginalCosts, calculations.StorageLosses]
+        )
+        assert core.get_dependency_name(calculations.AggregatedFlows) in levels[0]
+        assert {"storage_losses", "summed_variable_costs"} <= set(levels[1])
+        assert "summed_marginal_costs" in levels[2]
+        assert list(levels[-1]) == ["total_system_costs"]
+        assert sum(len(level) for level in levels) == len(set().union(*levels))
+
+
+@unittest.skipUnless(SolverFactory("highs").available(exception_flag=False), "HiGHS not available")
+@mock.patch.object(settings, "SOLVERS", {"dispatch": solvers.Solver("highs")})
+class GetResultsTest(TransactionTestCase):
+    """Test case for calculating and loading results"""
+
+    def test_get_results(self):
+        """Missing results are calculated and stored, stored results are loaded in one query"""
+        simulation_id = simulation.simulate_scenario("dispatch", {})
+        names = ["total_system_costs", "summed_marginal_costs", "summed_carrier_costs"]
+        calculated = results.get_results(simulation_id, names)
+        assert models.Result.objects.filter(simulation_id=simulation_id).count() == 3  # pylint: disable=E1101
+        with self.assertNumQueries(2):
+            stored = results.get_results(simulation_id, names)
+        for name in names:
+            assert stored[name].shape == calculated[name].shape
+            assert stored[name].to_numpy(dtype=float).sum() == calculated[name].to_numpy(dtype=float).sum()
+
+    def test_concurrent_results(self):
+        """Results stored meanwhile by concurrent request are kept and returned instead of duplicating them"""
+        # pylint: disable=E1101
+        simulation_id = simulation.simulate_scenario("dispatch", {})
+        calculate_results = results.calculate_results
+
+        def calculate_concurrently(calculator, calculations):
+            calculated_results = calculate_results(calculator, calculations)
+            models.Result.objects.create(simulation_id=simulation_id, name="total_system_costs").set_result(
+                calculated_results["total_system_costs"] * 2
+            ).save()
+            return calculated_results
+
+        with mock.patch.object(results, "calculate_results", side_effect=calculate_concurrently):
+            concurrent = results.get_results(simulation_id, ["total_system_costs"])
+        assert models.Result.objects.filter(simulation_id=simulation_id, name="total_system_costs").count() == 1
+        stored = results.get_results(simulation_id, ["total_system_costs"])
+        assert stored["total_system_costs"].equals(concurrent["total_system_costs"])
+
+
+class PrecomputeCalculationsTest(SimpleTestCase):
+    """Test case for configuration of precomputed calculations"""
+
+    @mock.patch.object(settings, "DJANGO_OEMOF_PRECOMPUTE_CALCULATIONS", ["total_system_costs", "unknown"])
+    @mock.patch.object(
+        settings,
+        "DJANGO_OEMOF_SCENARIO_PRECOMPUTE_CALCULATIONS",
+        {"dispatch": ["summed_marginal_costs", "total_system_costs"]},
+    )
+    def test_precompute_calculations(self):
+        """Global and scenario calculations are combined, unknown calculations are skipped"""
+        assert results.get_precompute_calculations("dispatch") == ["total_system_costs", "summed_marginal_costs"]
+        assert results.get_precompute_calculations("other") == ["total_system_costs"]
+
+    @mock.patch.object(settings, "DJANGO_OEMOF_PRECOMPUTE_CALCULATIONS", ["total_system_costs"])
+    def test_configured_calculations_not_chained(self):
+        """Configured calculations are not precomputed again by simulation chain"""
+        signature = simulation.get_simulation_signature("dispatch", {}, "task", ["total_system_costs"])
+        assert signature.task == simulation.simulate_scenario.name
+        signature = simulation.get_simulation_signature(
+            "dispatch", {}, "task", ["total_system_costs", "summed_marginal_costs"]
+        )
+        assert signature.tasks[1].args == (["summed_marginal_costs"],)
+
+
+@unittest.skipUnless(SolverFactory("highs").available(exception_flag=False), "HiGHS not available")
+@mock.patch.object(settings, "SOLVERS", {"dispatch": solvers.Solver("highs")})
+@mock.patch.object(settings, "DJANGO_OEMOF_SCENARIO_PRECOMPUTE_CALCULATIONS", {"dispatch": ["total_system_costs"]})
+class PrecomputeResultsTest(TransactionTestCase):
+    """Test case for precomputing configured calculations after simulation has been stored"""
+
+    @mock.patch.object(results.precompute_results, "apply_async")
+    def test_precompute_results(self, apply_async):
+        """Configured calculations are precomputed once after simulation has been stored"""
+        apply_async.side_effect = lambda args, **options: results.precompute_results(*args)
+        simulation_id = simulation.simulate_scenario("dispatch", {})
+        apply_async.assert_called_once_with((simulation_id, ["total_system_costs"]))
+        # pylint: disable=E1101
+        names = models.Result.objects.filter(simulation_id=simulation_id).values_list("name", flat=True)
+        assert list(names) == ["total_system_costs"]
+
+        # Stored simulations are not precomputed again
+        assert simulation.simulate_scenario("dispatch", {}) == simulation_id
+        assert apply_async.call_count == 1
+
+    @mock.patch.object(results.precompute_results, "apply_async", side_effect=ConnectionError("Broker unavailable"))
+    def test_precompute_not_started(self, _):
+        """Simulation is stored even if precomputation cannot be started"""
+        simulation_id = simulation.simulate_scenario("dispatch", {})
+        assert models.Simulation.objects.filter(pk=simulation_id).exists()  # pylint: disable=E1101
+        assert not models.Result.objects.exists()  # pylint: disable=E1101
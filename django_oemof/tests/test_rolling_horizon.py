@@ -0,0 +1,122 @@
+"""Tests for rolling horizon solving"""
+
+import pathlib
+import tempfile
+import unittest
+from unittest import mock
+
+from django.test import SimpleTestCase, TransactionTestCase
+from oemof import solph
+from pyomo.opt import SolverFactory
+
+from django_oemof import generator, models, rolling_horizon, settings, simulation, solvers, task_status
+
+
+class RollingHorizonSettingsTest(SimpleTestCase):
+    """Test case for rolling horizon settings and windows"""
+
+    def test_settings(self):
+        """Settings are completed and request settings override scenario settings"""
+        assert rolling_horizon.get_rolling_horizon_settings("dispatch", {}) is None
+        assert rolling_horizon.get_rolling_horizon_settings("dispatch", {"rolling_horizon": 24}) == {
+            "window_hours": 24,
+            "overlap_hours": 0,
+        }
+        with mock.patch.object(settings, "DJANGO_OEMOF_ROLLING_HORIZON", {"dispatch": {"window_hours": 48}}):
+            parameters = simulation.add_simulation_settings("dispatch", {})
+            assert parameters == {"rolling_horizon": {"window_hours": 48, "overlap_hours": 0}}
+            assert simulation.add_simulation_settings("dispatch", parameters) == parameters
+            parameters = simulation.add_simulation_settings("dispatch", {"rolling_horizon": None})
+            assert parameters == {"rolling_horizon": None}
+            assert simulation.add_simulation_settings("dispatch", parameters) == parameters
+        with self.assertRaises(ValueError):
+            rolling_horizon.get_rolling_horizon_settings("dispatch", {"rolling_horizon": {"window_hours": -1}})
+
+    def test_windows(self):
+        """Windows cover horizon and overlap is limited by horizon"""
+        assert rolling_horizon.get_windows([1] * 10, window_hours=4, overlap_hours=2) == [
+            (0, 4, 6),
+            (4, 8, 10),
+            (8, 10, 10),
+        ]
+        assert rolling_horizon.get_windows([0.5] * 4, window_hours=1, overlap_hours=0) == [(0, 2, 2), (2, 4, 4)]
+
+
+class RollingHorizonOptOutTest(TransactionTestCase):
+    """Test case for opting out of scenario rolling horizon settings"""
+
+    @mock.patch.object(settings, "DJANGO_OEMOF_ROLLING_HORIZON", {"dispatch": {"window_hours": 48}})
+    @mock.patch.object(simulation.simulate_scenario, "apply_async")
+    def test_opt_out(self, apply_async):
+        """Opt-out is kept by simulation task and task is finished under reserved parameters hash"""
+        # pylint: disable=E1101
+        task_id = simulation.start_simulation("dispatch", {"rolling_horizon": None})
+        reserved_hash = models.PendingSimulation.objects.get(task_id=task_id).parameters_hash
+        sim = models.Simulation.objects.create(scenario="other", parameters={})
+        with mock.patch.object(simulation, "_simulate_scenario", return_value=sim.id) as simulate:
+            simulation.simulate_scenario(*apply_async.call_args.args[0])
+        assert simulate.call_args.args[1] == {"rolling_horizon": None}
+        assert simulate.call_args.args[2] == reserved_hash
+        assert not models.PendingSimulation.objects.exists()
+        assert task_status.get_task_status(task_id)["status"] == "finished"
+
+
+@unittest.skipUnless(SolverFactory("highs").available(exception_flag=False), "HiGHS not available")
+@mock.patch.object(settings, "SOLVERS", {"synthetic": solvers.Solver("highs")})
+class RollingHorizonSimulationTest(SimpleTestCase):
+    """Test case for simulations solved in rolling horizon"""
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()  # pylint: disable=R1732
+        self.datapackage = generator.generate_datapackage(
+            pathlib.Path(self.tmp_dir.name) / "synthetic", storages=2, timesteps=72, seed=1
+        )
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_rolling_horizon(self):
+        """Results of all windows are stitched and storage content is carried between windows"""
+        energysystem = simulation.build_energysystem(str(self.datapackage))
+        storages = [node for node in energysystem.nodes if isinstance(node, solph.components.GenericStorage)]
+        original_levels = [(storage.initial_storage_level, storage.balanced) for storage in storages]
+
+        termination_condition, _, results_data, meta_results = simulation.simulate_energysystem(
+            "synthetic", energysystem, rolling_horizon_settings={"window_hours": 24, "overlap_hours": 12}
+        )
+        assert termination_condition == "optimal"
+        assert [window["start"] for window in meta_results["rolling_horizon"]["windows"]] == [0, 24, 48]
+        assert len(results_data[("bus0", "demand0")]["sequences"]["flow"].dropna()) == 72
+        storage_content = results_data[("storage0", "None")]["sequences"]["storage_content"]
+        assert len(storage_content) == 73
+        assert storage_content.notna().all()
+        assert [(storage.initial_storage_level, storage.balanced) for storage in storages] == original_levels
+        assert len(energysystem.timeincrement) == 72
+
+        with self.assertRaises(ValueError):
+            simulation.simulate_energysystem(
+                "synthetic",
+                energysystem,
+                aggregation_settings={"typical_periods": 2, "period_hours": 24, "seed": 0},
+                rolling_horizon_settings={"window_hours": 24, "overlap_hours": 0},
+            )
+
+    def test_balanced_storages(self):
+        """Balanced storages end at their start level and rolling horizon does not undercut full horizon optimum"""
+        energysystem = simulation.build_energysystem(str(self.datapackage))
+        _, _, full_results, full_meta = simulation.simulate_energysystem("synthetic", energysystem)
+        _, _, results_data, meta_results = simulation.simulate_energysystem(
+            "synthetic", energysystem, rolling_horizon_settings={"window_hours": 24, "overlap_hours": 12}
+        )
+        assert meta_results["objective"] >= full_meta["objective"] * (1 - 1e-9)
+        for storage in ("storage0", "storage1"):
+            for data in (full_results, results_data):
+                storage_content = data[(storage, "None")]["sequences"]["storage_content"]
+                assert abs(storage_content.iloc[-1] - storage_content.iloc[0]) < 1e-6
+
+    def test_empty_horizon(self):
+        """Energysystems without timesteps are rejected"""
+        energysystem = simulation.build_energysystem(str(self.datapackage))
+        with mock.patch.object(rolling_horizon, "get_windows", return_value=[]):
+            with self.assertRaises(ValueError):
+                simulation.solve_rolling_horizon("synthetic", energysystem, {"window_hours": 24, "overlap_hours": 0})
@@ -0,0 +1,338 @@
+"""Tests for starting and tracking simulation tasks"""
+
+import io
+import json
+import unittest
+from unittest import mock
+
+import numpy
+from django.core.management import call_command
+from django.test import RequestFactory, SimpleTestCase, TransactionTestCase
+from pyomo.opt import SolverFactory
+
+from django_oemof import models, profiling, results, settings, simulation, solvers, task_status, views
+
+
+class StartSimulationTest(TransactionTestCase):
+    """Test case for single-flight start of simulation tasks"""
+
+    @mock.patch.object(simulation.simulate_scenario, "apply_async")
+    def test_identical_requests(self, apply_async):
+        """Identical requests share one task, differing requests start new tasks"""
+        task_id = simulation.start_simulation("dispatch", {"wind": {"capacity": 5}})
+        assert simulation.start_simulation("dispatch", {"wind": {"capacity": 5.0}}) == task_id
+        assert apply_async.call_count == 1
+        assert apply_async.call_args.kwargs["task_id"] == task_id
+
+        other_task_id = simulation.start_simulation("dispatch", {"wind": {"capacity": 6}})
+        assert other_task_id != task_id
+        assert apply_async.call_count == 2
+
+    @mock.patch.object(simulation.simulate_scenario, "apply_async")
+    @mock.patch.object(simulation, "_simulate_scenario")
+    def test_pending_simulation_removed(self, simulate, apply_async):
+        """Pending simulation is removed after simulation task has finished"""
+        sim = models.Simulation.objects.create(scenario="other", parameters={})  # pylint: disable=E1101
+        simulate.return_value = sim.id
+        simulation.start_simulation("dispatch", {})
+        assert models.PendingSimulation.objects.count() == 1  # pylint: disable=E1101
+        assert simulation.simulate_scenario("dispatch", {}) == sim.id
+        assert not models.PendingSimulation.objects.exists()  # pylint: disable=E1101
+        simulation.start_simulation("dispatch", {})
+        assert apply_async.call_count == 2
+
+
+    @mock.patch.object(results.precompute_results, "apply_async")
+    @mock.patch.object(simulation.simulate_scenario, "apply_async")
+    def test_calculations_of_identical_requests(self, apply_async, precompute):
+        """Calculations of requests served by pending task are precomputed once simulation is stored"""
+        # pylint: disable=E1101
+        sim = models.Simulation.objects.create(scenario="other", parameters={})
+        simulation.start_simulation("dispatch", {})
+        simulation.start_simulation("dispatch", {}, calculations=["total_system_costs"])
+        simulation.start_simulation("dispatch", {}, calculations=["total_system_costs", "electricity_production"])
+        assert models.PendingSimulation.objects.get().calculations == ["total_system_costs", "electricity_production"]
+        with mock.patch.object(simulation, "_simulate_scenario", return_value=sim.id):
+            simulation.simulate_scenario(*apply_async.call_args.args[0])
+        assert precompute.call_args.args[0] == (sim.id, ["total_system_costs", "electricity_production"])
+
+        stored = models.Simulation.objects.create(scenario="dispatch", parameters={"wind": {"capacity": 5}})
+        simulation.add_pending_calculations("dispatch", stored.parameters_hash, ["total_system_costs"])
+        assert precompute.call_args.args[0] == (stored.id, ["total_system_costs"])
+
+
+class SimulationStatusTest(TransactionTestCase):
+    """Test case for tracking status of simulation tasks"""
+
+    @mock.patch.object(simulation.simulate_scenario, "apply_async")
+    def test_status_tracked(self, _):
+        """Status is set by simulation task and served without celery result backend"""
+        task_id = simulation.start_simulation("dispatch", {})
+        assert task_status.get_task_status(task_id)["status"] == "pending"
+
+        sim = models.Simulation.objects.create(scenario="other", parameters={})  # pylint: disable=E1101
+        with mock.patch.object(simulation, "_simulate_scenario", return_value=sim.id):
+            simulation.simulate_scenario("dispatch", {})
+        current_status = task_status.get_task_status(task_id)
+        assert current_status["status"] == "finished"
+        assert current_status["simulation_id"] == sim.id
+
+        with mock.patch.object(views, "AsyncResult") as async_result:
+            response = views.SimulateEnergysystem.as_view()(RequestFactory().get("/simulate", {"task_id": task_id}))
+        assert response.data == {"simulation_id": sim.id}
+        async_result.assert_not_called()
+
+    @mock.patch.object(simulation.simulate_scenario, "apply_async")
+    def test_failed_status(self, _):
+        """Errors and infeasible runs are reported as status"""
+        task_id = simulation.start_simulation("dispatch", {})
+        with mock.patch.object(simulation, "_simulate_scenario", side_effect=ValueError("broken")):
+            with self.assertRaises(ValueError):
+                simulation.simulate_scenario("dispatch", {})
+        assert task_status.get_task_status(task_id)["status"] == "failed"
+        assert task_status.get_task_status(task_id)["error"] == "broken"
+
+        task_id = simulation.start_simulation("dispatch", {})
+        with mock.patch.object(simulation, "_simulate_scenario", return_value=None):
+            simulation.simulate_scenario("dispatch", {})
+        assert task_status.get_task_status(task_id)["status"] == "infeasible"
+
+    def test_stage_callback(self):
+        """Task status is only updated if progress stage changes"""
+        with mock.patch.object(task_status, "update_task_status") as update_task_status:
+            on_stage = task_status.get_stage_callback("dispatch", "hash")
+            # Includes stages of warm start (see `warm_start`), which are reported as building
+            for stage in (
+                "build_energysystem",
+                "adapt_energysystem",
+                "warm_start",
+                "build_model",
+                "initial_values",
+                "solve",
+                "store_results",
+            ):
+                on_stage(stage)
+        assert [call.kwargs["stage"] for call in update_task_status.call_args_list] == [
+            "building",
+            "solving",
+            "storing",
+        ]
+
+    @mock.patch.object(simulation.simulate_scenario, "apply_async")
+    def test_long_poll(self, _):
+        """Request is held until status differs from known status"""
+        task_id = simulation.start_simulation("dispatch", {})
+        parameters_hash = models.get_parameters_hash({})
+
+        def start_solving(_):
+            task_status.update_task_status("dispatch", parameters_hash, status="running", stage="solving")
+
+        request = RequestFactory().get("/simulate/status", {"task_id": task_id, "status": "pending"})
+        with mock.patch.object(task_status.time, "sleep", side_effect=start_solving) as sleep:
+            response = views.SimulationStatusView.as_view()(request)
+        assert sleep.call_count == 1
+        assert response.data["status"] == "running"
+        assert response.data["stage"] == "solving"
+
+        request = RequestFactory().get(
+            "/simulate/status", {"task_id": task_id, "status": "running", "stage": "solving", "timeout": 0}
+        )
+        assert views.SimulationStatusView.as_view()(request).data["stage"] == "solving"
+
+        request = RequestFactory().get("/simulate/status", {"task_id": "unknown"})
+        assert views.SimulationStatusView.as_view()(request).status_code == 404
+
+    @mock.patch.object(simulation.simulate_scenario, "apply_async")
+    def test_event_stream(self, _):
+        """Status changes are streamed as server-sent events until task has finished"""
+        task_id = simulation.start_simulation("dispatch", {})
+        parameters_hash = models.get_parameters_hash({})
+        stages = iter(["building", "solving"])
+
+        def next_stage(_):
+            stage = next(stages, None)
+            if stage:
+                task_status.update_task_status("dispatch", parameters_hash, status="running", stage=stage)
+            else:
+                task_status.update_task_status("dispatch", parameters_hash, status="infeasible")
+
+        request = RequestFactory().get("/simulate/status", {"task_id": task_id, "format": "event-stream"})
+        with mock.patch.object(task_status.time, "sleep", side_effect=next_stage):
+            response = views.SimulationStatusView.as_view()(request)
+            events = b"".join(response.streaming_content).decode().strip().split("\n\n")
+        statuses = [json.loads(event.split("data: ")[1]) for event in events]
+        assert [(status["status"], status["stage"]) for status in statuses] == [
+            ("pending", None),
+            ("running", "building"),
+            ("running", "solving"),
+            ("infeasible", "solving"),
+        ]
+
+
+class SimulationSweepTest(TransactionTestCase):
+    """Test case for parameter sweeps"""
+
+    def test_sweep_parameters(self):
+        """Grid is expanded into cartesian product and merged with base parameters"""
+        sweep_parameters = simulation.get_sweep_parameters(
+            parameter_sets=[{"pv": {"capacity": 1}}],
+            grid={"wind": {"capacity": [5, 10]}, "pv": {"capacity": [1, 2]}},
+            base_parameters={"wind": {"marginal_cost": 3}},
+        )
+        assert sweep_parameters == [
+            {"wind": {"marginal_cost": 3}, "pv": {"capacity": 1}},
+            {"wind": {"marginal_cost": 3, "capacity": 5}, "pv": {"capacity": 1}},
+            {"wind": {"marginal_cost": 3, "capacity": 5}, "pv": {"capacity": 2}},
+            {"wind": {"marginal_cost": 3, "capacity": 10}, "pv": {"capacity": 1}},
+            {"wind": {"marginal_cost": 3, "capacity": 10}, "pv": {"capacity": 2}},
+        ]
+
+    @mock.patch.object(simulation, "group")
+    def test_sweep(self, group):
+        """Stored variants are skipped and remaining variants are dispatched as one group"""
+        models.Simulation.objects.create(scenario="dispatch", parameters={"wind": {"capacity": 5}})
+        batch = simulation.simulate_sweep("dispatch", grid={"wind": {"capacity": [5, 10, 10.0]}})
+        signatures = group.call_args.args[0]
+        assert len(signatures) == 1
+        assert signatures[0].args == ("dispatch", {"wind": {"capacity": 10}})
+        assert list(batch.task_ids.values()) == [signatures[0].id]
+
+        progress = batch.get_progress()
+        assert progress["total"] == 2
+        assert progress["finished"] == 1
+        assert progress["simulation_ids"][1] is None
+
+        models.PendingSimulation.objects.all().delete()  # pylint: disable=E1101
+        assert batch.get_progress()["failed"] == 1
+
+    @unittest.skipUnless(SolverFactory("highs").available(exception_flag=False), "HiGHS not available")
+    @mock.patch.object(settings, "SOLVERS", {"dispatch": solvers.Solver("highs")})
+    @mock.patch.object(simulation, "group")
+    def test_batch_results(self, group):
+        """Calculations are combined over all batch members"""
+        group.side_effect = lambda signatures: mock.Mock(apply_async=lambda: [sig.apply() for sig in signatures])
+        batch = simulation.simulate_sweep("dispatch", grid={"wind": {"capacity": [5, 10]}})
+        progress = batch.get_progress()
+        assert progress["finished"] == 2
+        assert progress["failed"] == 0
+        batch_results = results.get_batch_results(batch.id, ["total_system_costs"])
+        total_system_costs = batch_results["total_system_costs"]
+        assert list(total_system_costs.index.get_level_values("simulation_id")) == sorted(progress["simulation_ids"])
+
+
+    @unittest.skipUnless(SolverFactory("highs").available(exception_flag=False), "HiGHS not available")
+    @mock.patch.object(settings, "SOLVERS", {"dispatch": solvers.Solver("highs")})
+    @mock.patch.object(simulation, "group")
+    def test_batch_results_failing_and_pending_variants(self, group):
+        """Failing variants do not block precomputation, results of pending variants are calculated on demand"""
+
+        def apply_signatures(signatures):
+            for signature in signatures:
+                try:
+                    signature.apply()
+                except simulation.SimulationError:
+                    pass
+
+        def simulate(scenario, parameters, *args):
+            if parameters["wind"]["capacity"] == 10:
+                raise simulation.SimulationError("broken")
+            return simulate_scenario(scenario, parameters, *args)
+
+        # pylint: disable=E1101
+        simulate_scenario = simulation._simulate_scenario  # pylint: disable=W0212
+        group.side_effect = lambda signatures: mock.Mock(apply_async=lambda: apply_signatures(signatures))
+        with mock.patch.object(simulation.simulate_scenario, "apply_async") as apply_async:
+            simulation.start_simulation("dispatch", {"wind": {"capacity": 20}})
+        with mock.patch.object(simulation, "_simulate_scenario", side_effect=simulate):
+            batch = simulation.simulate_sweep(
+                "dispatch", grid={"wind": {"capacity": [5, 10, 20]}}, calculations=["total_system_costs"]
+            )
+        progress = batch.get_progress()
+        assert (progress["finished"], progress["failed"]) == (2, 1)
+        assert models.Result.objects.filter(simulation_id__in=batch.simulations, name="total_system_costs").count() == 1
+
+        simulation.simulate_scenario(*apply_async.call_args.args[0])
+        batch_results = results.get_batch_results(batch.id, ["total_system_costs"])
+        assert len(batch_results["total_system_costs"]) == 2
+        assert models.Result.objects.filter(simulation_id__in=batch.simulations, name="total_system_costs").count() == 2
+
+
+class StageTimerTest(SimpleTestCase):
+    """Test case for memory usage per stage"""
+
+    @unittest.skipUnless(profiling.reset_peak_rss(), "Peak RSS cannot be reset on this platform")
+    def test_peak_rss_per_stage(self):
+        """Peak RSS is measured per stage instead of over lifetime of process"""
+        timer = profiling.StageTimer()
+        with timer.stage("allocate"):
+            data = numpy.ones(50 * 1024**2 // 8)
+            del data
+        with timer.stage("idle"):
+            pass
+        assert timer.stages["allocate"]["peak_rss_mb"] - timer.stages["idle"]["peak_rss_mb"] > 40
+        assert abs(timer.stages["allocate"]["rss_delta_mb"]) < 40
+
+
+@unittest.skipUnless(SolverFactory("highs").available(exception_flag=False), "HiGHS not available")
+@mock.patch.object(settings, "SOLVERS", {"dispatch": solvers.Solver("highs")})
+class SimulationTimingsTest(TransactionTestCase):
+    """Test case for timing stages of simulations"""
+
+    def test_timings(self):
+        """Stage timings are stored with simulation and aggregated per scenario"""
+        simulation_id = simulation.simulate_scenario("dispatch", {})
+        timings = models.Simulation.objects.get(pk=simulation_id).timings  # pylint: disable=E1101
+        assert {"build_energysystem", "build_model", "solve", "processing_results", "store_results"} <= set(
+            timings["stages"]
+        )
+        assert timings["total_seconds"] > 0
+
+        stdout = io.StringIO()
+        call_command("simulation_timings", "dispatch", json=True, stdout=stdout)
+        aggregated = json.loads(stdout.getvalue())
+        assert aggregated["dispatch"]["runs"] == 1
+        assert aggregated["dispatch"]["stages"]["solve"]["seconds"]["p50"] == timings["stages"]["solve"]["seconds"]
+
+
+@unittest.skipUnless(SolverFactory("highs").available(exception_flag=False), "HiGHS not available")
+@mock.patch.object(settings, "SOLVERS", {"dispatch": solvers.Solver("highs", timelimit=10)})
+class IncumbentSolutionTest(TransactionTestCase):
+    """Test case for handling incumbent solutions found before time limit"""
+
+    @staticmethod
+    def simulate_time_limit() -> int:
+        """Simulates scenario as if solver stopped at time limit with incumbent"""
+        with mock.patch.object(solvers, "get_solution_status", return_value="time_limit"), mock.patch.object(
+            solvers, "get_gap", return_value=0.05
+        ):
+            return simulation.simulate_scenario("dispatch", {})
+
+    def test_incumbent_stored(self):
+        """Incumbent is stored with gap and status and satisfies later lookups if accepted"""
+        simulation_id = self.simulate_time_limit()
+        sim = models.Simulation.objects.get(pk=simulation_id)  # pylint: disable=E1101
+        assert (sim.status, sim.gap) == ("time_limit", 0.05)
+        assert sim.dataset.meta_results["status"] == "time_limit"
+        assert sim.dataset.meta_results["gap"] == 0.05
+        with mock.patch.object(simulation, "simulate_energysystem") as simulate_energysystem:
+            assert simulation.simulate_scenario("dispatch", {}) == simulation_id
+        simulate_energysystem.assert_not_called()
+
+    @mock.patch.object(settings, "DJANGO_OEMOF_ACCEPT_INCUMBENT", False)
+    def test_incumbent_solved_again(self):
+        """Incumbent is solved again with extended time limit, if incumbents are not accepted"""
+        simulation_id = self.simulate_time_limit()
+        dataset_id = models.Simulation.objects.get(pk=simulation_id).dataset_id  # pylint: disable=E1101
+        assert simulation.simulate_scenario("dispatch", {}) == simulation_id
+        sim = models.Simulation.objects.get(pk=simulation_id)  # pylint: disable=E1101
+        assert sim.status == "optimal"
+        assert sim.dataset_id != dataset_id
+        assert sim.dataset.meta_results["timelimit"] == 20
+        assert not models.OemofDataset.objects.filter(pk=dataset_id).exists()  # pylint: disable=E1101
+
+    def test_no_incumbent(self):
+        """Simulation fails if solver stopped without feasible solution"""
+        with mock.patch.object(solvers, "get_solution_status", return_value=None):
+            with self.assertRaises(simulation.SimulationError):
+                simulation.simulate_scenario("dispatch", {})
+        assert not models.Simulation.objects.exists()  # pylint: disable=E1101
@@ -0,0 +1,73 @@
+"""Tests for solvers"""
+
+import unittest
+from unittest import mock
+
+from django.test import SimpleTestCase
+from pyomo.opt import ProblemSense, SolverFactory, SolverResults, TerminationCondition
+
+from django_oemof import hooks, settings, simulation, solvers
+from django_oemof.tests.test_oemof_parameters import OEMOF_DATAPACKAGE
+
+
+class TestSolvers(SimpleTestCase):
+    """Testing solver registry and options"""
+
+    def test_solver_options(self):
+        """Generic options are translated into solver-specific options"""
+        solver = solvers.Solver(
+            "highs", mipgap=0.01, timelimit=60, threads=4, presolve=False, options={"parallel": "on"}
+        )
+        assert solver.get_options() == {
+            "mip_rel_gap": 0.01,
+            "time_limit": 60,
+            "threads": 4,
+            "presolve": "off",
+            "parallel": "on",
+        }
+        solver = solvers.Solver("glpk", mipgap=0.01, timelimit=60, threads=4)
+        assert solver.get_options() == {"mipgap": 0.01, "tmlim": 60}
+
+    def test_default_solver(self):
+        """Default solver is set up from settings"""
+        with mock.patch.object(settings, "DJANGO_OEMOF_SOLVER", "glpk"), mock.patch.object(
+            settings, "DJANGO_OEMOF_TIMELIMIT", 30
+        ):
+            solver = solvers.get_solver("dispatch")
+        assert solver.name == "glpk"
+        assert solver.timelimit == 30
+
+    @mock.patch.object(settings, "SOLVERS", {})
+    def test_register_solver(self):
+        """Scenario-specific solvers are preferred over solvers registered for all scenarios"""
+        solver_all = solvers.Solver("cbc")
+        solver_dispatch = solvers.Solver("highs")
+        solvers.register_solver(solver_all, hooks.ALL_SCENARIOS)
+        solvers.register_solver(solver_dispatch, "dispatch")
+        assert solvers.get_solver("dispatch") is solver_dispatch
+        assert solvers.get_solver("other") is solver_all
+
+    def test_solution_status(self):
+        """Incumbents at time limit are detected and gap is calculated from bounds"""
+        solver_results = SolverResults()
+        solver_results.problem.sense = ProblemSense.minimize
+        solver_results.solver.termination_condition = TerminationCondition.maxTimeLimit
+        assert solvers.get_solution_status(solver_results) is None
+        solver_results.problem.upper_bound = 105
+        solver_results.problem.lower_bound = 100
+        assert solvers.get_solution_status(solver_results) == "time_limit"
+        self.assertAlmostEqual(solvers.get_gap(solver_results), 5 / 105)
+        solver_results.solver.termination_condition = TerminationCondition.optimal
+        assert solvers.get_solution_status(solver_results) == "optimal"
+
+    @unittest.skipUnless(SolverFactory("highs").available(exception_flag=False), "HiGHS not available")
+    @mock.patch.object(settings, "SOLVERS", {})
+    def test_highs_simulation(self):
+        """Simulation is solved with registered solver and solver setup is stored in meta results"""
+        # Threads are not changed, as HiGHS does not support changing number of threads within a process
+        solvers.register_solver(solvers.Solver("highs", mipgap=0.05), "dispatch")
+        energysystem = simulation.build_energysystem(str(OEMOF_DATAPACKAGE))
+        termination_condition, _, _, meta_results = simulation.simulate_energysystem("dispatch", energysystem)
+        assert termination_condition == "optimal"
+        assert meta_results["solver_setup"]["name"] == "highs"
+        assert meta_results["solver_setup"]["options"]["mip_rel_gap"] == 0.05
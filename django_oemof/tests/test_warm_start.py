@@ -0,0 +1,111 @@
+"""Tests for warm start from stored simulations"""
+
+import pathlib
+import tempfile
+import unittest
+from unittest import mock
+
+from django.test import SimpleTestCase, TransactionTestCase, override_settings
+from pyomo.opt import SolverFactory
+
+from django_oemof import generator, models, settings, simulation, solvers, warm_start
+
+
+class ParameterDistanceTest(SimpleTestCase):
+    """Test case for distance between simulation parameters"""
+
+    def test_parameter_distance(self):
+        """Numeric parameters contribute relative difference, other and missing parameters contribute 1"""
+        parameters = {"wind": {"capacity": 100, "expandable": True}, "demand": {"amount": 10}}
+        assert warm_start.get_parameter_distance(parameters, parameters) == 0
+        assert (
+            warm_start.get_parameter_distance(parameters, {**parameters, "wind": {"capacity": 80, "expandable": True}})
+            == 0.2
+        )
+        assert (
+            warm_start.get_parameter_distance(
+                parameters, {**parameters, "wind": {"capacity": 100, "expandable": False}}
+            )
+            == 1
+        )
+        assert warm_start.get_parameter_distance(parameters, {"wind": parameters["wind"]}) == 1
+
+    def test_time_to_first_incumbent(self):
+        """Time to first incumbent is parsed from solver logs"""
+        cbc_log = (
+            "Cbc0038I Full problem 2 rows 3 columns, reduced to 1 rows 2 columns\n"
+            "Cbc0012I Integer solution of -968 found by DiveCoefficient after 5 iterations and 0 nodes (0.02 seconds)\n"
+            "Cbc0004I Integer solution of -970 found after 9 iterations and 2 nodes (0.05 seconds)\n"
+        )
+        highs_log = (
+            " S       0       0         0   0.00%   1885            inf                Large"
+            "        0      0      0         0     0.1s\n"
+            " H       0       0         0   0.00%   1885            968               94.73%"
+            "        0      0      0         0     0.3s\n"
+        )
+        assert solvers.get_time_to_first_incumbent("cbc", cbc_log) == 0.02
+        assert solvers.get_time_to_first_incumbent("highs", highs_log) == 0.3
+        assert solvers.get_time_to_first_incumbent("highs", "Model status: Optimal") is None
+
+
+@unittest.skipUnless(SolverFactory("highs").available(exception_flag=False), "HiGHS not available")
+@mock.patch.object(settings, "SOLVERS", {"synthetic": solvers.Solver("highs")})
+class WarmStartSimulationTest(TransactionTestCase):
+    """Test case for warm-starting simulations from nearest stored simulation"""
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()  # pylint: disable=R1732
+        generator.generate_datapackage(pathlib.Path(self.tmp_dir.name) / "oemof" / "synthetic", timesteps=24, seed=3)
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_warm_start(self):
+        """Simulation is warm-started from stored simulation with nearest parameters"""
+        with override_settings(MEDIA_ROOT=self.tmp_dir.name):
+            with mock.patch.object(settings, "DJANGO_OEMOF_WARM_START", True):
+                near_id = simulation.simulate_scenario("synthetic", {"dispatchable0": {"marginal_cost": 60}})
+                simulation.simulate_scenario("synthetic", {"volatile0": {"capacity": 10}})
+                simulation_id = simulation.simulate_scenario("synthetic", {"dispatchable0": {"marginal_cost": 50}})
+        meta_results = models.Simulation.objects.get(pk=simulation_id).dataset.meta_results
+        assert meta_results["warm_start"]["simulation"] == near_id
+        self.assertAlmostEqual(meta_results["warm_start"]["distance"], 1 / 6)
+        assert meta_results["warm_start"]["variables"] > 0
+        assert "time_to_first_incumbent" in meta_results
+        assert meta_results["warm_start_key"] == models.Simulation.objects.get(pk=near_id).dataset.meta_results[
+            "warm_start_key"
+        ]
+
+    def test_candidates(self):
+        """Only simulations with same warm start key are candidates"""
+        with override_settings(MEDIA_ROOT=self.tmp_dir.name):
+            simulation.simulate_scenario("synthetic", {"dispatchable0": {"marginal_cost": 60}})
+            with mock.patch.object(settings, "DJANGO_OEMOF_WARM_START", True):
+                simulation_id = simulation.simulate_scenario("synthetic", {"dispatchable0": {"marginal_cost": 50}})
+        key = models.Simulation.objects.get(pk=simulation_id).dataset.meta_results["warm_start_key"]
+        assert "warm_start" not in models.Simulation.objects.get(pk=simulation_id).dataset.meta_results
+        assert warm_start.get_nearest_simulation("synthetic", {}, {**key, "datapackage": "other"}) is None
+        assert warm_start.get_nearest_simulation("synthetic", {}, {**key, "structure": "other"}) is None
+        assert warm_start.get_nearest_simulation("synthetic", {}, key)[0].id == simulation_id
+        with mock.patch.object(settings, "DJANGO_OEMOF_WARM_START_CANDIDATES", 0):
+            assert warm_start.get_nearest_simulation("synthetic", {}, key) is None
+
+    def test_initial_values(self):
+        """Variables are initialized from restored results"""
+        with override_settings(MEDIA_ROOT=self.tmp_dir.name):
+            simulation_id = simulation.simulate_scenario("synthetic", {})
+            energysystem = simulation.build_energysystem(f"{self.tmp_dir.name}/oemof/synthetic/datapackage.json")
+        model = simulation.solph.Model(energysystem)
+        results_data = models.Simulation.objects.get(pk=simulation_id).dataset.result.restore(
+            attributes=warm_start.WARM_START_ATTRIBUTES
+        )
+        assert warm_start.set_initial_values(model, results_data) > 0
+        nodes = {node.label: node for node in energysystem.nodes}
+        assert (
+            model.flow[nodes["dispatchable0"], nodes["bus0"], 0, 5].value
+            == results_data[("dispatchable0", "bus0")]["sequences"]["flow"].iloc[5]
+        )
+        assert (
+            model.GenericStorageBlock.storage_content[nodes["storage0"], 5].value
+            == results_data[("storage0", "None")]["sequences"]["storage_content"].iloc[5]
+        )
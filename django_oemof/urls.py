@@ -13,7 +13,10 @@ app_name = "django_oemof"
 urlpatterns = [
     path("", include(router.urls)),
     path("simulate", views.SimulateEnergysystem.as_view(), name="simulate"),
+    path("simulate/status", views.SimulationStatusView.as_view(), name="simulation_status"),
+    path("sweep", views.SimulationSweepView.as_view(), name="sweep"),
     path("terminate", views.TerminateSimulationView.as_view()),
     path("calculate", views.CalculateResults.as_view()),
     path("flows", views.FlowsView.as_view()),
+    path("flows/data", views.FlowsDataView.as_view()),
 ]
@@ -3,13 +3,16 @@ import json
 import logging
 
 from celery.result import AsyncResult
+from django.http import StreamingHttpResponse
+from django.utils import timezone
 from rest_framework import status
 from rest_framework.response import Response
+from rest_framework.settings import api_settings
 from rest_framework.views import APIView
 
 from django.views.generic import TemplateView
 
-from django_oemof import hooks, results, settings, simulation, models
+from django_oemof import export, handoff, hooks, results, settings, simulation, models, task_status
 
 
 class SimulateEnergysystem(APIView):
@@ -20,6 +23,9 @@ class SimulateEnergysystem(APIView):
         """
         Checks simulation run using celery task ID
 
+        Status is read from task status table; celery result backend is only queried for untracked tasks.
+        Use `SimulationStatusView` to wait for status changes instead of polling.
+
         Parameters
         ----------
         request
@@ -31,6 +37,16 @@ class SimulateEnergysystem(APIView):
             holding simulation ID if simulation is ready, otherwise simulation ID is None
         """
         task_id = request.GET["task_id"]
+        current_status = task_status.get_task_status(task_id)
+        if current_status is not None:
+            # Status is tracked in DB, thus, celery result backend has not to be queried
+            if current_status["status"] == "finished":
+                return Response({"simulation_id": current_status["simulation_id"]})
+            if current_status["status"] == "infeasible":
+                return Response({"msg": "Simulation is infeasible"}, status=status.HTTP_400_BAD_REQUEST)
+            if current_status["status"] in ("failed", "revoked"):
+                return Response({"msg": "Simulation error"}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+            return Response({"simulation_id": None})
         task = AsyncResult(task_id)
         if task.ready():
             logging.info(f"Task #{task.task_id} finished.")
@@ -68,9 +84,120 @@ class SimulateEnergysystem(APIView):
         parameters = hooks.apply_hooks(
             hook_type=hooks.HookType.SETUP, scenario=scenario, data=parameters, additional_data=request
         )
-        task = simulation.simulate_scenario.delay(scenario, parameters)
-        logging.info(f"Started simulation task #{task.task_id}.")
-        return Response({"task_id": task.task_id})
+        task_id = simulation.start_simulation(scenario, parameters)
+        logging.info(f"Started simulation task #{task_id}.")
+        return Response({"task_id": task_id})
+
+
+class SimulationStatusView(APIView):
+    """View to wait for status changes of simulation tasks via long-polling or server-sent events"""
+
+    renderer_classes = [*api_settings.DEFAULT_RENDERER_CLASSES, task_status.EventStreamRenderer]
+
+    @staticmethod
+    def get(request):
+        """
+        Returns status of simulation task as soon as it differs from status known by client
+
+        Request is held until task status or progress stage (building, solving, processing or storing) differs from
+        given status and stage, task has finished or timeout expired (long-polling).
+        If server-sent events are requested (via `Accept: text/event-stream` or `format=event-stream`),
+        every status change is streamed until task has finished or timeout expired.
+
+        Parameters
+        ----------
+        request
+            Holding celery task ID, optionally known status and stage and timeout in seconds
+            (limited by DJANGO_OEMOF_STATUS_TIMEOUT)
+
+        Returns
+        -------
+        Response
+            holding task status, progress stage, simulation ID (if finished) and error (if failed)
+        """
+        task_id = request.GET["task_id"]
+        timeout = float(request.GET["timeout"]) if request.GET.get("timeout") else None
+        if isinstance(request.accepted_renderer, task_status.EventStreamRenderer):
+            response = StreamingHttpResponse(
+                task_status.iter_task_status_events(task_id, timeout), content_type="text/event-stream"
+            )
+            response["Cache-Control"] = "no-cache"
+            return response
+
+        known_status = {key: request.GET[key] for key in ("status", "stage") if key in request.GET}
+        current_status = task_status.wait_for_task_status(task_id, known_status, timeout)
+        if current_status is None:
+            return Response({"msg": f"Unknown task #{task_id}"}, status=status.HTTP_404_NOT_FOUND)
+        return Response(current_status)
+
+
+class SimulationSweepView(APIView):
+    """View to simulate a batch of parameter variants (parameter sweep) of one scenario"""
+
+    @staticmethod
+    def get(request):
+        """
+        Checks progress of simulation batch and optionally returns combined results
+
+        Parameters
+        ----------
+        request
+            Holding batch ID and optionally list of calculations
+
+        Returns
+        -------
+        Response
+            holding progress and simulation IDs of batch members and combined results of requested calculations
+        """
+        batch_id = request.GET["batch_id"]
+        try:
+            batch = models.SimulationBatch.objects.get(pk=batch_id)  # pylint: disable=E1101
+        except models.SimulationBatch.DoesNotExist:  # pylint: disable=E1101
+            return Response({"msg": f"Simulation batch #{batch_id} not found"}, status=status.HTTP_404_NOT_FOUND)
+        response = {"batch_id": batch.id, **batch.get_progress()}
+        calculations = request.GET.getlist("calculations")
+        if calculations:
+            batch_results = results.get_batch_results(batch.id, calculations)
+            response["results"] = {
+                name: json.loads(result.to_json(orient="table")) for name, result in batch_results.items()
+            }
+        return Response(response)
+
+    @staticmethod
+    def post(request):
+        """
+        Starts simulations for all variants of given scenario
+
+        Parameters
+        ----------
+        request
+            Request holding scenario, base parameters, parameter sets and/or parameter grid as JSON
+            and optionally list of calculations which shall be precomputed for all variants
+
+        Returns
+        -------
+        Response
+            holding batch ID
+        """
+        scenario = request.POST["scenario"]
+        base_parameters, parameter_sets, grid = (
+            json.loads(request.POST[key]) if request.POST.get(key) else None
+            for key in ("parameters", "parameter_sets", "grid")
+        )
+        variants = []
+        for parameters in simulation.get_sweep_parameters(parameter_sets, grid, base_parameters):
+            # Ignore user-defined parameters, can be defined via settings:
+            for parameter in settings.DJANGO_OEMOF_IGNORE_SIMULATION_PARAMETERS:
+                parameters.pop(parameter, None)
+            variants.append(
+                hooks.apply_hooks(
+                    hook_type=hooks.HookType.SETUP, scenario=scenario, data=parameters, additional_data=request
+                )
+            )
+        batch = simulation.simulate_sweep(
+            scenario, parameter_sets=variants, calculations=request.POST.getlist("calculations")
+        )
+        return Response({"batch_id": batch.id})
 
 
 class TerminateSimulationView(APIView):
@@ -94,6 +221,13 @@ class TerminateSimulationView(APIView):
         task_id = request.POST["task_id"]
         task = AsyncResult(task_id)
         task.revoke(terminate=True)
+        # pylint: disable=E1101
+        models.PendingSimulation.objects.filter(task_id=task_id).delete()
+        models.SimulationTask.objects.filter(task_id=task_id).exclude(
+            status__in=models.SimulationTask.FINAL_STATUSES
+        ).update(status="revoked", updated_at=timezone.now())
+        # Following pipeline stages discard results of revoked tasks (see `simulation.store_scenario`)
+        handoff.remove_task_handoff(task_id)
         logging.info(f"Terminated task #{task_id}.")
         return Response()
 
@@ -101,11 +235,17 @@ class TerminateSimulationView(APIView):
 class CalculateResults(APIView):
     """View calculate results from oemof simulation"""
 
+    renderer_classes = [*api_settings.DEFAULT_RENDERER_CLASSES, *export.STREAMING_RENDERERS]
+
     @staticmethod
     def get(request):
         """
         Calculates results for given scenario (with parameters)
 
+        Results can be streamed as CSV, Arrow IPC or Parquet (if pyarrow is installed) by requesting related
+        media type via `Accept` header or by setting `format` parameter. Streamed formats support a single calculation
+        only.
+
         Parameters
         ----------
         request
@@ -117,10 +257,42 @@ class CalculateResults(APIView):
         """
         simulation_id = request.GET["simulation_id"]
         calculations = request.GET.getlist("calculations")
+        if isinstance(request.accepted_renderer, export.StreamingRenderer):
+            if len(calculations) != 1:
+                return Response(
+                    {"msg": f"Format '{request.accepted_renderer.format}' supports a single calculation only."},
+                    status=status.HTTP_400_BAD_REQUEST,
+                )
+            calculated_results = results.get_results(simulation_id, calculations)
+            return export.get_streaming_response(
+                calculated_results[calculations[0]], calculations[0], request.accepted_renderer
+            )
         calculated_results = results.get_results(simulation_id, calculations)
         return Response(calculated_results)
 
 
+def get_sankey_data(simulation_id, storages: list[str]) -> dict:
+    """
+    Returns sankey nodes and links from precomputed flow totals of given simulation
+
+    Storages are filtered in order to avoid cycles (not possible with eCharts Sankeys) and zeros to avoid thin lines.
+    """
+    try:
+        # pylint: disable=E1101
+        sim = models.Simulation.objects.select_related("dataset").defer("dataset__meta_results").get(pk=simulation_id)
+    except models.Simulation.DoesNotExist:  # pylint: disable=E1101
+        # pylint: disable=W0707
+        raise simulation.SimulationError(f"Simulation with ID#{simulation_id} not present in database.")
+
+    links = [
+        flow_total
+        for flow_total in sim.dataset.get_flow_totals()
+        if all(storage not in flow_total["target"] for storage in storages) and flow_total["value"] > 0
+    ]
+    names_raw = {link["source"] for link in links} | {link["target"] for link in links}
+    return {"names": [{"name": name} for name in names_raw], "links": links}
+
+
 class FlowsView(TemplateView):
     template_name = "django_oemof/flows.html"
 
@@ -128,23 +300,33 @@ class FlowsView(TemplateView):
         simulation_id = self.request.GET["simulation_id"]
         # Additional storages with different naming can be excluded via URl parameter "storages"
         storages = self.request.GET.getlist("storages") + ["storage", "battery"]
-        try:
-            sim = models.Simulation.objects.get(pk=simulation_id)  # pylint: disable=E1101
-        except models.Simulation.DoesNotExist:  # pylint: disable=E1101
-            # pylint: disable=W0707
-            raise simulation.SimulationError(f"Simulation with ID#{simulation_id} not present in database.")
-
-        _, results = sim.dataset.restore_results()
-        links = [{"source": source, "target": target, "value": data["sequences"]["flow"].sum()} for (source, target), data in results.items() if "flow" in data["sequences"]]
-        # Filter storages in order to avoid cycles (not possible with eCharts Sankeys) and zeros to avoid thin lines
-        links = [link for link in links if all(storage not in link["target"] for storage in storages) and link["value"] > 0]
-        names_raw = {link["source"] for link in links} | {link["target"] for link in links}
-        names = [{"name": name} for name in names_raw]
         return {
-            "results": results,
             "simulation_id": simulation_id,
-            "chart_data": {
-                "names": names,
-                "links": links,
-            },
+            "chart_data": get_sankey_data(simulation_id, storages),
         }
+
+
+class FlowsDataView(APIView):
+    """View to deliver sankey data of flows as JSON"""
+
+    @staticmethod
+    def get(request):
+        """
+        Returns sankey nodes and links (including values per period, if available) for given simulation
+
+        Parameters
+        ----------
+        request
+            Holding simulation ID and optionally additional storages to exclude
+
+        Returns
+        -------
+        Response
+            holding sankey nodes and links
+        """
+        simulation_id = request.GET["simulation_id"]
+        storages = request.GET.getlist("storages") + ["storage", "battery"]
+        try:
+            return Response(get_sankey_data(simulation_id, storages))
+        except simulation.SimulationError as error:
+            return Response({"msg": str(error)}, status=status.HTTP_404_NOT_FOUND)
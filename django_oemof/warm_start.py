@@ -0,0 +1,241 @@
+"""
+Module to warm-start solvers from results of stored simulations
+
+Stored simulation of same scenario with nearest parameters is looked up and its restored results are set as initial
+values of model variables, which are passed to solver as initial solution (if supported by solver).
+Candidates are filtered within DB by warm start key (datapackage hash and structural signature of ES), only the most
+recent `DJANGO_OEMOF_WARM_START_CANDIDATES` candidates are compared by parameter distance.
+"""
+
+import logging
+import math
+from dataclasses import dataclass
+from numbers import Number
+from typing import Optional
+
+import pyomo.environ as po
+from oemof import solph
+from oemof.network.network import Node
+
+from django_oemof import model_cache, models
+from django_oemof import settings as do_settings
+
+# Result attributes used as initial values of model variables
+WARM_START_ATTRIBUTES = ("flow", "storage_content", "invest")
+
+
+@dataclass
+class WarmStart:
+    """Holds restored results of stored simulation used to warm-start solver"""
+
+    simulation_id: int
+    distance: float
+    results_data: dict
+
+    def to_dict(self) -> dict:
+        """Returns source of warm start, stored in meta results"""
+        return {"simulation": self.simulation_id, "distance": self.distance}
+
+
+def flatten_parameters(parameters: dict, prefix: tuple = ()) -> dict:
+    """Returns nested parameters as flat dict keyed by paths"""
+    flat = {}
+    for key, value in parameters.items():
+        if isinstance(value, dict) and value:
+            flat.update(flatten_parameters(value, prefix + (key,)))
+        else:
+            flat[prefix + (key,)] = value
+    return flat
+
+
+def get_parameter_distance(parameters: dict, other_parameters: dict) -> float:
+    """
+    Returns distance between simulation parameters
+
+    Numeric parameters contribute their relative difference, all other parameters contribute 0 if equal and 1 if not.
+    Parameters missing in one of the simulations contribute 1.
+
+    Parameters
+    ----------
+    parameters: dict
+        Simulation parameters
+    other_parameters: dict
+        Simulation parameters to compare with
+
+    Returns
+    -------
+    float
+        Distance between parameters (0 if parameters are equal)
+    """
+    flat, other_flat = flatten_parameters(parameters), flatten_parameters(other_parameters)
+    distance = 0.0
+    for path in flat.keys() | other_flat.keys():
+        if path not in flat or path not in other_flat:
+            distance += 1
+            continue
+        value, other_value = flat[path], other_flat[path]
+        if (
+            isinstance(value, Number)
+            and isinstance(other_value, Number)
+            and not isinstance(value, bool)
+            and not isinstance(other_value, bool)
+        ):
+            scale = max(abs(value), abs(other_value))
+            distance += min(abs(value - other_value) / scale, 1) if scale and math.isfinite(scale) else 0
+        elif value != other_value:
+            distance += 1
+    return distance
+
+
+def get_warm_start_key(datapackage_hash: str, energysystem: solph.EnergySystem) -> Optional[dict]:
+    """
+    Returns key of simulations which can warm-start each other
+
+    Key is stored in meta results (key `warm_start_key`) and used to filter candidates within DB.
+
+    Parameters
+    ----------
+    datapackage_hash: str
+        Content hash of datapackage (see `simulation.get_datapackage_hash`)
+    energysystem: solph.EnergySystem
+        Adapted energysystem
+
+    Returns
+    -------
+    Optional[dict]
+        Datapackage hash and structural signature of ES or None if ES has no structural signature (multi-period ES)
+    """
+    structure = model_cache.get_structural_signature(energysystem)
+    if structure is None:
+        return None
+    return {"datapackage": datapackage_hash, "structure": structure}
+
+
+def get_nearest_simulation(scenario: str, parameters: dict, key: dict) -> Optional[tuple[models.Simulation, float]]:
+    """
+    Returns stored simulation of given scenario holding parameters nearest to given parameters
+
+    Only the most recent `DJANGO_OEMOF_WARM_START_CANDIDATES` simulations holding same warm start key are compared.
+
+    Parameters
+    ----------
+    scenario: str
+        Name of scenario
+    parameters: dict
+        Parameters of simulation to warm-start
+    key: dict
+        Warm start key of simulation to warm-start (see `get_warm_start_key`)
+
+    Returns
+    -------
+    Optional[tuple[models.Simulation, float]]
+        Nearest simulation and its parameter distance or None if no candidate is stored
+    """
+    parameters_hash = models.get_parameters_hash(parameters)
+    candidates = (
+        models.Simulation.objects.filter(  # pylint: disable=E1101
+            scenario=scenario,
+            dataset__meta_results__warm_start_key__datapackage=key["datapackage"],
+            dataset__meta_results__warm_start_key__structure=key["structure"],
+        )
+        .exclude(parameters_hash=parameters_hash)
+        .order_by("-id")
+        .values_list("id", "parameters")[: do_settings.DJANGO_OEMOF_WARM_START_CANDIDATES]
+    )
+    nearest = min(
+        ((simulation_id, get_parameter_distance(parameters, candidate)) for simulation_id, candidate in candidates),
+        key=lambda item: item[1],
+        default=None,
+    )
+    if nearest is None:
+        return None
+    return models.Simulation.objects.get(pk=nearest[0]), nearest[1]  # pylint: disable=E1101
+
+
+def get_warm_start(scenario: str, parameters: dict, key: Optional[dict]) -> Optional[WarmStart]:
+    """
+    Returns warm start holding restored results of nearest stored simulation
+
+    Only results needed as initial values (see `WARM_START_ATTRIBUTES`) are restored.
+
+    Parameters
+    ----------
+    scenario: str
+        Name of scenario
+    parameters: dict
+        Parameters of simulation to warm-start
+    key: Optional[dict]
+        Warm start key of simulation to warm-start (see `get_warm_start_key`)
+
+    Returns
+    -------
+    Optional[WarmStart]
+        Warm start or None if key is not set or no candidate is stored
+    """
+    if key is None:
+        return None
+    nearest = get_nearest_simulation(scenario, parameters, key)
+    if nearest is None:
+        return None
+    simulation, distance = nearest
+    logging.info(f"Warm-starting simulation for {scenario=} from simulation #{simulation.id} ({distance=:.3f}).")
+    results_data = simulation.dataset.result.restore(attributes=WARM_START_ATTRIBUTES)
+    return WarmStart(simulation.id, distance, results_data)
+
+
+def get_result_key(results_data: dict, nodes: tuple) -> Optional[tuple]:
+    """Returns key of restored results related to given nodes (results of nodes are stored with to_node "None")"""
+    labels = tuple(str(node.label) for node in nodes)
+    candidates = [labels] if len(labels) == 2 else [(labels[0], None), (labels[0], "None")]
+    return next((key for key in candidates if key in results_data), None)
+
+
+def set_initial_values(model: po.ConcreteModel, results_data: dict) -> int:
+    """
+    Sets values of model variables from restored results
+
+    Variables are matched by nodes in their index and by variable name, which is used as attribute in results
+    (i.e. `flow`, `storage_content` or `invest`). Fixed variables are skipped.
+
+    Parameters
+    ----------
+    model: oemof.solph.Model
+        Built model
+    results_data: dict
+        Restored results of stored simulation (see `models.OemofDataset.restore_results`)
+
+    Returns
+    -------
+    int
+        Number of variables with initial value
+    """
+    count = 0
+    for variable in model.component_objects(po.Var, active=True):
+        name = variable.local_name
+        for index, variable_data in variable.items():
+            if variable_data.fixed:
+                continue
+            index = index if isinstance(index, tuple) else (index,)
+            nodes = tuple(item for item in index if isinstance(item, Node))
+            if not nodes or len(nodes) > 2:
+                continue
+            key = get_result_key(results_data, nodes)
+            if key is None:
+                continue
+            result = results_data[key]
+            if name in result["sequences"]:
+                sequence = result["sequences"][name]
+                timestep = index[-1]
+                if not isinstance(timestep, int) or timestep >= len(sequence):
+                    continue
+                value = sequence.iloc[timestep] if hasattr(sequence, "iloc") else sequence[timestep]
+            elif name in result["scalars"]:
+                value = result["scalars"][name]
+            else:
+                continue
+            if value is None or not isinstance(value, Number) or math.isnan(value):
+                continue
+            variable_data.set_value(value, skip_validation=True)
+            count += 1
+    logging.info(f"Set initial values of {count} variables.")
+    return count
@@ -16,8 +16,12 @@ TEST_FOLDER = pathlib.Path(__file__).parent / "django_oemof" / "tests"
 TEST_PATH = "django_oemof.tests"
 
 
-def runtests(test_module=TEST_PATH):
-    """Sets up django settings an runs tests"""
+def runtests(test_module=TEST_PATH, benchmark_args=None):
+    """
+    Sets up django settings an runs tests
+
+    If benchmark_args are given, benchmarks are run (using test database) instead of tests.
+    """
 
     if not settings.configured:
         # Configure test environment
@@ -62,13 +66,23 @@ def runtests(test_module=TEST_PATH):
 
     if django.VERSION >= (1, 7):
         django.setup()
+    if benchmark_args is not None:
+        from django.db import connection
+
+        connection.creation.create_test_db(verbosity=0, keepdb=True)
+        call_command("benchmark", *benchmark_args)
+        sys.exit(0)
+
     failures = call_command("test", test_module, interactive=False, keepdb=True, failfast=False, verbosity=2)
 
     sys.exit(bool(failures))
 
 
 if __name__ == "__main__":
-    if len(sys.argv) > 1:
+    if len(sys.argv) > 1 and sys.argv[1] == "--benchmark":
+        # Usage: python runtests.py --benchmark [<scenario> ...] [--baseline <file>] [--output <file>] ...
+        runtests(benchmark_args=sys.argv[2:])
+    elif len(sys.argv) > 1:
         runtests(test_module=f"{TEST_PATH}.{sys.argv[1]}")
     else:
         runtests()